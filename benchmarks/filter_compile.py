@@ -0,0 +1,70 @@
+"""Per-turn cost of preparing the search statements from a structured intent.
+
+Usage (from the repo root; no credentials or services needed):
+
+    python benchmarks/filter_compile.py [--corpus FILE] [--rounds 2000]
+
+The intents come from the corpus queries the rule parser understands. For each
+one, the script builds the SQL similarity statement with its params and the
+Cypher statement with its params, the way a "recommendation" turn does. It times
+this two ways: memoised per filter shape (the normal path), and with the shape
+caches cleared before every intent (what each turn paid when the WHERE clause
+was assembled by hand).
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from findmyhome.agents.filter_parser import parse_filters  # noqa: E402
+from findmyhome.filters import _cypher_statement, _sql_fragment, compile_filters, similarity_sql  # noqa: E402
+
+HERE = Path(__file__).resolve().parent
+
+
+def prepare(intent) -> None:
+    compiled = compile_filters(intent, coded=True)
+    similarity_sql(compiled.shape, True, 1536)
+    similarity_sql(compiled.shape, True, 1536, exclude=True)
+
+
+def clear() -> None:
+    _sql_fragment.cache_clear()
+    _cypher_statement.cache_clear()
+    similarity_sql.cache_clear()
+
+
+def run(intents, rounds: int, cold: bool) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for intent in intents:
+            if cold:
+                clear()
+            prepare(intent)
+    return (time.perf_counter() - started) / (rounds * len(intents))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, default=HERE / "filter_parser_corpus.txt")
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    lines = (line.strip() for line in args.corpus.read_text(encoding="utf-8").splitlines())
+    intents = [i for i in (parse_filters(q) for q in lines if q and not q.startswith("#")) if i is not None]
+    shapes = {compile_filters(i).shape for i in intents}
+    print(f"{len(intents)} intents, {len(shapes)} filter shapes")
+
+    cold = run(intents, args.rounds, cold=True)
+    warm = run(intents, args.rounds, cold=False)
+    print(f"uncached per turn : {cold * 1e6:8.2f} us")
+    print(f"memoised per turn : {warm * 1e6:8.2f} us")
+    print(f"speed-up          : {cold / warm:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
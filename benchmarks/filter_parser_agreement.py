@@ -0,0 +1,84 @@
+"""Agreement between the rule-based filter parser and the query_enhancer LLM.
+
+Usage (from the repo root, with the usual .env in place):
+
+    python benchmarks/filter_parser_agreement.py [--corpus FILE] [--parser-only]
+
+For every corpus query the parser runs first. Queries it fully parses are also
+sent to the LLM (single turn, no saved preferences), and each structured field is
+compared. The script reports parser coverage, per-field and exact-match
+agreement, and the latency of both paths. ``--parser-only`` skips the LLM, so it
+needs no credentials.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from findmyhome.agents.filter_parser import parse_filters  # noqa: E402
+
+FIELDS = ["city", "has_balcony", "min_beds", "max_price", "min_baths", "min_area", "property_type", "room_type"]
+
+
+def load_corpus(path: Path):
+    lines = (line.strip() for line in path.read_text(encoding="utf-8").splitlines())
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+def llm_filters(query: str):
+    from findmyhome.agents.query_enhancer import _query_enhancer_messages
+    from findmyhome.agents.state import QueryEnhancer
+    from findmyhome.config import get_chat_model
+
+    model = get_chat_model(temperature=0.5).with_structured_output(QueryEnhancer)
+    return model.invoke(_query_enhancer_messages({"user_query": [query]}, {"preferences": None, "user_messages": []}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, default=Path(__file__).with_name("filter_parser_corpus.txt"))
+    parser.add_argument("--parser-only", action="store_true", help="only measure coverage and parser latency")
+    args = parser.parse_args()
+
+    queries = load_corpus(args.corpus)
+    parsed = {}
+    parse_seconds = 0.0
+    for q in queries:
+        started = time.perf_counter()
+        result = parse_filters(q)
+        parse_seconds += time.perf_counter() - started
+        if result is not None:
+            parsed[q] = result
+
+    print(f"queries: {len(queries)}  parsed: {len(parsed)} ({len(parsed) / len(queries):.0%})")
+    print(f"parser latency: {parse_seconds / len(queries) * 1e6:.0f} µs/query")
+    if args.parser_only or not parsed:
+        return
+
+    field_agree = {f: 0 for f in FIELDS}
+    exact = 0
+    llm_seconds = 0.0
+    for q, ours in parsed.items():
+        started = time.perf_counter()
+        theirs = llm_filters(q)
+        llm_seconds += time.perf_counter() - started
+        diffs = [f for f in FIELDS if getattr(ours, f) != getattr(theirs, f)]
+        for f in FIELDS:
+            field_agree[f] += f not in diffs
+        exact += not diffs
+        if diffs:
+            print(f"- {q!r}: " + ", ".join(f"{f} parser={getattr(ours, f)!r} llm={getattr(theirs, f)!r}" for f in diffs))
+
+    n = len(parsed)
+    print(f"exact agreement: {exact}/{n} ({exact / n:.0%})")
+    for f in FIELDS:
+        print(f"  {f:<14} {field_agree[f] / n:.0%}")
+    print(f"llm latency: {llm_seconds / n * 1000:.0f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Cold import time of the API module, with no credentials and no services.
+
+Usage (from the repo root):
+
+    python benchmarks/import_time.py [--module findmyhome.api.server] [--runs 5] [--budget-ms 3000] [--top 15]
+
+Each run is a fresh interpreter with ``-X importtime`` and an environment
+stripped down to PATH/HOME/PYTHONPATH, so nothing is read from a .env or the
+shell. Importing must not connect to Redis, Postgres, Neo4j or Azure: a run
+that fails to import is reported as an error. The script prints the median
+total and the slowest top-level packages of the fastest run, and exits 1 when
+the median exceeds ``--budget-ms``.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+
+def run_once(module: str) -> tuple[float, dict]:
+    env = {"PATH": os.environ.get("PATH", ""), "HOME": os.environ.get("HOME", ""), "PYTHONPATH": str(SRC)}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env, cwd=SRC.parent, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    total = 0
+    packages: dict = defaultdict(int)
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        total += int(self_us)
+        packages[name.strip().split(".")[0]] += int(self_us)
+    return total / 1000, {k: v / 1000 for k, v in packages.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="findmyhome.api.server")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=3000)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    runs = [run_once(args.module) for _ in range(args.runs)]
+    totals = [total for total, _ in runs]
+    median = statistics.median(totals)
+    _, packages = min(runs, key=lambda r: r[0])
+
+    print(f"{'package':<28} {'self ms':>9}")
+    for name, ms in sorted(packages.items(), key=lambda kv: -kv[1])[: args.top]:
+        print(f"{name:<28} {ms:>9.1f}")
+    print(f"\nimport {args.module}: median {median:.0f} ms, min {min(totals):.0f} ms over {args.runs} runs "
+          f"(budget {args.budget_ms:.0f} ms)")
+    if median > args.budget_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
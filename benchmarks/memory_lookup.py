@@ -0,0 +1,137 @@
+"""Latency of a user's memory lookup as the number of users grows.
+
+Usage (from the repo root, REDIS_HOST/REDIS_PORT/REDIS_PASSWORD in the environment or .env):
+
+    python benchmarks/memory_lookup.py [--users 1000,10000,100000] [--per-user 3] [--dims 256]
+        [--queries 200] [--algorithms hnsw,flat] [--keep]
+
+Random unit vectors are loaded under a scratch prefix (``bench_memory:*``),
+into one scratch index per algorithm, never into the real memory index. The
+population grows step by step up to each ``--users`` value. At each step, the
+script times the lookup ``retrieve_memories`` runs: a range query with the
+@user_id/@memory_type tag filter. For comparison, it also times the same query
+without the filter, which is what every lookup paid before. Use ``--dims 1536``
+for production-sized vectors; 100k users x 3 memories then needs about 2 GB.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import numpy as np  # noqa: E402
+from redis import Redis  # noqa: E402
+from redisvl.index import SearchIndex  # noqa: E402
+from redisvl.query import VectorRangeQuery  # noqa: E402
+from redisvl.schema.schema import IndexSchema  # noqa: E402
+
+from findmyhome.config import get_settings  # noqa: E402
+from findmyhome.memory_index import memory_filter, schema_dict  # noqa: E402
+
+PREFIX = "bench_memory"
+
+
+def vectors(n: int, dims: int, rng: np.random.Generator) -> np.ndarray:
+    v = rng.standard_normal((n, dims)).astype(np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+def load(index: SearchIndex, start: int, stop: int, per_user: int, dims: int, rng: np.random.Generator) -> None:
+    batch = 2000
+    for first in range(start, stop, batch):
+        users = range(first, min(first + batch, stop))
+        embeddings = vectors(len(users) * per_user, dims, rng)
+        docs = [
+            {
+                "user_id": f"user-{u}",
+                "content": f"memory {i} of user {u}",
+                "memory_type": "episodic" if i == 0 else "semantic",
+                "metadata": "{}",
+                "created_at": "",
+                "memory_id": f"{u}-{i}",
+                "embedding": embeddings[j * per_user + i].tolist(),
+            }
+            for j, u in enumerate(users)
+            for i in range(per_user)
+        ]
+        index.load(docs, id_field="memory_id")
+
+
+def wait_indexed(index: SearchIndex) -> None:
+    while True:
+        info = index.info()
+        if float(info.get("percent_indexed", 1)) >= 1 and not int(info.get("indexing", 0)):
+            return
+        time.sleep(0.2)
+
+
+def time_queries(index: SearchIndex, users: int, n: int, dims: int, filtered: bool, rng: np.random.Generator):
+    times = []
+    for vec in vectors(n, dims, rng):
+        query = VectorRangeQuery(
+            vector=vec.tolist(),
+            vector_field_name="embedding",
+            distance_threshold=0.5,
+            num_results=3,
+            return_fields=["content"],
+            filter_expression=memory_filter(f"user-{random.randrange(users)}", "episodic") if filtered else None,
+        )
+        started = time.perf_counter()
+        index.query(query)
+        times.append(time.perf_counter() - started)
+    return times
+
+
+def ms(values, q):
+    return statistics.quantiles(values, n=100)[q - 1] * 1000 if len(values) > 1 else values[0] * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", default="1000,10000,100000")
+    parser.add_argument("--per-user", type=int, default=3)
+    parser.add_argument("--dims", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--algorithms", default="hnsw,flat")
+    parser.add_argument("--keep", action="store_true", help="leave the scratch indexes and documents in Redis")
+    args = parser.parse_args()
+
+    s = get_settings()
+    client = Redis(host=s.redis_host, port=s.redis_port, password=s.redis_password, decode_responses=True)
+    steps = sorted(int(u) for u in args.users.split(","))
+
+    print(f"{'algorithm':<10} {'users':>8} {'docs':>9} {'filtered p50':>13} {'p95 ms':>8} {'unfiltered p50':>15} {'p95 ms':>8}")
+    for algorithm in args.algorithms.split(","):
+        rng = np.random.default_rng(0)
+        random.seed(0)
+        schema = IndexSchema.from_dict(schema_dict(
+            algorithm=algorithm, dims=args.dims, m=s.memory_hnsw_m, ef_construction=s.memory_hnsw_ef_construction,
+            ef_runtime=s.memory_hnsw_ef_runtime, epsilon=s.memory_hnsw_epsilon,
+            name=f"{PREFIX}_{algorithm}", prefix=f"{PREFIX}_{algorithm}",
+        ))
+        index = SearchIndex(schema=schema, redis_client=client)
+        index.create(overwrite=True, drop=True)
+        loaded = 0
+        try:
+            for users in steps:
+                load(index, loaded, users, args.per_user, args.dims, rng)
+                loaded = users
+                wait_indexed(index)
+                filtered = time_queries(index, users, args.queries, args.dims, True, rng)
+                unfiltered = time_queries(index, users, args.queries, args.dims, False, rng)
+                print(
+                    f"{algorithm:<10} {users:>8} {users * args.per_user:>9} {ms(filtered, 50):>13.2f} "
+                    f"{ms(filtered, 95):>8.2f} {ms(unfiltered, 50):>15.2f} {ms(unfiltered, 95):>8.2f}"
+                )
+        finally:
+            if not args.keep:
+                index.delete(drop=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""External calls per recommendation turn, with and without the turn-context preload.
+
+Usage (from the repo root, the usual .env in place; needs a user with saved preferences):
+
+    python benchmarks/turn_context_trace.py --user-id USER [--query "2 BHK flats in Pune under 80 lakh"] [--turns 3]
+
+Each turn runs in its own fresh thread, through the full workflow with an
+in-memory checkpointer. The per-worker preference cache is cleared before
+every turn, so each one starts the way it does on a worker whose entry has
+expired. The script counts, per turn:
+
+- preference lookups: store reads by the agents
+- Redis GETs: reads that reached Redis
+- LLM calls
+
+It runs once with TURN_CONTEXT_PRELOAD=false, where query_correction and
+query_enhancer each load the context themselves and race on the same cold
+key, and once with the preload.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from langchain_core.callbacks import BaseCallbackHandler  # noqa: E402
+from langgraph.checkpoint.memory import InMemorySaver  # noqa: E402
+
+from findmyhome.config import get_preference_store, get_settings  # noqa: E402
+from findmyhome.workflow import build_graph  # noqa: E402
+
+
+class LLMCalls(BaseCallbackHandler):
+    def __init__(self):
+        self.calls = 0
+
+    def on_chat_model_start(self, *args, **kwargs):
+        self.calls += 1
+
+    def on_llm_start(self, *args, **kwargs):
+        self.calls += 1
+
+
+class Counting:
+    """Counts calls to one method of a wrapped object."""
+
+    def __init__(self, target, method: str):
+        self.target, self.method, self.calls = target, method, 0
+
+    def __getattr__(self, name):
+        attr = getattr(self.target, name)
+        if name != self.method:
+            return attr
+
+        def counted(*args, **kwargs):
+            self.calls += 1
+            return attr(*args, **kwargs)
+
+        return counted
+
+
+def trace(query: str, user_id: str, turns: int, preload: bool):
+    os.environ["TURN_CONTEXT_PRELOAD"] = "true" if preload else "false"
+    get_settings.cache_clear()
+    store = get_preference_store()
+    redis_factory = store._redis_factory
+    redis = Counting(redis_factory(), "get")
+    store_get = store.get
+    lookups = 0
+
+    def counted_get(user_id):
+        nonlocal lookups
+        lookups += 1
+        return store_get(user_id)
+
+    store._redis_factory = lambda: redis
+    store.get = counted_get  # aget falls through to self.get on a miss
+    workflow = build_graph(routing="single", fast_path=True).compile(checkpointer=InMemorySaver())
+    llm = LLMCalls()
+    started = time.perf_counter()
+    try:
+        for _ in range(turns):
+            store.local.clear_local()
+            config = {"configurable": {"thread_id": str(uuid.uuid4()), "user_id": user_id}, "callbacks": [llm]}
+            workflow.invoke({"user_query": [query]}, config=config)
+    finally:
+        store._redis_factory = redis_factory
+        del store.get
+    elapsed = (time.perf_counter() - started) / turns
+    return lookups / turns, redis.calls / turns, llm.calls / turns, elapsed * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id", required=True)
+    parser.add_argument("--query", default="2 BHK flats in Pune under 80 lakh")
+    parser.add_argument("--turns", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'mode':<12} {'pref lookups':>13} {'redis GETs':>11} {'LLM calls':>10} {'ms/turn':>9}")
+    for preload in (False, True):
+        lookups, gets, llm, ms = trace(args.query, args.user_id, args.turns, preload)
+        print(f"{'preload' if preload else 'per-agent':<12} {lookups:>13.1f} {gets:>11.1f} {llm:>10.1f} {ms:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
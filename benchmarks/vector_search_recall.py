@@ -0,0 +1,99 @@
+"""Recall vs latency of the ANN index on properties.description_embed against exact search.
+
+Usage (from the repo root, NEON_URL in the environment or .env):
+
+    python benchmarks/vector_search_recall.py [--method hnsw|ivfflat] [--samples 50] [--k 10]
+        [--values 10,20,40,80,200] [--filtered] [--iterative relaxed_order|strict_order|off]
+
+Query vectors are sampled from the table itself. Each one runs through the
+same SQL as ``query_database_agent``. Ground truth comes from the same
+statement with index scans disabled. ``--values`` sweeps ``hnsw.ef_search``
+(or ``ivfflat.probes``). ``--filtered`` adds the sampled row's city as a
+filter, to expose post-filter starvation with and without iterative scans.
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from pgvector.psycopg2 import register_vector  # noqa: E402
+
+from findmyhome.agents.sql_agent import _database_query  # noqa: E402
+from findmyhome.config import get_pg_connection  # noqa: E402
+
+
+def sample_queries(conn, n: int):
+    with conn.cursor() as cur:
+        cur.execute(
+            'SELECT description_embed, "cityName" FROM properties '
+            "WHERE description_embed IS NOT NULL ORDER BY random() LIMIT %s",
+            (n,),
+        )
+        return cur.fetchall()  # the pgvector adapter loads the embeddings as float32 arrays
+
+
+def run(conn, sql, params, settings):
+    with conn.cursor() as cur:
+        for stmt in settings:
+            cur.execute(stmt)
+        started = time.perf_counter()
+        cur.execute(sql, params)
+        ids = [row[0] for row in cur.fetchall()]
+        elapsed = time.perf_counter() - started
+    conn.rollback()  # drop the SET LOCALs
+    return ids, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--method", choices=["hnsw", "ivfflat"], default="hnsw")
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--values", default="10,20,40,80,200", help="ef_search (hnsw) or probes (ivfflat) to sweep")
+    parser.add_argument("--filtered", action="store_true", help="filter each query by its sampled row's city")
+    parser.add_argument("--iterative", default="off", choices=["off", "relaxed_order", "strict_order"])
+    args = parser.parse_args()
+
+    conn = get_pg_connection()
+    register_vector(conn)
+    queries = sample_queries(conn, args.samples)
+    knob = "hnsw.ef_search" if args.method == "hnsw" else "ivfflat.probes"
+
+    truth = []
+    exact_times = []
+    for vec, city in queries:
+        sql, params = _database_query({"city": city} if args.filtered else {}, vec, args.k)
+        ids, elapsed = run(conn, sql, params, ["SET LOCAL enable_indexscan = off"])
+        truth.append((sql, params, set(ids)))
+        exact_times.append(elapsed)
+
+    def ms(values, q):
+        return statistics.quantiles(values, n=100)[q - 1] * 1000 if len(values) > 1 else values[0] * 1000
+
+    print(f"{'setting':<28} {'recall@' + str(args.k):>10} {'rows':>6} {'p50 ms':>8} {'p95 ms':>8}")
+    print(f"{'exact':<28} {1.0:>10.3f} {'':>6} {ms(exact_times, 50):>8.1f} {ms(exact_times, 95):>8.1f}")
+    for value in [int(v) for v in args.values.split(",")]:
+        settings = [f"SET LOCAL {knob} = {value}"]
+        if args.iterative != "off":
+            settings.append(f"SET LOCAL {args.method}.iterative_scan = {args.iterative}")
+        recalls, times, returned = [], [], []
+        for sql, params, expected in truth:
+            ids, elapsed = run(conn, sql, params, settings)
+            times.append(elapsed)
+            returned.append(len(ids))
+            recalls.append(len(expected & set(ids)) / len(expected) if expected else 1.0)
+        label = f"{knob}={value}" + (f" {args.iterative}" if args.iterative != "off" else "")
+        print(
+            f"{label:<28} {statistics.mean(recalls):>10.3f} {statistics.mean(returned):>6.1f} "
+            f"{ms(times, 50):>8.1f} {ms(times, 95):>8.1f}"
+        )
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,25 @@ from __future__ import annotations
 from typing import Dict, List, Set
 
 from langchain_core.messages import HumanMessage, SystemMessage
+from langgraph.config import get_stream_writer
 
 from findmyhome.config import get_chat_model
+from findmyhome.property_record import PROMPT_LEGEND, cards, prompt_table
+from .context import user_messages_context
 from .state import RecommendationState
 from langgraph.prebuilt.chat_agent_executor import create_react_agent
 
 
-def accumulative_query_agent(state: RecommendationState):
+def publish_properties(source: str, rows: List[Dict]) -> None:
+    """Send a turn's property rows to a streaming client ahead of its summary (stream_mode "custom")."""
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:  # called outside a graph run
+        return
+    writer({"source": source, "properties": rows})
+
+
+def _accumulate_messages(state: RecommendationState):
     db_responses_history = state.get("database_responses", [])
     db_results = db_responses_history[-1] if db_responses_history else []
     
@@ -53,16 +65,11 @@ def accumulative_query_agent(state: RecommendationState):
         else:
             unified_properties.append(graph_by_id[pid])
 
-    DROP_KEYS = {"id", "score"}
-    sanitized_unified = [
-        {k: v for k, v in (p or {}).items() if k not in DROP_KEYS} for p in unified_properties
-    ]
-
     msgs_list = state.get("user_query", []) or []
     last_human_text = msgs_list[-1] if msgs_list else ""
     qc = state.get("query_correction") or ""
     query_used = qc if qc else last_human_text
-    all_user_messages = msgs_list[:]
+    all_user_messages = user_messages_context(state, "accumulate")
 
     messages = [
         SystemMessage(content="You create a single, user-friendly summary of property recommendations without revealing any system or data source details."),
@@ -84,13 +91,17 @@ Your Task:
 
 User query: {query_used}
 Previous conversation: {all_user_messages}
-Combined property recommendations (already de-duplicated):
-{sanitized_unified}
+Combined property recommendations (already de-duplicated), {PROMPT_LEGEND}:
+{prompt_table(unified_properties)}
 """,
         ),
     ]
+    # the turn log keeps the PropertyRecord fields (id included, so compact_state can reduce old turns to references)
+    logged = cards(unified_properties)
+    return last_human_text, query_used, logged, messages
 
-    answer = get_chat_model().invoke(messages)
+
+def _accumulate_update(last_human_text: str, query_used: str, recommended: List[Dict], answer) -> dict:
     response_text = getattr(answer, "content", str(answer))
 
     return {
@@ -100,7 +111,20 @@ Combined property recommendations (already de-duplicated):
       "answered_by":"recommendation_agent",
       "answer":response_text,
       "query_used":query_used,
-      "recommended_properties":sanitized_unified
+      "recommended_properties":recommended
       }]
   }
 
+
+def accumulative_query_agent(state: RecommendationState):
+    last_human_text, query_used, logged, messages = _accumulate_messages(state)
+    publish_properties("unified", logged)
+    answer = get_chat_model().invoke(messages)
+    return _accumulate_update(last_human_text, query_used, logged, answer)
+
+
+async def aaccumulative_query_agent(state: RecommendationState):
+    last_human_text, query_used, logged, messages = _accumulate_messages(state)
+    publish_properties("unified", logged)
+    answer = await get_chat_model().ainvoke(messages)
+    return _accumulate_update(last_human_text, query_used, logged, answer)
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Any, Callable, Dict, List, Mapping, Tuple
+
+from findmyhome.config import get_property_store, get_settings
+from findmyhome.metrics import metrics
+from findmyhome.property_store import is_ref
+from .context import arolling_summary_update, rolling_summary_update
+from .state import RecommendationState, replace_list
+
+logger = logging.getLogger(__name__)
+
+# Per-turn history channels and how an old entry is reduced to id references.
+ROW_FIELDS = ("database_responses", "graph_raw_history", "turn_log")
+# Answers already live in turn_log; only the recent ones are kept here.
+TEXT_FIELDS = ("graph_db_agent", "discussion")
+# Only read by "more" for threads without a cursor; capped, not compacted.
+ID_FIELDS = ("database_property_id_shown", "graph_property_id_shown")
+MAX_SHOWN_IDS = 200
+# Dropped oldest-first, in step, when a thread is still over its byte budget.
+TRIM_FIELDS = ("turn_log", "user_query")
+
+
+def json_size(values: Mapping[str, Any]) -> int:
+    return len(json.dumps(values, default=str).encode("utf-8"))
+
+
+def _ref(row: Any) -> Any:
+    if isinstance(row, dict) and row.get("id") is not None:
+        return {"id": str(row["id"])}
+    return row
+
+
+def _compact_entry(field: str, entry: Any, evicted: List[Dict[str, Any]]) -> Any:
+    if field == "database_responses":
+        evicted.extend(r for r in entry if isinstance(r, dict) and not is_ref(r))
+        return [_ref(r) for r in entry]
+    if field == "graph_raw_history":
+        out = []
+        for item in entry:
+            p = item.get("p") if isinstance(item, dict) else None
+            if isinstance(p, dict) and not is_ref(p):
+                evicted.append(p)
+                out.append({"p": _ref(p)})
+            else:
+                out.append(item)
+        return out
+    # turn_log
+    props = entry.get("recommended_properties") or []
+    if not props:
+        return entry
+    evicted.extend(r for r in props if isinstance(r, dict) and not is_ref(r))
+    return {**entry, "recommended_properties": [_ref(r) for r in props]}
+
+
+def _compact_rows(work: Dict[str, List[Any]], full_turns: int, evicted: List[Dict[str, Any]]) -> None:
+    for field in ROW_FIELDS:
+        entries = work[field]
+        cut = max(len(entries) - full_turns, 0)
+        work[field] = [_compact_entry(field, e, evicted) for e in entries[:cut]] + entries[cut:]
+
+
+def compact_values(
+    values: Mapping[str, Any],
+    full_turns: int,
+    byte_budget: int,
+    size: Callable[[Mapping[str, Any]], int] = json_size,
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]], int, int]:
+    """Bound the per-turn history in ``values``.
+
+    Rows older than the last ``full_turns`` turns become ``{"id": ...}``
+    references. If the thread is still over ``byte_budget`` bytes, every turn
+    but the last is reduced to references, and then the oldest turns and user
+    messages are dropped, never going below ``full_turns`` of them.
+    Returns ``(updates, evicted_rows, bytes_before, bytes_after)``. The updates
+    are ``replace_list`` writes for the channels that changed, and the evicted
+    rows are the full rows to keep in the property store.
+    """
+    fields = ROW_FIELDS + TEXT_FIELDS + ID_FIELDS + TRIM_FIELDS
+    work: Dict[str, List[Any]] = {f: list(values.get(f) or []) for f in fields}
+    evicted: List[Dict[str, Any]] = []
+    before = size(values)
+
+    _compact_rows(work, full_turns, evicted)
+    for field in TEXT_FIELDS:
+        work[field] = work[field][-full_turns:] if full_turns else []
+    for field in ID_FIELDS:
+        work[field] = work[field][-MAX_SHOWN_IDS:]
+
+    after = size({**values, **work})
+    if after > byte_budget:
+        _compact_rows(work, 1, evicted)
+        after = size({**values, **work})
+        while after > byte_budget and any(len(work[f]) > max(full_turns, 1) for f in TRIM_FIELDS):
+            for field in TRIM_FIELDS:
+                if len(work[field]) > max(full_turns, 1):
+                    work[field] = work[field][1:]
+            after = size({**values, **work})
+
+    updates: Dict[str, Any] = {f: replace_list(work[f]) for f in fields if work[f] != list(values.get(f) or [])}
+    dropped = len(values.get("turn_log") or []) - len(work["turn_log"])
+    if dropped and values.get("summarized_turns"):
+        # the rolling summary's turn index counts from the start of turn_log
+        updates["summarized_turns"] = max(values["summarized_turns"] - dropped, 0)
+    return updates, evicted, before, after
+
+
+def _checkpoint_size(values: Mapping[str, Any]) -> int:
+    # what the checkpointer writes, not an estimate
+    from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+    return len(JsonPlusSerializer().dumps_typed(dict(values))[1])
+
+
+def _compact(state: RecommendationState):
+    s = get_settings()
+    updates, evicted, before, after = compact_values(
+        state, s.state_full_turns, s.state_byte_budget, size=_checkpoint_size
+    )
+    metrics.observe("checkpoint.bytes", before)
+    metrics.observe("checkpoint.bytes_compacted", after)
+    if evicted:
+        metrics.incr("state.compacted_rows", len(evicted))
+    if after > s.state_byte_budget:
+        metrics.incr("state.over_budget")
+        logger.warning(f"thread state is {after} bytes after compaction (budget {s.state_byte_budget})")
+    return updates, evicted
+
+
+def _close_turn(state: RecommendationState) -> Dict[str, Any]:
+    return {"completed_turns": (state.get("completed_turns") or 0) + 1}
+
+
+def compact_state_agent(state: RecommendationState):
+    summary = {**rolling_summary_update(state), **_close_turn(state)}
+    if not get_settings().state_compaction:
+        return summary
+    updates, evicted = _compact({**state, **summary})
+    if evicted:
+        get_property_store().put(evicted)
+    return {**summary, **updates}
+
+
+async def acompact_state_agent(state: RecommendationState):
+    summary = {**await arolling_summary_update(state), **_close_turn(state)}
+    if not get_settings().state_compaction:
+        return summary
+    updates, evicted = _compact({**state, **summary})
+    if evicted:
+        await asyncio.to_thread(get_property_store().put, evicted)
+    return {**summary, **updates}
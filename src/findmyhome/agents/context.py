@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import logging
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from findmyhome.config import get_chat_model, get_settings
+from findmyhome.metrics import metrics
+from findmyhome.property_record import prompt_table
+from findmyhome.property_store import is_ref
+from .state import RecommendationState
+
+logger = logging.getLogger(__name__)
+
+# Conversation context for agent prompts, under a token budget. Turns are
+# added newest-first until the budget is spent, property rows are collapsed to
+# one line each (PropertyRecord.prompt_row, as in the agents' own prompts), and
+# turns that no longer fit are either counted ("N earlier turns omitted") or,
+# with CONTEXT_ROLLING_SUMMARY, covered by a running summary that compact_state
+# keeps up to date.
+
+
+@lru_cache(maxsize=4)
+def _encoder(name: str) -> Optional[Callable[[str], List[int]]]:
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding(name).encode
+    except Exception as e:  # no tiktoken, or the BPE file cannot be fetched
+        logger.warning(f"tiktoken encoding {name!r} unavailable ({e}); estimating tokens as chars/4")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encode = _encoder(get_settings().context_encoding)
+    if encode is None:
+        return (len(text) + 3) // 4
+    return len(encode(text))
+
+
+def turn_block(turn: Dict[str, Any]) -> str:
+    lines = [f"question: {turn.get('question', '')}"]
+    if turn.get("query_used") and turn.get("query_used") != turn.get("question"):
+        lines.append(f"query_used: {turn['query_used']}")
+    lines.append(f"answered_by: {turn.get('answered_by', '')}")
+    lines.append(f"answer: {turn.get('answer', '')}")
+    props = turn.get("recommended_properties") or []
+    full = [p for p in props if isinstance(p, dict) and not is_ref(p)]
+    if full:
+        lines.append("recommended_properties:")
+        lines += [f"  {line}" for line in prompt_table(full).splitlines()]
+    if len(full) < len(props):
+        lines.append(f"  ({len(props) - len(full)} more properties shown; details no longer in context)")
+    return "\n".join(lines)
+
+
+def fit_newest_first(blocks: List[str], budget: int) -> List[str]:
+    """The longest suffix of ``blocks`` (oldest first) that fits in ``budget`` tokens; the newest always stays."""
+    kept: List[str] = []
+    used = 0
+    for block in reversed(blocks):
+        tokens = count_tokens(block)
+        if kept and used + tokens > budget:
+            break
+        kept.append(block)
+        used += tokens
+    return list(reversed(kept))
+
+
+def _record(agent: str, text: str) -> str:
+    tokens = count_tokens(text)
+    metrics.observe(f"context_tokens.{agent}", tokens)
+    logger.debug(f"{agent}: {tokens} context tokens")
+    return text
+
+
+def conversation_context(state: RecommendationState, agent: str) -> str:
+    """The previous turns for ``agent``'s prompt, newest-first within CONTEXT_TOKEN_BUDGET."""
+    s = get_settings()
+    turns = state.get("turn_log", []) or []
+    summary = state.get("conversation_summary") or ""
+    summarized = (state.get("summarized_turns") or 0) if summary else 0
+    blocks = [turn_block(t) for t in turns[summarized:]]
+    kept = fit_newest_first(blocks, s.context_token_budget - count_tokens(summary))
+    omitted = len(blocks) - len(kept)
+    header = []
+    if summary:
+        header.append(f"Summary of the earlier conversation:\n{summary}")
+    if omitted:
+        header.append(f"[{omitted} earlier turn{'s' if omitted > 1 else ''} omitted]")
+    return _record(agent, "\n\n".join(header + kept))
+
+
+def user_messages_context(state: RecommendationState, agent: str) -> List[str]:
+    """Previous user messages, newest-first within CONTEXT_USER_MESSAGES_BUDGET (kept in original order)."""
+    msgs = [str(m) for m in (state.get("user_query", []) or [])]
+    kept = fit_newest_first(msgs, get_settings().context_user_messages_budget)
+    _record(f"{agent}.user_messages", "\n".join(kept))
+    return kept
+
+
+# ---- rolling summary (CONTEXT_ROLLING_SUMMARY) ----
+
+def _summary_messages(summary: str, aged: List[Dict[str, Any]]):
+    turns = "\n\n".join(turn_block(t) for t in aged)
+    return [
+        SystemMessage(content="You maintain a running summary of a property-search conversation."),
+        HumanMessage(
+            content=f"""
+Update the summary with the new turns. Keep it under 200 words.
+Keep the user's stated requirements (city, budget, size, type) and how they changed.
+Name the properties the user showed interest in, with their key numbers.
+Drop pleasantries and anything repeated.
+
+Current summary:
+{summary or "(none)"}
+
+New turns:
+{turns}
+""",
+        ),
+    ]
+
+
+def _aged_turns(state: RecommendationState):
+    s = get_settings()
+    turns = state.get("turn_log", []) or []
+    summarized = state.get("summarized_turns") or 0
+    cut = len(turns) - s.context_recent_turns
+    if not s.context_rolling_summary or cut <= summarized:
+        return None, summarized
+    return turns[summarized:cut], cut
+
+
+def rolling_summary_update(state: RecommendationState) -> Dict[str, Any]:
+    """Fold turns that left the recent window into ``conversation_summary``."""
+    aged, cut = _aged_turns(state)
+    if not aged:
+        return {}
+    answer = get_chat_model().invoke(_summary_messages(state.get("conversation_summary") or "", aged))
+    metrics.incr("context.summaries")
+    return {"conversation_summary": getattr(answer, "content", str(answer)), "summarized_turns": cut}
+
+
+async def arolling_summary_update(state: RecommendationState) -> Dict[str, Any]:
+    aged, cut = _aged_turns(state)
+    if not aged:
+        return {}
+    answer = await get_chat_model().ainvoke(_summary_messages(state.get("conversation_summary") or "", aged))
+    metrics.incr("context.summaries")
+    return {"conversation_summary": getattr(answer, "content", str(answer)), "summarized_turns": cut}
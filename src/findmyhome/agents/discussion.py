@@ -3,14 +3,15 @@ from __future__ import annotations
 from langchain_core.messages import HumanMessage, SystemMessage
 
 from findmyhome.config import get_chat_model
+from .context import conversation_context
 from .state import RecommendationState
 from langgraph.prebuilt.chat_agent_executor import create_react_agent
 
 
-def discussion_agent(state: RecommendationState):
+def _discussion_messages(state: RecommendationState):
     msgs = state.get("user_query", []) or []
     last_human_text: str = msgs[-1] if msgs else ""
-    previous_conversation = state.get("turn_log", []) or []
+    previous_conversation = conversation_context(state, "discussion")
 
     messages = [
         SystemMessage(content="""You are a discussion agent that answers user queries based on previously shown property recommendations by graphdb agent and the converation might also include your previous responses.
@@ -40,8 +41,10 @@ def discussion_agent(state: RecommendationState):
             {previous_conversation}
         """),
     ]
+    return last_human_text, messages
+
 
-    response = get_chat_model().invoke(messages)
+def _discussion_update(last_human_text: str, response) -> dict:
     response_text = getattr(response, "content", str(response))
 
     return {
@@ -57,3 +60,12 @@ def discussion_agent(state: RecommendationState):
         ],
     }
 
+
+def discussion_agent(state: RecommendationState):
+    last_human_text, messages = _discussion_messages(state)
+    return _discussion_update(last_human_text, get_chat_model().invoke(messages))
+
+
+async def adiscussion_agent(state: RecommendationState):
+    last_human_text, messages = _discussion_messages(state)
+    return _discussion_update(last_human_text, await get_chat_model().ainvoke(messages))
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+from .state import QueryEnhancer
+
+# Rule-based counterpart of the query_enhancer prompt: same allowed values, the
+# same city/locality mapping and the same currency/area normalisation. It only
+# answers when every word of the query is accounted for; anything else (free
+# text such as "with a garden", references to earlier turns, ranges it has no
+# column for) returns None and goes to the LLM.
+
+CITY_ALIASES: Dict[str, str] = {
+    "new delhi": "New Delhi", "newdelhi": "New Delhi", "delhi": "New Delhi",
+    "south delhi": "New Delhi", "north delhi": "New Delhi", "east delhi": "New Delhi", "west delhi": "New Delhi",
+    "bangalore": "Bangalore", "bengaluru": "Bangalore", "banglore": "Bangalore", "bangaluru": "Bangalore", "blr": "Bangalore",
+    "mumbai": "Mumbai", "bombay": "Mumbai",
+    "thane": "Thane",
+    "pune": "Pune",
+    "hyderabad": "Hyderabad", "hyd": "Hyderabad",
+    "chennai": "Chennai", "madras": "Chennai",
+    "kolkata": "Kolkata", "calcutta": "Kolkata",
+}
+
+# locality -> (city, display name); the locality is kept as "near <locality>"
+LOCALITIES: Dict[str, Tuple[str, str]] = {
+    # NCR
+    "gurgaon": ("New Delhi", "Gurgaon"), "gurugram": ("New Delhi", "Gurugram"),
+    "greater noida": ("New Delhi", "Greater Noida"), "noida": ("New Delhi", "Noida"),
+    "ghaziabad": ("New Delhi", "Ghaziabad"), "faridabad": ("New Delhi", "Faridabad"),
+    "dwarka": ("New Delhi", "Dwarka"), "saket": ("New Delhi", "Saket"),
+    "rohini": ("New Delhi", "Rohini"), "pitampura": ("New Delhi", "Pitampura"),
+    # Mumbai region
+    "navi mumbai": ("Mumbai", "Navi Mumbai"),
+    # Pune region
+    "pimpri chinchwad": ("Pune", "Pimpri Chinchwad"), "pimpri": ("Pune", "Pimpri"),
+    "chinchwad": ("Pune", "Chinchwad"), "pcmc": ("Pune", "PCMC"),
+    "hinjewadi": ("Pune", "Hinjewadi"), "hinjawadi": ("Pune", "Hinjawadi"), "wakad": ("Pune", "Wakad"),
+    # Hyderabad region
+    "secunderabad": ("Hyderabad", "Secunderabad"), "gachibowli": ("Hyderabad", "Gachibowli"),
+    "hitec city": ("Hyderabad", "HITEC City"), "hitech city": ("Hyderabad", "HITEC City"), "hitec": ("Hyderabad", "HITEC City"),
+    # Bangalore region
+    "whitefield": ("Bangalore", "Whitefield"), "electronic city": ("Bangalore", "Electronic City"),
+    "hsr layout": ("Bangalore", "HSR Layout"), "hsr": ("Bangalore", "HSR Layout"), "koramangala": ("Bangalore", "Koramangala"),
+    # Chennai region
+    "tambaram": ("Chennai", "Tambaram"), "velachery": ("Chennai", "Velachery"),
+    "omr": ("Chennai", "OMR"), "ecr": ("Chennai", "ECR"),
+    # Kolkata region
+    "howrah": ("Kolkata", "Howrah"), "salt lake": ("Kolkata", "Salt Lake"),
+    "new town": ("Kolkata", "New Town"), "rajarhat": ("Kolkata", "Rajarhat"),
+}
+
+PROPERTY_TYPES: Dict[str, str] = {
+    "independent houses": "Independent House", "independent house": "Independent House",
+    "apartments": "Flat", "apartment": "Flat", "flats": "Flat", "flat": "Flat",
+    "villas": "Villa", "villa": "Villa",
+    "studio apartments": "Studio", "studio apartment": "Studio", "studios": "Studio", "studio": "Studio",
+}
+
+PLURALS = {"Flat": "Flats", "Villa": "Villas", "Studio": "Studios", "Independent House": "Independent Houses"}
+
+UNITS = {
+    "cr": 10_000_000, "crore": 10_000_000, "crores": 10_000_000,
+    "l": 100_000, "lakh": 100_000, "lakhs": 100_000, "lac": 100_000, "lacs": 100_000,
+    "k": 1_000, "thousand": 1_000,
+}
+
+# words that carry no filter; anything else left over means the LLM is needed
+FILLER = set("""
+a an the i me my we us our am is are be looking look for find show give get need want wanted
+search searching suggest recommend recommendations please can could would you some any all
+in at of on with having has have and or to from near around within only just
+property properties home homes option options listing listings place places unit units
+price priced budget cost area size sq ft sqft rs inr
+""".split())
+
+_NUM = r"(\d+(?:\.\d+)?)"
+_PRICE = re.compile(
+    r"\b(?:under|below|less than|upto|up to|within|max(?:imum)?|not more than|budget(?: of)?|at most)\s*"
+    r"(?:₹|rs\.?|inr)?\s*" + _NUM + r"\s*(cr|crores?|lakhs?|lacs?|l|k|thousand)?\b"
+)
+_AREA = re.compile(
+    r"(?:\b(?:above|over|more than|at least|atleast|min(?:imum)?(?: of)?|greater than|bigger than)\s*)?"
+    r"(?<![\d.])(\d+)\s*\+?\s*(?:sq\.?\s*ft\.?|sqft|sq\s*feet|square\s*feet|sft)(?:\s*\+)?"
+)
+_ROOMS = re.compile(r"(?<![\d.])(\d+)\s*-?\s*(bhk|rk|bh|r|b)\b")
+_BEDROOMS = re.compile(r"(?<![\d.])(\d+)\s*(?:bed|beds|bedroom|bedrooms)\b")
+_BATHS = re.compile(r"(?<![\d.])(\d+)\s*(?:bath|baths|bathroom|bathrooms)\b")
+_NO_BALCONY = re.compile(r"\b(?:without|no)\s*(?:a\s*)?balcon(?:y|ies)\b")
+_BALCONY = re.compile(r"\b(?:with\s*)?(?:a\s*)?balcon(?:y|ies)\b")
+
+_PREF_BUDGET = re.compile(r"Budget:\s*₹?\s*([\d,]+)\s*to\s*₹?\s*([\d,]+)")
+_PREF_AREA = re.compile(r"Area:\s*(\d+)\s*to\s*(\d+)\s*sq ft")
+_PREF_CITIES = re.compile(r"Preferred cities:\s*(.*)")
+
+
+def _alias_pattern(names) -> re.Pattern:
+    # longest first so "navi mumbai" wins over "mumbai"
+    alternatives = "|".join(re.escape(n) for n in sorted(names, key=len, reverse=True))
+    return re.compile(r"\b(" + alternatives + r")\b")
+
+
+_CITY_RE = _alias_pattern(CITY_ALIASES)
+_LOCALITY_RE = _alias_pattern(LOCALITIES)
+_TYPE_RE = _alias_pattern(PROPERTY_TYPES)
+
+
+def format_price(amount: int) -> str:
+    if amount >= UNITS["cr"]:
+        return f"{amount / UNITS['cr']:g} crore"
+    if amount >= UNITS["l"]:
+        return f"{amount / UNITS['l']:g} lakh"
+    return f"₹{amount:,}"
+
+
+class _Text:
+    """Lower-cased query with matched spans blanked out as they are consumed."""
+
+    def __init__(self, text: str):
+        self.value = " " + re.sub(r"\s+", " ", text.lower().replace(",", "")) + " "
+
+    def take(self, pattern: re.Pattern) -> List[re.Match]:
+        matches = list(pattern.finditer(self.value))
+        for m in matches:
+            self.value = self.value[: m.start()] + " " * (m.end() - m.start()) + self.value[m.end():]
+        return matches
+
+    def leftover(self) -> List[str]:
+        return [w for w in re.findall(r"[a-z0-9₹.+]+", self.value) if w.strip(".+") and w.strip(".+") not in FILLER]
+
+
+def parse_preferences(prefs: str) -> Optional[Dict[str, object]]:
+    """Read the saved-preferences memory written by ``store_user_preferences``."""
+    budget, area, cities = _PREF_BUDGET.search(prefs), _PREF_AREA.search(prefs), _PREF_CITIES.search(prefs)
+    if not (budget and area and cities):
+        return None
+    names = [c.strip() for c in cities.group(1).split(",") if c.strip()]
+    canonical = {CITY_ALIASES.get(n.lower()) for n in names}
+    return {
+        "max_price": int(budget.group(2).replace(",", "")),
+        "min_area": int(area.group(1)),
+        "city": canonical.pop() if len(canonical) == 1 and None not in canonical else None,
+    }
+
+
+def parse_filters(query: str, has_history: bool = False, prefs: Optional[str] = None) -> Optional[QueryEnhancer]:
+    """Return the ``QueryEnhancer`` for ``query`` if it can be parsed completely, else ``None``.
+
+    Follow-ups without a city (``has_history``) depend on earlier turns and are
+    left to the LLM. Saved ``prefs`` fill price, area and city when the query
+    does not set them, as the prompt instructs; unreadable prefs defer too.
+    """
+    if not query or not query.strip():
+        return None
+    text = _Text(query)
+
+    # localities first so "navi mumbai" is not read as "navi" + Mumbai
+    localities = {LOCALITIES[m.group(1)] for m in text.take(_LOCALITY_RE)}
+    cities = {CITY_ALIASES[m.group(1)] for m in text.take(_CITY_RE)}
+    cities |= {city for city, _ in localities}
+    if len(cities) > 1 or len(localities) > 1:
+        return None
+    city = next(iter(cities), None)
+    locality = next(iter(localities), (None, None))[1]
+
+    fields: Dict[str, object] = {"city": city}
+
+    prices = text.take(_PRICE)
+    if len(prices) > 1:
+        return None
+    if prices:
+        number, unit = float(prices[0].group(1)), prices[0].group(2)
+        if unit is None and number < 10_000:
+            return None  # "under 80" - lakh or crore? ask the LLM
+        fields["max_price"] = int(round(number * UNITS.get(unit, 1)))
+
+    areas = text.take(_AREA)
+    if len(areas) > 1:
+        return None
+    if areas:
+        fields["min_area"] = int(areas[0].group(1))
+
+    rooms = text.take(_ROOMS)
+    bedrooms = text.take(_BEDROOMS)
+    if len(rooms) + len(bedrooms) > 1:
+        return None
+    if rooms:
+        fields["min_beds"] = int(rooms[0].group(1))
+        kind = rooms[0].group(2)
+        fields["room_type"] = "BHK" if kind == "b" else kind.upper()
+    elif bedrooms:
+        fields["min_beds"] = int(bedrooms[0].group(1))
+
+    baths = text.take(_BATHS)
+    if len(baths) > 1:
+        return None
+    if baths:
+        fields["min_baths"] = int(baths[0].group(1))
+
+    if text.take(_NO_BALCONY):
+        fields["has_balcony"] = False
+    if text.take(_BALCONY):
+        if fields.get("has_balcony") is False:
+            return None
+        fields["has_balcony"] = True
+
+    types = {PROPERTY_TYPES[m.group(1)] for m in text.take(_TYPE_RE)}
+    if len(types) > 1:
+        return None
+    fields["property_type"] = next(iter(types), None)
+    # the prompt's own example maps a bare "2 bhk" to a Flat
+    if fields["property_type"] is None and fields.get("room_type") == "BHK":
+        fields["property_type"] = "Flat"
+
+    if text.leftover():
+        return None
+    if city is None and has_history:
+        return None
+    if len([v for v in fields.values() if v is not None]) == 0:
+        return None
+
+    if prefs:
+        saved = parse_preferences(prefs)
+        if saved is None:
+            return None
+        for key, value in saved.items():
+            if fields.get(key) is None and value is not None:
+                fields[key] = value
+
+    fields["enhanced_user_query"] = _enhanced_query(fields, locality)
+    return QueryEnhancer(**fields)
+
+
+def _enhanced_query(fields: Dict[str, object], locality: Optional[str]) -> str:
+    parts: List[str] = []
+    if fields.get("min_beds") and fields.get("room_type"):
+        parts.append(f"{fields['min_beds']} {fields['room_type']}")
+    ptype = fields.get("property_type")
+    parts.append(PLURALS[ptype] if ptype else "Properties")
+    if fields.get("city"):
+        parts.append(f"in {fields['city']}")
+    if locality:
+        parts.append(f"near {locality}")
+    if fields.get("max_price"):
+        parts.append(f"priced under {format_price(fields['max_price'])}")
+
+    extras: List[str] = []
+    if fields.get("min_beds") and not fields.get("room_type"):
+        extras.append(f"at least {fields['min_beds']} bedrooms")
+    if fields.get("min_baths"):
+        extras.append(f"at least {fields['min_baths']} bathrooms")
+    if fields.get("min_area"):
+        extras.append(f"a minimum area of {fields['min_area']} sq ft")
+    if fields.get("has_balcony") is True:
+        extras.append("a balcony")
+    query = " ".join(parts)
+    if extras:
+        query += " with " + " and ".join(extras)
+    if fields.get("has_balcony") is False:
+        query += " without a balcony"
+    return query
@@ -1,12 +1,24 @@
 from __future__ import annotations
 
-from typing import Dict, List
+import re
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables.config import RunnableConfig
 
-from findmyhome.config import get_chat_model, get_graph
+from findmyhome.config import (
+    get_chat_model, get_cypher_template_cache, get_graph, get_result_cache, get_settings, arun_cypher,
+)
+from findmyhome.cypher_cache import intent_shape, parameterize, template_params
+from findmyhome.filters import compile_filters, keyset_cypher, price_key
+from findmyhome.graph_store import get_schema_cache
+from findmyhome.metrics import metrics
 from .state import RecommendationState
-from langchain_neo4j import GraphCypherQAChain
+from .turn_context import aturn_context, turn_context
+
+if TYPE_CHECKING:  # neo4j_graphrag/langchain_neo4j are imported on first use; they dominate import time
+    from langchain_neo4j import GraphCypherQAChain
 
 
 CYPHER_GENERATION_TEMPLATE = """Generate a single Cypher query for Neo4j.
@@ -59,40 +71,116 @@ Question:
 """
 
 
+_LIMIT = re.compile(r"\bLIMIT\b", re.IGNORECASE)
+
 CYPHER_PROMPT = PromptTemplate(input_variables=["question"], template=CYPHER_GENERATION_TEMPLATE)
 
+# The chain bakes the schema string and the Cypher validator in at construction,
+# so it is rebuilt only when the shared schema snapshot changes. Unless GRAPH_QA
+# is on, it stops after executing the Cypher (return_direct): the rows go
+# straight to accumulative_query_results, which writes the only summary.
+_chain_lock = threading.Lock()
+_cached_chain: Optional[Tuple[int, GraphCypherQAChain]] = None
+
+
+def get_cypher_chain() -> GraphCypherQAChain:
+    global _cached_chain
+    schema_cache = get_schema_cache(enhanced_schema=True)
+    schema_cache.get_graph()
+    with _chain_lock:
+        if _cached_chain is None or _cached_chain[0] != schema_cache.version:
+            from langchain_neo4j import GraphCypherQAChain
+
+            model = get_chat_model(temperature=0.5)
+            # from_llm reads the graph's structured schema more than once; no refresh may land in between
+            with schema_cache.reading() as graphdb:
+                chain = GraphCypherQAChain.from_llm(
+                    graph=graphdb,
+                    llm=model,
+                    cypher_prompt=CYPHER_PROMPT,
+                    verbose=True,
+                    validate_cypher=True,
+                    allow_dangerous_requests=True,
+                    return_intermediate_steps=True,
+                    return_direct=not get_settings().graph_qa,
+                    top_k=10,
+                )
+                _cached_chain = (schema_cache.version, chain)
+        return _cached_chain[1]
+
 
-def graph_db_agent(state: RecommendationState):
+def _query_used(state: RecommendationState) -> str:
     msgs = state.get("user_query", []) or []
     last_human_text: str = msgs[-1] if msgs else ""
     qc = state.get("query_correction") or ""
-    query_used = qc if qc else last_human_text
-
-    # Build chain
-
-    graphdb = get_graph(enhanced_schema=True)
-    model = get_chat_model(temperature=0.5)
-    chain = GraphCypherQAChain.from_llm(
-        graph=graphdb,
-        llm=model,
-        cypher_prompt=CYPHER_PROMPT,
-        verbose=True,
-        validate_cypher=True,
-        allow_dangerous_requests=True,
-        return_intermediate_steps=True,
-        top_k=10,
-    )
+    return qc if qc else last_human_text
 
-    response: Dict = chain.invoke({"query": query_used})
-    answer = response.get("result") or "No answer."
-    steps: List = response.get("intermediate_steps") or []
-    ctx_step = next((s for s in steps if isinstance(s, dict) and "context" in s), {})
-    generated_graph_query = next(
-        (s["query"] for s in steps if isinstance(s, dict) and "query" in s),
-        "",
-    )
-    recommended_props = ctx_step.get("context", [])
 
+def _rows_answer(rows: List) -> str:
+    # stands in for the QA answer when the chain returns rows directly
+    return f"Found {len(rows)} matching properties." if rows else "No answer."
+
+
+def _parsed_intent(ctx: Dict):
+    """This turn's rule-parsed filters (the same parse query_enhancer hands to SQL), else ``None``."""
+    s = get_settings()
+    if not (s.graph_compiled_filters or s.cypher_template_cache):
+        return None
+    return ctx["parsed_filters"]
+
+
+def _template_key(intent, chain: GraphCypherQAChain) -> Optional[str]:
+    """Template cache key for ``intent`` (or ``None`` when it has no cacheable shape)."""
+    if intent is None or not get_settings().cypher_template_cache:
+        return None
+    key = intent_shape(intent, chain.graph_schema)
+    if key is None:
+        metrics.incr("cypher_template.ineligible")
+    return key
+
+
+def _limited(cypher: str, top_k: int) -> str:
+    return cypher if _LIMIT.search(cypher) else f"{cypher}\nLIMIT {int(top_k)}"
+
+
+def _first_page(cypher: str, params: Dict, top_k: int) -> Tuple[str, Dict, Optional[str]]:
+    """Statement and params for this turn's rows, plus the keyset statement "more" pages with (if any)."""
+    page = keyset_cypher(cypher)
+    if page is None:
+        return _limited(cypher, top_k), params, None
+    return page, {**params, "after_price": None, "after_id": None, "limit": int(top_k)}, page
+
+
+def _compiled(intent) -> Optional[Tuple[str, Dict]]:
+    """Cypher compiled from the filters with the same semantics as the SQL side; no LLM call.
+
+    Only for intents with filters and no free text. A locality still needs the
+    LLM to map it onto neighbourhoods; those intents go to the template cache.
+    """
+    if intent is None or not get_settings().graph_compiled_filters:
+        return None
+    if " near " in (intent.enhanced_user_query or ""):
+        return None
+    compiled = compile_filters(intent)
+    if not compiled.shape:
+        return None
+    metrics.incr("graph.compiled_filters")
+    return compiled.cypher, compiled.cypher_params
+
+
+def _remember_template(key: Optional[str], generated_graph_query: str, intent, rows: List) -> None:
+    # only Cypher that validated and actually returned rows becomes a template
+    if key is None or not generated_graph_query or not rows:
+        return
+    template = parameterize(generated_graph_query, intent)
+    if template is None:
+        metrics.incr("cypher_template.not_reusable")
+        return
+    get_cypher_template_cache().set(key, template)
+
+
+def _graph_update(answer: str, generated_graph_query: str, recommended_props: List, params: Optional[Dict] = None,
+                  page_query: Optional[str] = None) -> Dict:
     prop_ids: List[str] = []
     seen = set()
     for item in recommended_props:
@@ -101,10 +189,113 @@ def graph_db_agent(state: RecommendationState):
             seen.add(pid)
             prop_ids.append(str(pid))
 
+    last = next((item["p"] for item in reversed(recommended_props) if isinstance(item.get("p"), dict)), None)
+    if page_query is not None and last is not None:
+        # this page came back in keyset order; "more" seeks past its last row
+        cursor = {"price": price_key(last), "id": str(last.get("id"))}
+    else:
+        # a free-form page came back unordered, so it is excluded, not seeked past
+        cursor = {"exclude": prop_ids}
+
     return {
         "graph_db_agent": [answer],
         "graph_raw_history": [recommended_props],
         "previous_generated_graph_query": generated_graph_query,
+        # bound values when the query above is a cached template; "more" re-runs it with them
+        "previous_graph_query_params": params or {},
+        # compiled/template Cypher with the keyset appended; None sends "more" through CALL {}
+        "previous_graph_page_query": page_query,
         "graph_property_id_shown": prop_ids,
+        # a new result set restarts "more" paging
+        "graph_cursor": cursor,
     }
 
+
+def graph_db_agent(state: RecommendationState, config: RunnableConfig):
+    query_used = _query_used(state)
+
+    chain = get_cypher_chain()
+    intent = _parsed_intent(turn_context(state, config))
+    direct = _compiled(intent)
+    key = None
+    if direct is None:
+        key = _template_key(intent, chain)
+        template = get_cypher_template_cache().get(key) if key else None
+        if template:
+            direct = template, template_params(intent)
+    if direct is not None:
+        cypher, params = direct
+        q, bound, page = _first_page(cypher, params, chain.top_k)
+        recommended_props = get_result_cache().get_or_load(
+            "graph", {"cypher": q, "params": bound}, lambda: get_graph().query(q, params=bound)
+        )[: chain.top_k]
+        if chain.return_direct:
+            answer = _rows_answer(recommended_props)
+        else:
+            answer = chain.qa_chain.invoke({"question": query_used, "context": recommended_props}) or "No answer."
+        return _graph_update(answer, cypher, recommended_props, params, page)
+
+    response: Dict = chain.invoke({"query": query_used})
+    steps: List = response.get("intermediate_steps") or []
+    generated_graph_query = next(
+        (s["query"] for s in steps if isinstance(s, dict) and "query" in s),
+        "",
+    )
+    if chain.return_direct:
+        recommended_props = response.get("result") or []
+        answer = _rows_answer(recommended_props)
+    else:
+        answer = response.get("result") or "No answer."
+        ctx_step = next((s for s in steps if isinstance(s, dict) and "context" in s), {})
+        recommended_props = ctx_step.get("context", [])
+
+    _remember_template(key, generated_graph_query, intent, recommended_props)
+    return _graph_update(answer, generated_graph_query, recommended_props)
+
+
+async def agraph_db_agent(state: RecommendationState, config: RunnableConfig):
+    """Async twin of ``graph_db_agent``.
+
+    ``GraphCypherQAChain`` has no native async path (its ``ainvoke`` runs the
+    sync chain in a thread), so the same steps are driven here: generate the
+    Cypher with the chain's prompt, validate it, run it on the async driver and
+    hand the rows to the chain's QA prompt.
+    """
+    query_used = _query_used(state)
+
+    chain = get_cypher_chain()
+    intent = _parsed_intent(await aturn_context(state, config))
+    direct = _compiled(intent)
+    key = None
+    if direct is None:
+        key = _template_key(intent, chain)
+        template = get_cypher_template_cache().get(key) if key else None
+        if template:
+            direct = template, template_params(intent)
+    if direct is not None:
+        cypher, params = direct
+        q, bound, page = _first_page(cypher, params, chain.top_k)
+        recommended_props = (await get_result_cache().aget_or_load(
+            "graph", {"cypher": q, "params": bound}, lambda: arun_cypher(q, bound)
+        ))[: chain.top_k]
+        if chain.return_direct:
+            answer = _rows_answer(recommended_props)
+        else:
+            answer = await chain.qa_chain.ainvoke({"question": query_used, "context": recommended_props}) or "No answer."
+        return _graph_update(answer, cypher, recommended_props, params, page)
+
+    from neo4j_graphrag.retrievers.text2cypher import extract_cypher
+
+    generated = await chain.cypher_generation_chain.ainvoke({"question": query_used, "schema": chain.graph_schema})
+    generated_graph_query = extract_cypher(generated)
+    if chain.cypher_query_corrector:
+        generated_graph_query = chain.cypher_query_corrector(generated_graph_query)
+
+    recommended_props = (await arun_cypher(generated_graph_query))[: chain.top_k] if generated_graph_query else []
+    if chain.return_direct:
+        answer = _rows_answer(recommended_props)
+    else:
+        answer = await chain.qa_chain.ainvoke({"question": query_used, "context": recommended_props}) or "No answer."
+
+    _remember_template(key, generated_graph_query, intent, recommended_props)
+    return _graph_update(answer, generated_graph_query, recommended_props)
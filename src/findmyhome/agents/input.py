@@ -5,13 +5,14 @@ from typing import List
 from langchain_core.messages import HumanMessage, SystemMessage
 
 from findmyhome.config import get_chat_model
+from .context import conversation_context, user_messages_context
 from .state import InputEvaluation, RecommendationState
 
 
-def input_agent(state: RecommendationState):
+def _input_messages(state: RecommendationState):
     msgs = state.get("user_query", []) or []
     last_human_text: str = msgs[-1] if msgs else ""
-    all_user_messages: List[str] = msgs[:]
+    all_user_messages: List[str] = user_messages_context(state, "input_agent")
 
     messages = [
         SystemMessage(content="You are an input evaluator agent"),
@@ -57,17 +58,27 @@ def input_agent(state: RecommendationState):
         """,
         )
     ]
+    return messages
+
 
+def input_agent(state: RecommendationState):
     model = get_chat_model()
     input_evaluator_agent = model.with_structured_output(InputEvaluation)
-    response = input_evaluator_agent.invoke(messages)
+    response = input_evaluator_agent.invoke(_input_messages(state))
     return {"input_agent": response.evaluation}
 
 
-def invalid_agent(state: RecommendationState):
+async def ainput_agent(state: RecommendationState):
+    model = get_chat_model()
+    input_evaluator_agent = model.with_structured_output(InputEvaluation)
+    response = await input_evaluator_agent.ainvoke(_input_messages(state))
+    return {"input_agent": response.evaluation}
+
+
+def _invalid_messages(state: RecommendationState):
     msgs = state.get("user_query", []) or []
     last_human_text: str = msgs[-1] if msgs else ""
-    previous_conversation = state.get("turn_log", []) or []
+    previous_conversation = conversation_context(state, "invalid_query")
 
     messages = [
         SystemMessage(content="You are an agent who recieves the invalid user query"),
@@ -97,8 +108,15 @@ This is the context of the previous conversation, take the previous conversation
 """,
         )
     ]
+    return messages
 
-    model = get_chat_model()
-    response = model.invoke(messages)
+
+def invalid_agent(state: RecommendationState):
+    response = get_chat_model().invoke(_invalid_messages(state))
+    return {"invalid": response.content}
+
+
+async def ainvalid_agent(state: RecommendationState):
+    response = await get_chat_model().ainvoke(_invalid_messages(state))
     return {"invalid": response.content}
 
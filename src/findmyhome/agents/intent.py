@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from findmyhome.config import embed_query, embed_texts, aembed_query, aembed_texts, get_intent_classifier, get_settings
+from findmyhome.intent import IntentDecision, record
+from .state import RecommendationState
+
+
+def _query(state: RecommendationState):
+    msgs = state.get("user_query", []) or []
+    last_human_text: str = msgs[-1] if msgs else ""
+    return last_human_text, bool(state.get("turn_log"))
+
+
+def _intent_update(decision: Optional[IntentDecision]):
+    if decision is None:
+        return {"intent_fast_path": "fallback"}
+    # same fields the router fills, so the rest of the graph cannot tell the difference
+    update = {
+        "intent_fast_path": decision.label,
+        "router_evaluation": decision.label,
+        "input_agent": "invalid" if decision.label == "invalid" else "valid",
+    }
+    if decision.label != "invalid":
+        update["supervisor_evaluation"] = decision.label
+    return update
+
+
+def intent_classifier_agent(state: RecommendationState):
+    text, has_history = _query(state)
+    classifier = get_intent_classifier()
+    embed = None
+    if get_settings().intent_nearest_neighbour:
+        if classifier.needs_examples():
+            classifier.load_example_vectors(embed_texts(classifier.example_texts()))
+        embed = embed_query
+    return _intent_update(classifier.classify(text, has_history, embed))
+
+
+async def aintent_classifier_agent(state: RecommendationState):
+    text, has_history = _query(state)
+    classifier = get_intent_classifier()
+    decision = classifier.match_rules(text, has_history)
+    if decision is None and text and get_settings().intent_nearest_neighbour:
+        if classifier.needs_examples():
+            classifier.load_example_vectors(await aembed_texts(classifier.example_texts()))
+        decision = classifier.match_examples(await aembed_query(text), has_history)
+    record(decision)
+    return _intent_update(decision)
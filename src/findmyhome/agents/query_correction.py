@@ -5,22 +5,18 @@ from langchain_core.runnables.config import RunnableConfig
 
 from findmyhome.config import get_chat_model
 from .state import QueryEnhancer, RecommendationState
-from ..memory import get_user_preferences_memory
+from .turn_context import aturn_context, turn_context
 
 
-def query_correction_agent(state: RecommendationState, config: RunnableConfig):
+def _query_correction_messages(state: RecommendationState, ctx):
     msgs = state.get("user_query", []) or []
     last_human_text: str = msgs[-1] if msgs else ""
-    all_user_messages = msgs[:]
-
-    user_id = config.get("configurable", {}).get("user_id", "anonymous")
+    all_user_messages = ctx["user_messages"]
+    prefs = ctx["preferences"]
 
-    # Retrieve user preferences from memory
     user_preferences = ""
-    if user_id != "anonymous":
-        prefs = get_user_preferences_memory(user_id)
-        if prefs:
-            user_preferences = f"\n\n### User's Saved Preferences:\n{prefs}\n"
+    if prefs:
+        user_preferences = f"\n\n### User's Saved Preferences:\n{prefs}\n"
 
     messages = [
         SystemMessage(content="You are a query correction agent responsible for mapping user queries to structured graph-compatible queries."),
@@ -102,8 +98,16 @@ def query_correction_agent(state: RecommendationState, config: RunnableConfig):
         """,
         ),
     ]
+    return messages
+
 
-    model = get_chat_model()
-    response = model.invoke(messages)
+def query_correction_agent(state: RecommendationState, config: RunnableConfig):
+    ctx = turn_context(state, config)
+    response = get_chat_model().invoke(_query_correction_messages(state, ctx))
     return {"query_correction": response.content}
 
+
+async def aquery_correction_agent(state: RecommendationState, config: RunnableConfig):
+    ctx = await aturn_context(state, config)
+    response = await get_chat_model().ainvoke(_query_correction_messages(state, ctx))
+    return {"query_correction": response.content}
@@ -5,22 +5,18 @@ from langchain_core.runnables.config import RunnableConfig
 
 from findmyhome.config import get_chat_model
 from .state import QueryEnhancer, RecommendationState
-from ..memory import get_user_preferences_memory
+from .turn_context import aturn_context, turn_context
 
 
-def query_enhancer_agent(state: RecommendationState, config: RunnableConfig):
+def _query_enhancer_messages(state: RecommendationState, ctx):
     msgs = state.get("user_query", []) or []
     last_human_text: str = msgs[-1] if msgs else ""
-    all_user_messages = msgs[:]
-
-    user_id = config.get("configurable", {}).get("user_id", "anonymous")
+    all_user_messages = ctx["user_messages"]
+    prefs = ctx["preferences"]
 
-    # Retrieve user preferences from memory
     user_preferences = ""
-    if user_id != "anonymous":
-        prefs = get_user_preferences_memory(user_id)
-        if prefs:
-            user_preferences = f"\n\n### User's Saved Preferences:\n{prefs}\nUse these preferences to fill in missing details in the query.\n"
+    if prefs:
+        user_preferences = f"\n\n### User's Saved Preferences:\n{prefs}\nUse these preferences to fill in missing details in the query.\n"
 
     messages = [
         SystemMessage(content="You are a query enhancer agent responsible for enhancing and structuring the user query."),
@@ -154,9 +150,25 @@ Previous conversation for context:
 """,
         ),
     ]
+    return messages
+
+
+def query_enhancer_agent(state: RecommendationState, config: RunnableConfig):
+    # preferences, previous messages and the rule-parsed filters come from recommendation_node's preload
+    ctx = turn_context(state, config)
+    if ctx["parsed_filters"] is not None:
+        return {"query_enhancer": ctx["parsed_filters"]}
 
-    model = get_chat_model(temperature=0.5)
-    query_enhancer = model.with_structured_output(QueryEnhancer)
-    response = query_enhancer.invoke(messages)
+    query_enhancer = get_chat_model(temperature=0.5).with_structured_output(QueryEnhancer)
+    response = query_enhancer.invoke(_query_enhancer_messages(state, ctx))
     return {"query_enhancer": response}
 
+
+async def aquery_enhancer_agent(state: RecommendationState, config: RunnableConfig):
+    ctx = await aturn_context(state, config)
+    if ctx["parsed_filters"] is not None:
+        return {"query_enhancer": ctx["parsed_filters"]}
+
+    query_enhancer = get_chat_model(temperature=0.5).with_structured_output(QueryEnhancer)
+    response = await query_enhancer.ainvoke(_query_enhancer_messages(state, ctx))
+    return {"query_enhancer": response}
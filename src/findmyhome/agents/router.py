@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from typing import List
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from findmyhome.config import get_chat_model
+from findmyhome.metrics import metrics
+from .context import conversation_context, user_messages_context
+from .state import RecommendationState, RouterEvaluation
+
+
+def _router_messages(state: RecommendationState):
+    msgs = state.get("user_query", []) or []
+    last_human_text: str = msgs[-1] if msgs else ""
+    all_user_messages: List[str] = user_messages_context(state, "router")
+    previous_conversation = conversation_context(state, "router")
+
+    messages = [
+        SystemMessage(content="You are a router agent that validates and classifies the intent of the user query."),
+        HumanMessage(
+            content=f"""
+        You will receive a user query along with the previous user queries and the previous conversation context.
+
+        Classify the query into exactly one of these labels:
+
+        - **invalid** → The query is completely unrelated to real estate or property context (it may still be valid as a follow-up to earlier results, so check the history first). Queries about renting are also invalid.
+        - **recommendation** → The user is requesting new or updated property recommendations (e.g., changing location, budget, size, etc.).
+        - **discussion** → The user is asking a follow-up question about an existing property or seeking clarification based on previously shared results.
+        - **more** → The user is asking for more recommendations of properties like the ones already shown.
+
+        Examples of **invalid** queries:
+        - Who won the cricket match yesterday?
+        - Tell me a joke.
+        - Recommend a good laptop under 50,000.
+        - who are you?
+        - What you can do?
+        - Any query related to Rent.
+
+        Examples of **recommendation** queries:
+        - "Show me villas in South Delhi under 2 crores"
+        - "I want something under 1.5 Cr with 3 BHK"
+        - "Now show me options with a garden"
+
+        Examples of **discussion** queries:
+        - "What is the price per square foot of the second property?"
+        - "Which one had the highest maintenance charges?"
+        - "Are there good schools nearby the Rajpur Khurd property?"
+
+        Examples of **more** queries:
+        - "show me more properties"
+        - "is that all you have"
+        - "show me more similar to this"
+
+        Respond with **one word only**: `invalid`, `recommendation`, `discussion` or `more`
+
+        User query:
+        → {last_human_text}
+
+        All previous user queries:
+        {all_user_messages}
+
+        Previous conversation (question, response and the agent who answered):
+        {previous_conversation}
+        """,
+        ),
+    ]
+    return messages
+
+
+def _router_update(evaluation: str):
+    metrics.incr(f"routing.single.{evaluation}")
+    # also fill the two-stage fields so downstream readers see the same state shape
+    update = {"router_evaluation": evaluation, "input_agent": "invalid" if evaluation == "invalid" else "valid"}
+    if evaluation != "invalid":
+        update["supervisor_evaluation"] = evaluation
+    return update
+
+
+def router_agent(state: RecommendationState):
+    router = get_chat_model().with_structured_output(RouterEvaluation)
+    response = router.invoke(_router_messages(state))
+    return _router_update(response.evaluation)
+
+
+async def arouter_agent(state: RecommendationState):
+    router = get_chat_model().with_structured_output(RouterEvaluation)
+    response = await router.ainvoke(_router_messages(state))
+    return _router_update(response.evaluation)
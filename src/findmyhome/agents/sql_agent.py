@@ -1,11 +1,24 @@
 from __future__ import annotations
 
-from typing import List, Dict, Any, Optional, Union
-import numbers
+import logging
+from typing import List, Dict, Any, Optional, Tuple, Union
+
+import numpy as np
 from langchain_core.messages import HumanMessage, SystemMessage
-from findmyhome.config import get_azure_openai_client, get_pg_connection, get_settings, get_chat_model, get_graph, embed_query
+from findmyhome.config import (
+    get_azure_openai_client, get_pg_pool, get_async_pg_pool, get_settings, get_chat_model, get_graph,
+    get_result_cache, embed_query, aembed_query, arun_cypher,
+)
+from findmyhome.catalog_schema import acode_columns_ready, code_columns_ready, known_code_columns
+from findmyhome.filters import compile_filters, price_key, similarity_sql
+from findmyhome.property_record import PROMPT_LEGEND, cards, prompt_table
+from findmyhome.result_cache import vector_hash
+from findmyhome.vector_index import apgvector_version, order_by_score, pgvector_version, search_settings
+from .accumulate import publish_properties
 from .state import RecommendationState
 
+logger = logging.getLogger(__name__)
+
 
 def _enhancer_to_dict(enhancer: Any) -> Dict[str, Any]:
     if enhancer is None:
@@ -20,204 +33,268 @@ def _enhancer_to_dict(enhancer: Any) -> Dict[str, Any]:
         return enhancer
     return {}
 
-def query_database_agent(state: RecommendationState):
-    k = 10
+
+def _rows(cols: List[str], rows) -> List[Dict]:
+    return [dict(zip(cols, row)) for row in rows]
+
+
+def _query_vector(embedding: List[float]) -> np.ndarray:
+    """float32 buffer for the pgvector adapter registered on the pools (binary on psycopg 3)."""
+    return np.asarray(embedding, dtype=np.float32)
+
+
+def _rendered(cur, sql: str, params: List[Any]) -> str:
+    """The statement with its values inlined, only when LOG_RENDERED_SQL is on."""
+    if not get_settings().log_rendered_sql:
+        return sql
+    return cur.mogrify(sql, params).decode("utf-8")
+
+
+def _tune(cur, enh: Dict[str, Any]) -> None:
+    """Apply the per-query ANN settings (ef_search/probes, iterative scan) to this transaction."""
     s = get_settings()
+    if s.vector_index_method == "none":
+        return
+    for stmt in search_settings(s, enh, pgvector_version(cur)):
+        cur.execute(stmt)
 
-    enh = _enhancer_to_dict(state.get("query_enhancer"))
-    enhanced_user_query: str = enh.get("enhanced_user_query") or ""
-    city: Optional[str]         = enh.get("city")
-    has_balcony: Optional[bool] = enh.get("has_balcony")
-    min_beds: Optional[int]     = enh.get("min_beds")
-    max_price: Optional[float]  = enh.get("max_price")
-    min_baths: Optional[int]    = enh.get("min_baths")
-    min_area: Optional[float]   = enh.get("min_area")
-    property_type: Optional[str]= enh.get("property_type")
-    room_type: Optional[str]    = enh.get("room_type")
-
-    q_vec = embed_query(enhanced_user_query or "")
-
-    # ---- WHERE builder ----
-    where: List[str] = []
-    params: List[Any] = [q_vec]  # first %s used in SELECT score
-
-    if city:
-        where.append('"cityName" ILIKE %s')
-        params.append(f"%{city}%")
-
-    if has_balcony is not None:
-        where.append('"hasBalcony" = %s')
-        params.append(bool(has_balcony))
-
-    if isinstance(min_beds, numbers.Number):
-        where.append('beds >= %s')
-        params.append(int(min_beds))
-
-    if isinstance(min_baths, numbers.Number):
-        where.append('baths >= %s')
-        params.append(int(min_baths))
-
-    if isinstance(max_price, numbers.Number):
-        where.append('price <= %s')
-        params.append(float(max_price))
-
-    if isinstance(min_area, numbers.Number):
-        where.append('"totalArea" >= %s')
-        params.append(float(min_area))
-
-    if property_type:
-        # you already normalize upstream; equality is cleaner than ILIKE if canonicalized
-        where.append('property_type = %s')
-        params.append(property_type)
-
-    if room_type:
-        where.append('room_type = %s')
-        params.append(room_type)
-
-    where_sql = ("WHERE " + " AND ".join(where)) if where else ""
-
-    sql = f"""
-    SELECT
-      id, name, "cityName", beds, baths, price, "totalArea", "pricePerSqft",
-      room_type, property_type, "hasBalcony",
-      description,
-      description_embed <=> %s::float8[]::vector({s.embed_dim}) AS score
-    FROM properties
-    {where_sql}
-    ORDER BY description_embed <=> %s::float8[]::vector({s.embed_dim})
-    LIMIT %s
-    """.strip()
-
-    params_for_query = [params[0]]
-    if len(params) > 1:
-        params_for_query += params[1:]
-    params_for_query += [q_vec, k]
-
-    with get_pg_connection() as conn, conn.cursor() as cur:
-        cur.execute(sql, params_for_query)
-        cols = [c.name for c in cur.description]
-        results = [dict(zip(cols, row)) for row in cur.fetchall()]
-        generated_query = cur.mogrify(sql, params_for_query).decode("utf-8")
 
+async def _atune(cur, enh: Dict[str, Any]) -> None:
+    s = get_settings()
+    if s.vector_index_method == "none":
+        return
+    for stmt in search_settings(s, enh, await apgvector_version(cur)):
+        await cur.execute(stmt)
+
+
+def _coded(pool) -> bool:
+    """Filter on the code columns: CATALOG_FILTER_COLUMNS, and the migration has run (checked once)."""
+    if not get_settings().catalog_filter_columns:
+        return False
+    ready = known_code_columns()
+    if ready is None:
+        with pool.connection() as conn, conn.cursor() as cur:
+            ready = code_columns_ready(cur)
+    return ready
+
+
+async def _acoded() -> bool:
+    if not get_settings().catalog_filter_columns:
+        return False
+    ready = known_code_columns()
+    if ready is None:
+        pool = await get_async_pg_pool()
+        async with pool.connection() as conn, conn.cursor() as cur:
+            ready = await acode_columns_ready(cur)
+    return ready
+
+
+def _cache_parts(sql: str, params: List[Any], q_vec: np.ndarray) -> Dict[str, Any]:
+    """Result-cache key inputs: the statement plus its params, with the embedding
+    and the exclusion list reduced to order-independent hashes."""
+    vec_hash = vector_hash(q_vec)
+    normalized = []
+    for p in params:
+        if p is q_vec:
+            normalized.append(vec_hash)
+        elif isinstance(p, list):
+            normalized.append(sorted(map(str, p)))
+        else:
+            normalized.append(p)
+    return {"sql": sql, "params": normalized}
+
+
+def _database_query(enh: Dict[str, Any], q_vec: np.ndarray, k: int, coded: bool) -> Tuple[str, List[Any]]:
+    compiled = compile_filters(enh, coded=coded)
+    sql = similarity_sql(compiled.shape, coded, get_settings().embed_dim)
+    return sql, [q_vec] + compiled.sql_params + [k]
+
+
+def _key(row: Dict[str, Any]) -> Tuple[float, str]:
+    return float(row["score"]), str(row["id"])
+
+
+def _page_cursor(previous: Optional[Dict[str, Any]], sql_rows: List[Dict]) -> Optional[Dict[str, Any]]:
+    """Keyset cursor after a similarity page: the page's first ``(score, id)`` and the shown rows past it.
+
+    The next page seeks past the *first* row of this one, not the last, and
+    skips the ``overlap`` ids: under relaxed_order a page can come back out of
+    order, so a row the scan passed over inside this page's range is still
+    picked up. ``overlap`` holds only rows past the boundary (about one page),
+    so it does not grow with the thread.
+    """
+    scored = [r for r in sql_rows if isinstance(r, dict) and r.get("id") is not None and r.get("score") is not None]
+    if not scored:
+        return previous
+    score, pid = min(_key(r) for r in scored)
+    shown = [[pid_, score_] for pid_, score_ in (previous or {}).get("overlap") or []]
+    shown += [[str(r["id"]), float(r["score"])] for r in scored]
+    overlap = {p: s for p, s in shown if (s, p) > (score, pid)}
+    return {"score": score, "id": pid, "overlap": [[p, s] for p, s in overlap.items()]}
+
+
+def _sql_cursor(state: RecommendationState) -> Optional[Dict[str, Any]]:
+    cursor = state.get("sql_cursor")
+    if cursor is None or "overlap" not in cursor:
+        # checkpointed before keyset cursors; "more" falls back to the shown-id lists
+        return None
+    return cursor
+
+
+def _database_update(results: List[Dict], generated_query: str) -> Dict[str, Any]:
     recommended_ids = [row["id"] for row in results]
-    print("generated_query - ", generated_query)
+    logger.debug("generated_query - %s", generated_query)
 
     return {
         "database_generated_query": generated_query,
         "database_property_id_shown": recommended_ids,
         "database_responses": [results],
+        # a new result set restarts "more" paging
+        "sql_cursor": _page_cursor(None, results),
     }
 
 
-def more_recommendation(state: RecommendationState):
-    msgs = state.get("user_query", []) or []
-    last_human_text: str = msgs[-1] if msgs else ""
-    qc = state.get("query_correction") or ""
-    query_used = qc if qc else last_human_text
+def query_database_agent(state: RecommendationState):
+    k = 10
 
-    inner = (state.get("previous_generated_graph_query") or "").strip().rstrip(";")
-    graph_shown_ids = state.get("graph_property_id_shown") or []
-    sql_shown_ids = state.get("database_property_id_shown") or []
+    enh = _enhancer_to_dict(state.get("query_enhancer"))
+    enhanced_user_query: str = enh.get("enhanced_user_query") or ""
 
-    graph_exclude_all = sorted(set(map(str, graph_shown_ids)) | set(map(str, sql_shown_ids)))
-    limit = 10
+    q_vec = _query_vector(embed_query(enhanced_user_query or ""))
+    pool = get_pg_pool()
+    sql, params_for_query = _database_query(enh, q_vec, k, _coded(pool))
 
-    # 1) Graph query with exclude
-    recommended_props_graph: List[Dict] = []
-    graph_prop_ids: List[str] = []
-    if inner:
-        graphdb = get_graph()
-        q = f"""
+    generated_query = sql
+
+    def load():
+        nonlocal generated_query
+        with pool.connection() as conn, conn.cursor() as cur:
+            _tune(cur, enh)
+            pool.execute(cur, sql, params_for_query)
+            generated_query = _rendered(cur, sql, params_for_query)
+            return order_by_score(_rows([c.name for c in cur.description], cur.fetchall()))
+
+    results = get_result_cache().get_or_load("sql", _cache_parts(sql, params_for_query, q_vec), load)
+    return _database_update(results, generated_query)
+
+
+async def aquery_database_agent(state: RecommendationState):
+    k = 10
+
+    enh = _enhancer_to_dict(state.get("query_enhancer"))
+    enhanced_user_query: str = enh.get("enhanced_user_query") or ""
+
+    q_vec = _query_vector(await aembed_query(enhanced_user_query or ""))
+    sql, params_for_query = _database_query(enh, q_vec, k, await _acoded())
+
+    async def load():
+        pool = await get_async_pg_pool()
+        async with pool.connection() as conn, conn.cursor() as cur:
+            await _atune(cur, enh)
+            await cur.execute(sql, params_for_query)
+            return order_by_score(_rows([c.name for c in cur.description], await cur.fetchall()))
+
+    results = await get_result_cache().aget_or_load("sql", _cache_parts(sql, params_for_query, q_vec), load)
+    # psycopg 3 binds parameters server-side, so there is no rendered query text
+    return _database_update(results, sql)
+
+
+# ---- "more" recommendations ----
+
+def _more_graph_query(state: RecommendationState, limit: int) -> Tuple[str, Optional[str], Dict[str, Any]]:
+    """Next page of the previous graph query, keyset-paginated on (price DESC, id).
+
+    Compiled and template queries carry the keyset in the statement itself
+    (``previous_graph_page_query``). Free-form LLM Cypher is wrapped in
+    ``CALL {}`` and ordered outside it; its first page came back in the
+    query's own order, so those ids are excluded instead.
+    """
+    inner = (state.get("previous_generated_graph_query") or "").strip().rstrip(";")
+    if not inner:
+        return inner, None, {}
+    cursor = state.get("graph_cursor")
+    if cursor is None:
+        # thread checkpointed before cursors existed
+        cursor = {"exclude": state.get("graph_property_id_shown") or []}
+    # a cached template or compiled query carries $params; bind them alongside the page boundary
+    params = dict(state.get("previous_graph_query_params") or {})
+    params.update(after_price=cursor.get("price"), after_id=cursor.get("id"), limit=limit)
+
+    page = state.get("previous_graph_page_query")
+    if page:
+        return inner, page, params
+
+    q = f"""
         CALL {{
           {inner}
         }}
-        WITH DISTINCT p
-        WHERE size($exclude) = 0 OR NOT p.id IN $exclude
+        WITH DISTINCT p, coalesce(p.price, -1.0) AS price_key
+        WHERE NOT p.id IN $exclude
+          AND ($after_id IS NULL OR price_key < $after_price OR (price_key = $after_price AND p.id > $after_id))
         RETURN p
-        ORDER BY p.price DESC
+        ORDER BY price_key DESC, p.id
         LIMIT $limit
         """
-        result_graph = graphdb.query(q, params={"exclude": graph_exclude_all, "limit": limit}) or []
-        seen_g = set()
-        for item in result_graph:
-            pid = (item.get("p") or {}).get("id")
-            if pid and pid not in seen_g:
-                seen_g.add(pid)
-                graph_prop_ids.append(str(pid))
-        recommended_props_graph = result_graph
+    params["exclude"] = list(map(str, cursor.get("exclude") or []))
+    return inner, q, params
 
-    # 2) SQL with exclude
+
+def _graph_cursor(state: RecommendationState, result_graph: List[Dict]) -> Optional[Dict[str, Any]]:
+    cursor = dict(state.get("graph_cursor") or {})
+    last = next((item.get("p") for item in reversed(result_graph) if isinstance(item.get("p"), dict)), None)
+    if last is None:
+        return state.get("graph_cursor")
+    cursor.update(price=price_key(last), id=str(last.get("id")))
+    return cursor
+
+
+def _graph_ids(result_graph: List[Dict]) -> List[str]:
+    graph_prop_ids: List[str] = []
+    seen_g = set()
+    for item in result_graph:
+        pid = (item.get("p") or {}).get("id")
+        if pid and pid not in seen_g:
+            seen_g.add(pid)
+            graph_prop_ids.append(str(pid))
+    return graph_prop_ids
+
+
+def _more_enhancer(state: RecommendationState, last_human_text: str) -> Tuple[Dict[str, Any], str]:
     enh = state.get("query_enhancer") or {}
     if hasattr(enh, "dict"):
         enh = enh.dict()
 
     enhanced_user_query = enh.get("enhanced_user_query") or last_human_text
-    q_vec = embed_query(enhanced_user_query)
+    return enh, enhanced_user_query
 
-    s = get_settings()
-    where: List[str] = []
-    params: list = [q_vec]
-    city = enh.get("city")
-    has_balcony = enh.get("has_balcony")
-    min_beds = enh.get("min_beds")
-    max_price = enh.get("max_price")
-    min_baths = enh.get("min_baths")
-    min_area = enh.get("min_area")
-    property_type = enh.get("property_type")
-    room_type = enh.get("room_type")
-
-    if city:
-        where.append('"cityName" ILIKE %s');     params.append(f"%{city}%")
-    if has_balcony is not None:
-        where.append('"hasBalcony" = %s');       params.append(bool(has_balcony))
-    if min_beds is not None:
-        where.append('beds >= %s');              params.append(int(min_beds))
-    if min_baths is not None:
-        where.append('baths >= %s');             params.append(int(min_baths))
-    if max_price is not None:
-        where.append('price <= %s');             params.append(float(max_price))
-    if min_area is not None:
-        where.append('"totalArea" >= %s');       params.append(float(min_area))
-    if property_type:
-        where.append('property_type ILIKE %s');  params.append(f"%{property_type}%")
-    if room_type:
-        where.append('room_type ILIKE %s');      params.append(f"%{room_type}%")
-
-    # exclude ids
-    sql_exclude_ids = list(dict.fromkeys((state.get("database_property_id_shown") or []) + (state.get("graph_property_id_shown") or []) + graph_prop_ids))
-    if sql_exclude_ids:
-        where.append('NOT (id = ANY(%s))')
-        params.append(sql_exclude_ids)
 
-    where_sql = ("WHERE " + " AND ".join(where)) if where else ""
-    sql = f"""
-    SELECT
-      id, name, "cityName", beds, baths, price, "totalArea", "pricePerSqft",
-      room_type, property_type, "hasBalcony",
-      description,
-      description_embed <=> %s::float8[]::vector({s.embed_dim}) AS score
-    FROM properties
-    {where_sql}
-    ORDER BY description_embed <=> %s::float8[]::vector({s.embed_dim})
-    LIMIT %s
+def _more_sql_query(state: RecommendationState, enh: Dict[str, Any], q_vec: np.ndarray,
+                    graph_prop_ids: List[str], limit: int, coded: bool) -> Tuple[str, List[Any]]:
+    """Next similarity page: rows past the cursor's ``(score, id)`` boundary.
+
+    The only ids excluded are the cursor's overlap (about one page) and this
+    turn's graph rows, so page N costs what page 1 does.
     """
+    compiled = compile_filters(enh, coded=coded)
+    params: List[Any] = [q_vec] + compiled.sql_params
 
-    params_for_query = [params[0]]
-    if len(params) > 1:
-        params_for_query += params[1:]
-    params_for_query += [q_vec, limit]
+    cursor = _sql_cursor(state)
+    if cursor is not None:
+        params += [cursor["score"], cursor["id"]]
+        shown = [pid for pid, _ in cursor["overlap"]]
+    else:
+        shown = list(map(str, (state.get("database_property_id_shown") or []) + (state.get("graph_property_id_shown") or [])))
 
-    results_sql: List[Dict] = []
-    generated_query_sql = ""
-    with get_pg_connection() as conn, conn.cursor() as cur:
-        generated_query_sql = cur.mogrify(sql, params_for_query).decode("utf-8")
-        cur.execute(sql, params_for_query)
-        cols = [c.name for c in cur.description]
-        results_sql = [dict(zip(cols, row)) for row in cur.fetchall()]
+    sql_exclude_ids = list(dict.fromkeys(shown + graph_prop_ids))
+    if sql_exclude_ids:
+        params.append(sql_exclude_ids)
 
-    recommended_ids_sql = [r["id"] for r in results_sql]
+    sql = similarity_sql(compiled.shape, coded, get_settings().embed_dim,
+                         exclude=bool(sql_exclude_ids), after_score=cursor is not None)
+    return sql, params + [limit]
 
-    # 3) Combine
+
+def _unify(recommended_props_graph: List[Dict], results_sql: List[Dict]) -> List[Dict]:
     graph_props_flat: List[Dict] = []
     for item in recommended_props_graph:
         p = item.get("p") if isinstance(item, dict) else None
@@ -227,12 +304,11 @@ def more_recommendation(state: RecommendationState):
     db_by_id = {str(r["id"]): r for r in results_sql if isinstance(r, dict) and "id" in r}
     graph_by_id = {str(p.get("id")): p for p in graph_props_flat if p.get("id")}
     unified_ids = list(dict.fromkeys(list(db_by_id.keys()) + list(graph_by_id.keys())))
-    unified_properties = [db_by_id.get(pid, graph_by_id.get(pid)) for pid in unified_ids]
+    return [db_by_id.get(pid, graph_by_id.get(pid)) for pid in unified_ids]
 
-    # 4) Summarize
-    if unified_properties:
-        last_human_text = msgs[-1] if msgs else ""
-        messages = [
+
+def _more_summary_messages(last_human_text: str, unified_properties: List[Dict]):
+    return [
             SystemMessage(content="You are a recommendation agent that explains the results of the recommended properties."),
             HumanMessage(
                 content=f"""
@@ -248,23 +324,25 @@ These villas offer a range of options in terms of size, price, and amenities in
 
 Important Instructions:
 1. Explain about every property that is present in the recommendation (use bullets or numbering).
-2. Do not include the 'id' key/value in your final summary output.
-3. Do not disclose any internal systems or data sources.
+2. Do not disclose any internal systems or data sources.
 
 User query:
 {last_human_text}
 
-Recommended properties to the user (de-duplicated combined list):
-{unified_properties}
+Recommended properties to the user (de-duplicated combined list), {PROMPT_LEGEND}:
+{prompt_table(unified_properties)}
 """,
             ),
         ]
-        answer = get_chat_model().invoke(messages)
-        response_text = getattr(answer, "content", str(answer))
-    else:
-        response_text = "No properties found"
 
+
+def _more_update(state: RecommendationState, last_human_text: str, query_used: str, inner: str,
+                 recommended_props_graph: List[Dict], graph_prop_ids: List[str], generated_query_sql: str,
+                 results_sql: List[Dict], unified_properties: List[Dict], response_text: str) -> Dict[str, Any]:
+    recommended_ids_sql = [r["id"] for r in results_sql]
     return {
+        "sql_cursor": _page_cursor(_sql_cursor(state), results_sql),
+        "graph_cursor": _graph_cursor(state, recommended_props_graph),
         "graph_db_agent": [response_text],
         "graph_raw_history": [recommended_props_graph],
         "previous_generated_graph_query": inner,
@@ -278,8 +356,101 @@ Recommended properties to the user (de-duplicated combined list):
                 "answered_by": "recommendation_agent",
                 "answer": response_text,
                 "query_used": query_used,
-                "recommended_properties": unified_properties,
+                "recommended_properties": cards(unified_properties),
             }
         ],
     }
 
+
+def more_recommendation(state: RecommendationState):
+    msgs = state.get("user_query", []) or []
+    last_human_text: str = msgs[-1] if msgs else ""
+    qc = state.get("query_correction") or ""
+    query_used = qc if qc else last_human_text
+    limit = 10
+
+    # 1) Graph query with exclude
+    inner, q, graph_params = _more_graph_query(state, limit)
+    recommended_props_graph: List[Dict] = []
+    if q:
+        recommended_props_graph = get_result_cache().get_or_load(
+            "graph", {"cypher": q, "params": graph_params}, lambda: get_graph().query(q, params=graph_params) or []
+        )
+    graph_prop_ids = _graph_ids(recommended_props_graph)
+
+    # 2) SQL with exclude
+    enh, enhanced_user_query = _more_enhancer(state, last_human_text)
+    q_vec = _query_vector(embed_query(enhanced_user_query))
+    pool = get_pg_pool()
+    sql, params_for_query = _more_sql_query(state, enh, q_vec, graph_prop_ids, limit, _coded(pool))
+    # every "more" page discards the rows already shown, so tune it as a filtered search
+    page_filters = {**enh, "after_score": True}
+
+    generated_query_sql = sql
+
+    def load():
+        nonlocal generated_query_sql
+        with pool.connection() as conn, conn.cursor() as cur:
+            _tune(cur, page_filters)
+            pool.execute(cur, sql, params_for_query)
+            generated_query_sql = _rendered(cur, sql, params_for_query)
+            return order_by_score(_rows([c.name for c in cur.description], cur.fetchall()))
+
+    results_sql: List[Dict] = get_result_cache().get_or_load("sql", _cache_parts(sql, params_for_query, q_vec), load)
+
+    # 3) Combine
+    unified_properties = _unify(recommended_props_graph, results_sql)
+    publish_properties("more", unified_properties)
+
+    # 4) Summarize
+    if unified_properties:
+        answer = get_chat_model().invoke(_more_summary_messages(last_human_text, unified_properties))
+        response_text = getattr(answer, "content", str(answer))
+    else:
+        response_text = "No properties found"
+
+    return _more_update(state, last_human_text, query_used, inner, recommended_props_graph, graph_prop_ids,
+                        generated_query_sql, results_sql, unified_properties, response_text)
+
+
+async def amore_recommendation(state: RecommendationState):
+    msgs = state.get("user_query", []) or []
+    last_human_text: str = msgs[-1] if msgs else ""
+    qc = state.get("query_correction") or ""
+    query_used = qc if qc else last_human_text
+    limit = 10
+
+    inner, q, graph_params = _more_graph_query(state, limit)
+    recommended_props_graph: List[Dict] = []
+    if q:
+        recommended_props_graph = await get_result_cache().aget_or_load(
+            "graph", {"cypher": q, "params": graph_params}, lambda: arun_cypher(q, graph_params)
+        )
+    graph_prop_ids = _graph_ids(recommended_props_graph)
+
+    enh, enhanced_user_query = _more_enhancer(state, last_human_text)
+    q_vec = _query_vector(await aembed_query(enhanced_user_query))
+    sql, params_for_query = _more_sql_query(state, enh, q_vec, graph_prop_ids, limit, await _acoded())
+    # every "more" page discards the rows already shown, so tune it as a filtered search
+    page_filters = {**enh, "after_score": True}
+
+    async def load():
+        pool = await get_async_pg_pool()
+        async with pool.connection() as conn, conn.cursor() as cur:
+            await _atune(cur, page_filters)
+            await cur.execute(sql, params_for_query)
+            return order_by_score(_rows([c.name for c in cur.description], await cur.fetchall()))
+
+    results_sql = await get_result_cache().aget_or_load("sql", _cache_parts(sql, params_for_query, q_vec), load)
+
+    unified_properties = _unify(recommended_props_graph, results_sql)
+    publish_properties("more", unified_properties)
+
+    if unified_properties:
+        answer = await get_chat_model().ainvoke(_more_summary_messages(last_human_text, unified_properties))
+        response_text = getattr(answer, "content", str(answer))
+    else:
+        response_text = "No properties found"
+
+    return _more_update(state, last_human_text, query_used, inner, recommended_props_graph, graph_prop_ids,
+                        sql, results_sql, unified_properties, response_text)
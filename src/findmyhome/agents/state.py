@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 from typing import Any, Dict, List, Literal, Optional, TypedDict, Annotated
-import operator
 
 from langgraph.graph import START, END  # re-export convenience
 from langgraph.graph.message import add_messages  # noqa: F401  (used in type annotations)
@@ -18,6 +17,10 @@ class SupervisorEvaluation(BaseModel):
     evaluation: Literal["recommendation", "discussion", "more"] = Field(..., description="Supervisor agent evaluation result")
 
 
+class RouterEvaluation(BaseModel):
+    evaluation: Literal["invalid", "recommendation", "discussion", "more"] = Field(..., description="Router agent evaluation result")
+
+
 City = Literal['Chennai','Bangalore','Hyderabad','Mumbai','Thane','Kolkata','Pune','New Delhi']
 PropertyType = Literal['Flat','Independent House','Villa','Studio']
 RoomType = Literal['BHK','RK','R','BH']
@@ -76,29 +79,64 @@ class TurnEntry(TypedDict, total=False):
     recommended_properties: List[Dict[str, Any]]
 
 
+REPLACE = "__replace__"
+
+
+def append_or_replace(left: Optional[List[Any]], right: Any) -> List[Any]:
+    """``operator.add`` for per-turn history, except that ``replace_list(...)`` swaps the whole list.
+
+    Only ``compact_state`` replaces; every other node keeps appending.
+    """
+    if isinstance(right, dict) and REPLACE in right:
+        return list(right[REPLACE])
+    return (left or []) + (right or [])
+
+
 class RecommendationState(TypedDict):
-    user_query: Annotated[List[str], operator.add]
+    user_query: Annotated[List[str], append_or_replace]
 
     input_agent: Literal["valid", "invalid"]
     supervisor_evaluation: Literal["recommendation", "discussion","more"]
+    router_evaluation: Literal["invalid", "recommendation", "discussion", "more"]
+    # label the local classifier decided, or "fallback" when the LLM routed the turn
+    intent_fast_path: str
 
     invalid: str
-    discussion: Annotated[List[str], operator.add]
+    discussion: Annotated[List[str], append_or_replace]
     query_correction: str
 
-    graph_db_agent: Annotated[List[str], operator.add]
+    graph_db_agent: Annotated[List[str], append_or_replace]
     # store the recommended properties (the 'context' array) for each run
-    graph_raw_history: Annotated[List[List[Dict[str, Any]]], operator.add]
+    graph_raw_history: Annotated[List[List[Dict[str, Any]]], append_or_replace]
     previous_generated_graph_query: str
-    graph_property_id_shown: Annotated[List[str], operator.add]
+    previous_graph_query_params: Dict[str, Any]
+    # the compiled/template query above as a keyset page (filters.keyset_cypher); None for free-form Cypher
+    previous_graph_page_query: Optional[str]
+    graph_property_id_shown: Annotated[List[str], append_or_replace]
+    # keyset boundary for "more": {"price", "id"} of the last graph row; a free-form first page's ids ("exclude")
+    graph_cursor: Optional[Dict[str, Any]]
 
     query_enhancer: QueryEnhancerOutput
-    database_responses: Annotated[List[List[DatabaseResponse]], operator.add]
+    database_responses: Annotated[List[List[DatabaseResponse]], append_or_replace]
     database_generated_query: SQLQuery
-    database_property_id_shown: Annotated[PropertyIDList, operator.add]
+    database_property_id_shown: Annotated[PropertyIDList, append_or_replace]
+    # "more" keyset boundary: the last page's first (score, id), plus the shown ids past it ("overlap")
+    sql_cursor: Optional[Dict[str, Any]]
 
     augmentation_summary: str
-    turn_log: Annotated[List[TurnEntry], operator.add]
+    turn_log: Annotated[List[TurnEntry], append_or_replace]
+    # recommendation fan-out context loaded once per turn by recommendation_node (see turn_context)
+    turn_context: Optional[Dict[str, Any]]
+    # turns closed by compact_state; never trimmed, so it keys turn_context
+    completed_turns: int
+    # CONTEXT_ROLLING_SUMMARY: summary of turn_log[:summarized_turns], written by compact_state
+    conversation_summary: str
+    summarized_turns: int
+
+
+def replace_list(items: List[Any]) -> Dict[str, List[Any]]:
+    """State update that overwrites an ``append_or_replace`` channel instead of extending it."""
+    return {REPLACE: list(items)}
 
 
 def latest_human_text(msgs: List[BaseMessage]) -> str:
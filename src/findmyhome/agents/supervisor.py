@@ -3,13 +3,14 @@ from __future__ import annotations
 from langchain_core.messages import HumanMessage, SystemMessage
 
 from findmyhome.config import get_chat_model
+from .context import conversation_context
 from .state import RecommendationState, SupervisorEvaluation
 
 
-def supervisor_agent(state: RecommendationState):
+def _supervisor_messages(state: RecommendationState):
     msgs = state.get("user_query", []) or []
     last_human_text: str = msgs[-1] if msgs else ""
-    previous_conversation = state.get("turn_log", []) or []
+    previous_conversation = conversation_context(state, "supervisor")
 
     messages = [
         SystemMessage(content="You are a supervisor agent that classifies the intent of the user query."),
@@ -49,9 +50,17 @@ def supervisor_agent(state: RecommendationState):
         """,
         ),
     ]
+    return messages
+
+
+def supervisor_agent(state: RecommendationState):
+    sup = get_chat_model().with_structured_output(SupervisorEvaluation)
+    response = sup.invoke(_supervisor_messages(state))
+    return {"supervisor_evaluation": response.evaluation}
+
 
-    model = get_chat_model()
-    sup = model.with_structured_output(SupervisorEvaluation)
-    response = sup.invoke(messages)
+async def asupervisor_agent(state: RecommendationState):
+    sup = get_chat_model().with_structured_output(SupervisorEvaluation)
+    response = await sup.ainvoke(_supervisor_messages(state))
     return {"supervisor_evaluation": response.evaluation}
 
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, Optional
+
+from langchain_core.runnables.config import RunnableConfig
+
+from findmyhome.config import get_settings
+from findmyhome.metrics import metrics
+from .context import user_messages_context
+from .filter_parser import parse_filters
+from .state import QueryEnhancer, RecommendationState
+from ..memory import get_user_preferences_memory, aget_user_preferences_memory
+
+logger = logging.getLogger(__name__)
+
+# Per-turn context for the recommendation fan-out. query_correction and
+# query_enhancer run in parallel and both need the user's saved preferences
+# and previous messages; recommendation_node resolves them once into
+# ``state["turn_context"]`` and both branches read it from there. ``turn`` is
+# the number of turns compact_state has closed on the thread (monotonic, unlike
+# user_query, which compaction trims) and ``question`` the message it answers,
+# so an entry left over from an earlier turn, even one that failed before
+# compact_state ran, is never mistaken for this one.
+
+
+def _user_id(config: Optional[RunnableConfig]) -> str:
+    return ((config or {}).get("configurable") or {}).get("user_id", "anonymous")
+
+
+def _turn(state: RecommendationState) -> int:
+    return state.get("completed_turns", 0) or 0
+
+
+def _question(state: RecommendationState) -> str:
+    msgs = state.get("user_query", []) or []
+    return msgs[-1] if msgs else ""
+
+
+def _parsed_filters(state: RecommendationState, prefs: Optional[str]) -> Optional[QueryEnhancer]:
+    """Deterministic extraction for queries the rule parser fully understands; None leaves the turn to the LLM."""
+    if not get_settings().filter_parser:
+        return None
+    msgs = state.get("user_query", []) or []
+    parsed = parse_filters(msgs[-1] if msgs else "", has_history=len(msgs) > 1, prefs=prefs)
+    metrics.incr("query_enhancer.parser" if parsed is not None else "query_enhancer.llm")
+    return parsed
+
+
+def _build(state: RecommendationState, prefs: Optional[str]) -> Dict[str, Any]:
+    metrics.incr("turn_context.loads")
+    return {
+        "turn": _turn(state),
+        "question": _question(state),
+        "preferences": prefs,
+        "user_messages": user_messages_context(state, "recommendation"),
+        "parsed_filters": _parsed_filters(state, prefs),
+    }
+
+
+def load_turn_context(state: RecommendationState, config: RunnableConfig) -> Dict[str, Any]:
+    user_id = _user_id(config)
+    prefs = get_user_preferences_memory(user_id) if user_id != "anonymous" else None
+    return _build(state, prefs)
+
+
+async def aload_turn_context(state: RecommendationState, config: RunnableConfig) -> Dict[str, Any]:
+    user_id = _user_id(config)
+    prefs = await aget_user_preferences_memory(user_id) if user_id != "anonymous" else None
+    return _build(state, prefs)
+
+
+def _current(state: RecommendationState) -> Optional[Dict[str, Any]]:
+    ctx = state.get("turn_context")
+    if ctx and ctx.get("turn") == _turn(state) and ctx.get("question") == _question(state):
+        return ctx
+    return None
+
+
+def turn_context(state: RecommendationState, config: RunnableConfig) -> Dict[str, Any]:
+    """This turn's preloaded context, or loaded on the spot (preload off, or the node run on its own)."""
+    ctx = _current(state)
+    if ctx is None:
+        metrics.incr("turn_context.fallback_loads")
+        ctx = load_turn_context(state, config)
+    return ctx
+
+
+async def aturn_context(state: RecommendationState, config: RunnableConfig) -> Dict[str, Any]:
+    ctx = _current(state)
+    if ctx is None:
+        metrics.incr("turn_context.fallback_loads")
+        ctx = await aload_turn_context(state, config)
+    return ctx
+
+
+def recommendation_agent(state: RecommendationState, config: RunnableConfig):
+    """Fan-out node in front of query_correction and query_enhancer; preloads their shared context."""
+    if not get_settings().turn_context_preload:
+        return {}
+    return {"turn_context": load_turn_context(state, config)}
+
+
+async def arecommendation_agent(state: RecommendationState, config: RunnableConfig):
+    if not get_settings().turn_context_preload:
+        return {}
+    return {"turn_context": await aload_turn_context(state, config)}
+
@@ -1,13 +1,18 @@
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
+from typing import List
 import uuid 
 from datetime import datetime
 import os
 
-from ..workflow import compile_workflow
+from ..workflow import compile_workflow, acompile_workflow
 from ..auth import get_current_user, require_admin, create_access_token
 from ..database import UserManager, ChatSessionManager, create_tables
 from ..models import (
@@ -15,6 +20,12 @@ from ..models import (
     UserResponse, ChatSessionCreate, ChatSessionResponse, UserStatus
 )
 from ..memory import UserPreferences, store_user_preferences, get_user_preferences_memory
+from ..graph_store import get_schema_cache
+from ..config import get_settings, get_result_cache, get_property_store
+from ..metrics import metrics
+from ..property_record import cards
+from ..warmup import warmup
+from .streaming import stream_turn, astream_turn
 import logging
 import os
 
@@ -22,7 +33,20 @@ import os
 logger = logging.getLogger(__name__)
 is_prod = os.getenv("ENV")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global workflow
+    create_tables()
+    await warmup()
+    workflow = await acompile_workflow() if _is_async() else compile_workflow()
+    # Keep the shared Neo4j schema snapshot fresh without blocking requests
+    get_schema_cache().start_background_refresh(get_settings().neo4j_schema_ttl_seconds)
+    yield
+    get_schema_cache().stop_background_refresh()
+
+
 app = FastAPI(title="FindMyHome API",
+              lifespan=lifespan,
               docs_url=None if is_prod else "/docs",
               redoc_url=None if is_prod else "/redoc",
               openapi_url=None if is_prod else "/openapi.json")
@@ -36,10 +60,47 @@ if not is_prod:
     )
 
 
-workflow = compile_workflow()
+# Compiled in lifespan: the async checkpointer needs the running event loop
+workflow = None
 MAX_USER_QUERIES = 6
 
-# Initialize database tables on startup
+
+def _is_async() -> bool:
+    return get_settings().execution_mode == "async"
+
+
+async def _run_turn(inputs: dict, config: dict) -> dict:
+    """Run one workflow turn without blocking the event loop in either execution mode."""
+    if _is_async():
+        return await workflow.ainvoke(inputs, config=config)
+    return await run_in_threadpool(workflow.invoke, inputs, config=config)
+
+
+def _turn_fields(state: dict) -> dict:
+    """The current turn's question, answer and property cards out of the final thread state."""
+    queries = state.get("user_query") or []
+    question = str(queries[-1]) if queries else ""
+    if state.get("input_agent") == "invalid":
+        # invalid queries get an answer but no turn_log entry
+        return {"question": question, "answer": state.get("invalid") or "", "answered_by": "invalid_query"}
+    turn = (state.get("turn_log") or [{}])[-1]
+    # with STATE_FULL_TURNS=0 even the current turn is compacted to id references
+    rows = get_property_store().hydrate(turn.get("recommended_properties") or [])
+    return {
+        "question": turn.get("question") or question,
+        "answer": turn.get("answer") or "",
+        "answered_by": turn.get("answered_by"),
+        "properties": cards(rows),
+    }
+
+
+def _stream(inputs: dict, config: dict, meta: dict) -> StreamingResponse:
+    if _is_async():
+        events = astream_turn(workflow, inputs, config, meta)
+    else:
+        events = stream_turn(workflow, inputs, config, meta)
+    return StreamingResponse(events, media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 @app.get("/")
 def root():
     return {"status": "ok"}
@@ -48,10 +109,6 @@ def root():
 def health():
     return {"status": "healthy"}
 
-@app.on_event("startup")
-async def startup_event():
-    create_tables()
-
 # Updated request model with authentication
 class InvokeRequest(BaseModel):
     user_query: str
@@ -60,6 +117,32 @@ class InvokeRequest(BaseModel):
 class InitialPreferencesRequest(BaseModel):
     thread_id: str | None = None
 
+class PropertyCard(BaseModel):
+    id: str | None = None
+    name: str = ""
+    cityName: str = ""
+    property_type: str = ""
+    room_type: str = ""
+    beds: int | None = None
+    baths: int | None = None
+    price: float | None = None
+    totalArea: float | None = None
+    pricePerSqft: float | None = None
+    hasBalcony: bool | None = None
+    description: str = ""
+
+class TurnResponse(BaseModel):
+    """One turn's answer and property cards; the thread state stays server-side."""
+    thread_id: str
+    user_id: str
+    question: str
+    answer: str
+    answered_by: str | None = None
+    properties: List[PropertyCard] = []
+
+class InitialPreferencesResponse(TurnResponse):
+    used_preferences: bool
+
 # Public endpoints (no authentication required)
 
 @app.post("/request-approval")
@@ -107,9 +190,8 @@ def login(request: LoginRequest):
 
 # Protected endpoints (require authentication)
 
-@app.post("/invoke")
-def invoke(req: InvokeRequest, current_user: User = Depends(get_current_user)):
-    """Main chat interface - requires authentication"""
+def _begin_turn(req: InvokeRequest, current_user: User) -> str:
+    """Apply the query limit and resolve (or create) the chat thread for a turn."""
     try:
         UserManager.check_and_increment_queries(current_user.id, MAX_USER_QUERIES)
     except ValueError as e:
@@ -129,15 +211,30 @@ def invoke(req: InvokeRequest, current_user: User = Depends(get_current_user)):
     else:
         # Update activity for existing session
         ChatSessionManager.update_session_activity(thread_id)
+    return thread_id
+
+@app.post("/invoke", response_model=TurnResponse)
+async def invoke(req: InvokeRequest, current_user: User = Depends(get_current_user)):
+    """Main chat interface - requires authentication"""
+    thread_id = await run_in_threadpool(_begin_turn, req, current_user)
 
     config_dict = {"configurable": {"thread_id": thread_id, "user_id": current_user.id}}
-    state = workflow.invoke({"user_query": [req.user_query]}, config=config_dict)
-    
-    return {
-        "state": state,
-        "thread_id": thread_id,
-        "user_id": current_user.id
-    }
+    state = await _run_turn({"user_query": [req.user_query]}, config_dict)
+    turn = await run_in_threadpool(_turn_fields, state)
+
+    return TurnResponse(thread_id=thread_id, user_id=current_user.id, **turn)
+
+@app.post("/invoke/stream")
+async def invoke_stream(req: InvokeRequest, current_user: User = Depends(get_current_user)):
+    """Streaming chat interface: server-sent events as each agent finishes"""
+    thread_id = await run_in_threadpool(_begin_turn, req, current_user)
+
+    config_dict = {"configurable": {"thread_id": thread_id, "user_id": current_user.id}}
+    return _stream(
+        {"user_query": [req.user_query]},
+        config_dict,
+        {"thread_id": thread_id, "user_id": current_user.id, "question": req.user_query},
+    )
 
 @app.get("/my-chats")
 def get_my_chats(current_user: User = Depends(get_current_user)):
@@ -152,21 +249,27 @@ def create_chat(request: ChatSessionCreate, current_user: User = Depends(get_cur
     return ChatSessionResponse.from_orm(chat_session)
 
 @app.get("/conversation/{thread_id}")
-def get_conversation_history(thread_id: str, current_user: User = Depends(get_current_user)):
+async def get_conversation_history(thread_id: str, current_user: User = Depends(get_current_user)):
     """Get conversation history for a specific thread - user can only access their own"""
     # Verify the thread belongs to the current user
-    user_sessions = ChatSessionManager.get_user_sessions(current_user.id)
+    user_sessions = await run_in_threadpool(ChatSessionManager.get_user_sessions, current_user.id)
     user_thread_ids = [session.thread_id for session in user_sessions]
     
     if thread_id not in user_thread_ids:
         raise HTTPException(status_code=403, detail="Access denied to this conversation")
     
     config_dict = {"configurable": {"thread_id": thread_id}}
-    current_state = workflow.get_state(config_dict)
+    if _is_async():
+        current_state = await workflow.aget_state(config_dict)
+    else:
+        current_state = await run_in_threadpool(workflow.get_state, config_dict)
     
     return {
         "thread_id": thread_id,
-        "conversation_history": current_state.values.get("turn_log", []),
+        # turns past STATE_FULL_TURNS hold property ids only; fill the rows back in from the property store
+        "conversation_history": await run_in_threadpool(
+            get_property_store().hydrate_turns, current_state.values.get("turn_log", [])
+        ),
         "user_queries": current_state.values.get("user_query", [])
     }
 
@@ -190,6 +293,30 @@ def approve_user(email: str, admin_user: User = Depends(require_admin)):
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.post("/admin/refresh-graph-schema")
+def refresh_graph_schema(admin_user: User = Depends(require_admin)):
+    """Re-scan the Neo4j schema and swap the shared snapshot (admin only)"""
+    try:
+        return get_schema_cache().refresh()
+    except Exception as e:
+        logger.error(f"Error refreshing graph schema: {e}")
+        raise HTTPException(status_code=500, detail="Failed to refresh graph schema")
+
+@app.get("/admin/graph-schema")
+def graph_schema_info(admin_user: User = Depends(require_admin)):
+    """Report version, source and age of the shared graph schema (admin only)"""
+    return get_schema_cache().info()
+
+@app.post("/admin/bump-catalog-version")
+def bump_catalog_version(admin_user: User = Depends(require_admin)):
+    """Invalidate cached search results after the properties table or graph is reloaded (admin only)"""
+    return {"catalog_version": get_result_cache().bump()}
+
+@app.get("/admin/metrics")
+def get_metrics(admin_user: User = Depends(require_admin)):
+    """Process-local counters plus pool/cache stats for capacity sizing (admin only)"""
+    return metrics.snapshot()
+
 @app.get("/profile")
 def get_profile(current_user: User = Depends(get_current_user)):
     """Get current user profile"""
@@ -225,8 +352,36 @@ def get_my_preferences(current_user: User = Depends(get_current_user)):
         raise HTTPException(status_code=500, detail="Failed to retrieve preferences")
     
 
-@app.post("/initial-preferences")
-def get_initial_preferences(
+def _seed_turn(request: InitialPreferencesRequest, current_user: User):
+    """Resolve the thread and build the preference-based seed query."""
+    # Fetch saved preferences (may be None)
+    preferences = get_user_preferences_memory(current_user.id)
+
+    # Decide thread: reuse or create
+    if request.thread_id:
+        ChatSessionManager.update_session_activity(request.thread_id)
+        active_thread_id = request.thread_id
+    else:
+        chat_session = ChatSessionManager.create_session(current_user.id, title="Initial Recommendations")
+        active_thread_id = chat_session.thread_id
+
+    # Seed query using preferences if available
+    if preferences:
+        seed_query = (
+            "Please recommend properties based on my preferences.\n"
+            f"{preferences}\n"
+            "Return a helpful list of options."
+        )
+    else:
+        # Fallback: a neutral query that still yields results via vector search
+        seed_query = (
+            "Recommend a variety of residential properties across the supported cities, "
+            "prioritizing broadly appealing options."
+        )
+    return seed_query, active_thread_id, bool(preferences)
+
+@app.post("/initial-preferences", response_model=InitialPreferencesResponse)
+async def get_initial_preferences(
     request: InitialPreferencesRequest,
     current_user: User = Depends(get_current_user),
 ):
@@ -238,40 +393,42 @@ def get_initial_preferences(
     - Returns the `thread_id` to be reused in subsequent `/invoke` calls unless the user creates a new chat.
     """
     try:
-        # Fetch saved preferences (may be None)
-        preferences = get_user_preferences_memory(current_user.id)
-
-        # Decide thread: reuse or create
-        if request.thread_id:
-            ChatSessionManager.update_session_activity(request.thread_id)
-            active_thread_id = request.thread_id
-        else:
-            chat_session = ChatSessionManager.create_session(current_user.id, title="Initial Recommendations")
-            active_thread_id = chat_session.thread_id
-
-        # Seed query using preferences if available
-        if preferences:
-            seed_query = (
-                "Please recommend properties based on my preferences.\n"
-                f"{preferences}\n"
-                "Return a helpful list of options."
-            )
-        else:
-            # Fallback: a neutral query that still yields results via vector search
-            seed_query = (
-                "Recommend a variety of residential properties across the supported cities, "
-                "prioritizing broadly appealing options."
-            )
+        seed_query, active_thread_id, used_preferences = await run_in_threadpool(_seed_turn, request, current_user)
 
         config_dict = {"configurable": {"thread_id": active_thread_id, "user_id": current_user.id}}
-        state = workflow.invoke({"user_query": [seed_query]}, config=config_dict)
+        state = await _run_turn({"user_query": [seed_query]}, config_dict)
+        turn = await run_in_threadpool(_turn_fields, state)
+
+        return InitialPreferencesResponse(
+            thread_id=active_thread_id,
+            user_id=current_user.id,
+            used_preferences=used_preferences,
+            **turn,
+        )
+    except Exception as e:
+        logger.error(f"Error retrieving initial preferences: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get initial recommendations")
 
-        return {
-            "state": state,
-            "thread_id": active_thread_id,
-            "user_id": current_user.id,
-            "used_preferences": bool(preferences),
-        }
+@app.post("/initial-preferences/stream")
+async def stream_initial_preferences(
+    request: InitialPreferencesRequest,
+    current_user: User = Depends(get_current_user),
+):
+    """Streaming variant of `/initial-preferences` (server-sent events)."""
+    try:
+        seed_query, active_thread_id, used_preferences = await run_in_threadpool(_seed_turn, request, current_user)
     except Exception as e:
         logger.error(f"Error retrieving initial preferences: {e}")
         raise HTTPException(status_code=500, detail="Failed to get initial recommendations")
+
+    config_dict = {"configurable": {"thread_id": active_thread_id, "user_id": current_user.id}}
+    return _stream(
+        {"user_query": [seed_query]},
+        config_dict,
+        {
+            "thread_id": active_thread_id,
+            "user_id": current_user.id,
+            "question": seed_query,
+            "used_preferences": used_preferences,
+        },
+    )
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Iterator, List
+
+from fastapi.encoders import jsonable_encoder
+
+from ..property_record import cards
+
+logger = logging.getLogger(__name__)
+
+# Nodes whose LLM output is user-facing text worth streaming token by token
+TEXT_NODES = {"accumulative_query_results", "more_recommendation", "discussion_query", "invalid_query"}
+
+
+def sse(event: str, data: Any) -> str:
+    """Format one server-sent event frame."""
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+
+def _graph_properties(context: List[Any]) -> List[Dict[str, Any]]:
+    props = []
+    for item in context or []:
+        if isinstance(item, dict):
+            p = item.get("p") or item.get("property")
+            if isinstance(p, dict):
+                props.append(p)
+    return props
+
+
+def node_events(node: str, update: Dict[str, Any]) -> Iterator[str]:
+    """Translate one node's state update into the client-facing events."""
+    if node == "compact_state":
+        return  # bookkeeping, nothing for the client
+    yield sse("node", {"node": node})
+
+    if node == "input_agent":
+        yield sse("input", {"evaluation": update.get("input_agent")})
+    elif node == "supervisor":
+        yield sse("route", {"route": update.get("supervisor_evaluation")})
+    elif node == "intent_classifier" and update.get("intent_fast_path") == "fallback":
+        pass
+    elif node in ("router", "intent_classifier"):
+        yield sse("input", {"evaluation": update.get("input_agent")})
+        if update.get("supervisor_evaluation"):
+            yield sse("route", {"route": update.get("supervisor_evaluation")})
+    elif node == "query_database":
+        rows = (update.get("database_responses") or [[]])[-1]
+        yield sse("properties", {"source": "sql", "properties": cards(rows)})
+    elif node == "graph_db_agent":
+        context = (update.get("graph_raw_history") or [[]])[-1]
+        yield sse("properties", {"source": "graph", "properties": cards(_graph_properties(context))})
+    elif node == "more_recommendation":
+        # its properties went out (custom stream) before the summary was generated
+        turn = (update.get("turn_log") or [{}])[-1]
+        yield sse("summary", {"text": turn.get("answer", "")})
+    elif node == "accumulative_query_results":
+        yield sse("summary", {"text": update.get("augmentation_summary", "")})
+    elif node == "discussion_query":
+        yield sse("summary", {"text": (update.get("discussion") or [""])[-1]})
+    elif node == "invalid_query":
+        yield sse("summary", {"text": update.get("invalid", "")})
+
+
+def _chunk_events(mode: str, chunk: Any) -> Iterator[str]:
+    if mode == "updates":
+        for node, update in chunk.items():
+            if isinstance(update, dict):
+                yield from node_events(node, update)
+    elif mode == "custom":
+        # publish_properties: the merged list, sent as soon as the node has it
+        if isinstance(chunk, dict) and "properties" in chunk:
+            yield sse("properties", {"source": chunk.get("source"), "properties": cards(chunk["properties"])})
+    elif mode == "messages":
+        message, msg_meta = chunk
+        node = msg_meta.get("langgraph_node")
+        text = getattr(message, "content", "")
+        if node in TEXT_NODES and isinstance(text, str) and text:
+            yield sse("token", {"node": node, "text": text})
+
+
+def stream_turn(workflow, inputs: Dict[str, Any], config: Dict[str, Any], meta: Dict[str, Any]) -> Iterator[str]:
+    """Run one turn with ``workflow.stream`` and yield SSE frames as nodes finish.
+
+    Event order for a recommendation turn: ``start``, ``input``, ``route``,
+    ``properties`` (sql, as soon as that branch lands), ``properties`` (graph),
+    ``properties`` (unified, before the summary is generated), ``token``...
+    (summary text as it is generated), ``summary``, ``done``.
+    """
+    yield sse("start", meta)
+    try:
+        for mode, chunk in workflow.stream(inputs, config=config, stream_mode=["updates", "custom", "messages"]):
+            yield from _chunk_events(mode, chunk)
+        yield sse("done", meta)
+    except Exception as e:
+        logger.error(f"Error while streaming turn: {e}")
+        yield sse("error", {"detail": "Failed to process the query"})
+
+
+async def astream_turn(workflow, inputs: Dict[str, Any], config: Dict[str, Any], meta: Dict[str, Any]) -> AsyncIterator[str]:
+    """``stream_turn`` over ``workflow.astream`` for the async execution mode."""
+    yield sse("start", meta)
+    try:
+        async for mode, chunk in workflow.astream(inputs, config=config, stream_mode=["updates", "custom", "messages"]):
+            for frame in _chunk_events(mode, chunk):
+                yield frame
+        yield sse("done", meta)
+    except Exception as e:
+        logger.error(f"Error while streaming turn: {e}")
+        yield sse("error", {"detail": "Failed to process the query"})
@@ -12,7 +12,6 @@ from .config import get_settings
 
 security = HTTPBearer()
 
-SECRET_KEY = get_settings().secret_key  # Move to environment variables
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_HOURS = 24
 
@@ -25,12 +24,12 @@ def create_access_token(user_id: str, email: str) -> str:
         "exp": expire,
         "iat": datetime.utcnow()
     }
-    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+    return jwt.encode(payload, get_settings().secret_key, algorithm=ALGORITHM)
 
 def verify_token(token: str) -> dict:
     """Verify and decode JWT token"""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, get_settings().secret_key, algorithms=[ALGORITHM])
         return payload
     except ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token has expired")
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TieredCache:
+    """In-process LRU in front of an optional shared Redis tier.
+
+    Both tiers expire entries after ``ttl_seconds``. Redis is reached through
+    ``redis_factory`` (called lazily, may return ``None``) and values cross it
+    via ``encode``/``decode``; a Redis outage only costs hit rate, never a
+    request. Hits and misses per tier are counted for ``/admin/metrics``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600,
+        redis_factory: Optional[Callable[[], Any]] = None,
+        encode: Callable[[Any], bytes] = lambda v: v,
+        decode: Callable[[bytes], Any] = lambda b: b,
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._redis_factory = redis_factory
+        self._encode = encode
+        self._decode = decode
+        self._lock = threading.Lock()
+        self._local: "OrderedDict[str, tuple]" = OrderedDict()
+        self._stats: Dict[str, int] = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "evictions": 0,
+            "redis_errors": 0,
+        }
+
+    def _redis(self):
+        if self._redis_factory is None:
+            return None
+        try:
+            return self._redis_factory()
+        except Exception as e:
+            self._count("redis_errors")
+            logger.warning(f"{self.name}: redis tier unavailable: {e}")
+            return None
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.name}:{key}"
+
+    def _count(self, stat: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[stat] += n
+
+    # ---- local tier ----
+
+    def _local_get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            self._stats["local_hits"] += 1
+            return value
+
+    def _local_set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._local[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    # ---- public API ----
+
+    def get(self, key: str) -> Any:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Return the cached values for ``keys``; missing keys are simply absent."""
+        found: Dict[str, Any] = {}
+        pending: List[str] = []
+        for key in keys:
+            value = self._local_get(key)
+            if value is None:
+                pending.append(key)
+            else:
+                found[key] = value
+
+        client = self._redis() if pending else None
+        if client is not None:
+            try:
+                raw = client.mget([self._redis_key(k) for k in pending])
+            except Exception as e:
+                self._count("redis_errors")
+                logger.warning(f"{self.name}: redis get failed: {e}")
+                raw = [None] * len(pending)
+            for key, blob in zip(pending, raw):
+                if blob is None:
+                    continue
+                value = self._decode(blob)
+                found[key] = value
+                self._local_set(key, value)
+                self._count("redis_hits")
+
+        misses = sum(1 for k in pending if k not in found)
+        if misses:
+            self._count("misses", misses)
+        return found
+
+    def set(self, key: str, value: Any) -> None:
+        self.set_many({key: value})
+
+    def set_many(self, items: Dict[str, Any]) -> None:
+        if not items:
+            return
+        for key, value in items.items():
+            self._local_set(key, value)
+        self._count("sets", len(items))
+
+        client = self._redis()
+        if client is None:
+            return
+        try:
+            pipe = client.pipeline(transaction=False)
+            for key, value in items.items():
+                pipe.set(self._redis_key(key), self._encode(value), ex=int(self.ttl_seconds))
+            pipe.execute()
+        except Exception as e:
+            self._count("redis_errors")
+            logger.warning(f"{self.name}: redis set failed: {e}")
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._local.pop(key, None)
+        client = self._redis()
+        if client is None:
+            return
+        try:
+            client.delete(self._redis_key(key))
+        except Exception as e:
+            self._count("redis_errors")
+            logger.warning(f"{self.name}: redis delete failed: {e}")
+
+    def clear_local(self) -> None:
+        with self._lock:
+            self._local.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["local_entries"] = len(self._local)
+        lookups = stats["local_hits"] + stats["redis_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["local_hits"] + stats["redis_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple, get_args
+
+from .agents.state import City, PropertyType, RoomType
+
+logger = logging.getLogger(__name__)
+
+# Normalised filter columns on the properties table. The search SQL used
+# leading-wildcard ILIKE on the raw text, which no B-tree can serve; these
+# STORED generated columns hold the canonical values QueryEnhancer produces,
+# so filters become equality predicates on an indexed prefix.
+
+TABLE = "properties"
+CITIES: Tuple[str, ...] = get_args(City)
+PROPERTY_TYPES: Tuple[str, ...] = get_args(PropertyType)
+ROOM_TYPES: Tuple[str, ...] = get_args(RoomType)
+
+FILTER_INDEX = f"{TABLE}_filters_idx"
+FILTER_INDEX_COLUMNS = ("city_code", "property_type_code", "beds", "price")
+
+COLUMNS_SQL = "SELECT column_name FROM information_schema.columns WHERE table_name = %s AND column_name = ANY(%s)"
+
+_code_columns_ready: Optional[bool] = None
+
+
+def _quote(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _canonical_case(column: str, values: Tuple[str, ...]) -> str:
+    # Same substring semantics the old ILIKE '%value%' filters had, resolved once at write time.
+    # Longer values first so "Independent House" wins over a shorter overlapping name.
+    whens = " ".join(
+        f"WHEN {column} ILIKE {_quote('%' + v + '%')} THEN {_quote(v)}"
+        for v in sorted(values, key=len, reverse=True)
+    )
+    return f"CASE {whens} ELSE btrim({column}) END"
+
+
+CODE_COLUMNS: Dict[str, str] = {
+    "city_code": _canonical_case('"cityName"', CITIES),
+    "property_type_code": _canonical_case("property_type", PROPERTY_TYPES),
+    # room types are short codes ('R' is a substring of 'RK'), so only case and whitespace are normalised
+    "room_type_code": "upper(btrim(room_type))",
+}
+
+
+def migration_sql() -> List[str]:
+    """Statements adding the code columns (a table rewrite) to ``properties``.
+
+    Idempotent. Run them in one transaction; the index is built separately,
+    CONCURRENTLY.
+    """
+    return [
+        f"ALTER TABLE {TABLE} ADD COLUMN IF NOT EXISTS {name} text GENERATED ALWAYS AS ({expr}) STORED"
+        for name, expr in CODE_COLUMNS.items()
+    ]
+
+
+def index_sql(concurrently: bool = True) -> str:
+    return (
+        f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {FILTER_INDEX} "
+        f"ON {TABLE} ({', '.join(FILTER_INDEX_COLUMNS)})"
+    )
+
+
+def partition_sql(source: str = TABLE, target: str = f"{TABLE}_by_city") -> List[str]:
+    """DDL for a copy of ``source`` LIST-partitioned on ``city_code``, one partition per city.
+
+    Postgres cannot partition on a generated column, so ``city_code`` is a
+    plain column in the copy, filled from the same expression; catalog loads
+    into it must write ``city_code``. Equality filters on ``city_code`` then
+    prune to one partition, each with its own ANN and filter indexes. The
+    swap (rename) is left to the operator.
+    """
+    statements = [
+        f"CREATE TABLE IF NOT EXISTS {target} (LIKE {source} INCLUDING DEFAULTS EXCLUDING GENERATED) "
+        "PARTITION BY LIST (city_code)",
+    ]
+    for city in CITIES:
+        part = f"{target}_{city.lower().replace(' ', '_')}"
+        statements.append(f"CREATE TABLE IF NOT EXISTS {part} PARTITION OF {target} FOR VALUES IN ({_quote(city)})")
+    statements.append(f"CREATE TABLE IF NOT EXISTS {target}_other PARTITION OF {target} DEFAULT")
+    statements.append(f"INSERT INTO {target} SELECT * FROM {source}")
+    statements.append(f"CREATE INDEX IF NOT EXISTS {target}_filters_idx ON {target} ({', '.join(FILTER_INDEX_COLUMNS)})")
+    return statements
+
+
+def remember_code_columns(rows) -> bool:
+    global _code_columns_ready
+    _code_columns_ready = {row[0] for row in rows} >= set(CODE_COLUMNS)
+    if not _code_columns_ready:
+        logger.warning(
+            "properties has no %s columns; filtering on the raw text. Run `findmyhome catalog-schema migrate`.",
+            "/".join(CODE_COLUMNS),
+        )
+    return _code_columns_ready
+
+
+def known_code_columns() -> Optional[bool]:
+    """Whether the code columns exist, or ``None`` before the first lookup."""
+    return _code_columns_ready
+
+
+def code_columns_ready(cur) -> bool:
+    """Whether every code column exists, looked up once per process on ``cur``."""
+    if _code_columns_ready is None:
+        cur.execute(COLUMNS_SQL, (TABLE, list(CODE_COLUMNS)))
+        remember_code_columns(cur.fetchall())
+    return _code_columns_ready
+
+
+async def acode_columns_ready(cur) -> bool:
+    if _code_columns_ready is None:
+        await cur.execute(COLUMNS_SQL, (TABLE, list(CODE_COLUMNS)))
+        remember_code_columns(await cur.fetchall())
+    return _code_columns_ready
+
+
+def migrate(conn) -> List[str]:
+    """Add the code columns and the composite filter index; ``conn`` must be in autocommit mode."""
+    global _code_columns_ready
+    executed: List[str] = []
+    with conn.cursor() as cur:
+        cur.execute("BEGIN")
+        for stmt in migration_sql():
+            logger.info(stmt)
+            cur.execute(stmt)
+            executed.append(stmt)
+        cur.execute("COMMIT")
+        stmt = index_sql()
+        logger.info(stmt)
+        cur.execute(stmt)
+        executed.append(stmt)
+        cur.execute(f"ANALYZE {TABLE}")
+    _code_columns_ready = None
+    return executed
+
+
+def schema_status(conn) -> Dict[str, Any]:
+    with conn.cursor() as cur:
+        cur.execute(COLUMNS_SQL, (TABLE, list(CODE_COLUMNS)))
+        columns = sorted(row[0] for row in cur.fetchall())
+        cur.execute("SELECT indisvalid FROM pg_index x JOIN pg_class i ON i.oid = x.indexrelid WHERE i.relname = %s", (FILTER_INDEX,))
+        row = cur.fetchone()
+    return {"code_columns": columns, "filter_index": None if row is None else ("valid" if row[0] else "invalid")}
@@ -36,6 +36,94 @@ def cmd_query(args):
     print(json.dumps(state, default=str, indent=2))
 
 
+def cmd_dump_graph_schema(args):
+    from .graph_store import get_schema_cache
+
+    cache = get_schema_cache()
+    if args.refresh:
+        cache.refresh()
+    cache.dump(args.path)
+    print(f"Wrote graph schema v{cache.version} to {args.path}")
+
+
+def cmd_bump_catalog_version(args):
+    from .config import get_result_cache
+
+    print(f"Catalog version is now {get_result_cache().bump()}")
+
+
+def cmd_vector_index(args):
+    from . import vector_index
+    from .config import get_pg_connection, get_settings
+
+    s = get_settings()
+    method = args.method or s.vector_index_method
+    conn = get_pg_connection()
+    conn.autocommit = True  # CREATE/DROP INDEX CONCURRENTLY cannot run in a transaction
+    try:
+        if args.action in ("create", "rebuild"):
+            sql = vector_index.create_index(
+                conn,
+                method,
+                m=args.m or s.hnsw_m,
+                ef_construction=args.ef_construction or s.hnsw_ef_construction,
+                lists=args.lists if args.lists is not None else s.ivfflat_lists,
+                rebuild=args.action == "rebuild",
+                maintenance_work_mem=args.maintenance_work_mem,
+            )
+            print(sql)
+        elif args.action == "drop":
+            vector_index.drop_index(conn, method)
+            print(f"Dropped {vector_index.index_name(method)}")
+        print(json.dumps(vector_index.index_status(conn), indent=2))
+    finally:
+        conn.close()
+
+
+def cmd_catalog_schema(args):
+    from . import catalog_schema
+
+    if args.action == "partition-sql":
+        # printed for review, not executed: the copy and the table swap are an operator decision
+        print(";\n".join(catalog_schema.partition_sql()) + ";")
+        return
+    from .config import get_pg_connection
+
+    conn = get_pg_connection()
+    conn.autocommit = True
+    try:
+        if args.action == "migrate":
+            for stmt in catalog_schema.migrate(conn):
+                print(stmt)
+        print(json.dumps(catalog_schema.schema_status(conn), indent=2))
+    finally:
+        conn.close()
+
+
+def cmd_memory_index(args):
+    from redisvl.index import SearchIndex
+
+    from . import memory_index
+    from .config import get_settings
+    from .memory import get_redis_client
+
+    overrides = {k: v for k, v in (("algorithm", args.algorithm), ("m", args.m), ("ef_construction", args.ef_construction)) if v}
+    index = SearchIndex(schema=memory_index.memory_schema(get_settings(), **overrides), redis_client=get_redis_client())
+    if args.action == "migrate":
+        print(json.dumps(memory_index.migrate(index, force=args.force, timeout=args.timeout), indent=2))
+    else:
+        print(json.dumps(memory_index.index_status(index), indent=2))
+
+
+def cmd_preferences(args):
+    from .config import get_preference_store
+    from .memory import get_redis_client
+    from .preferences import migrate_from_memories
+
+    result = migrate_from_memories(get_redis_client(), get_preference_store(), delete=args.delete_memories)
+    print(json.dumps(result, indent=2))
+
+
 def main(argv=None):
     argv = argv or sys.argv[1:]
     parser = argparse.ArgumentParser(prog="findmyhome")
@@ -52,6 +140,41 @@ def main(argv=None):
     p_q.add_argument("--user-id", default="2")
     p_q.set_defaults(func=cmd_query)
 
+    p_schema = sub.add_parser("dump-graph-schema", help="Write the Neo4j schema snapshot for NEO4J_SCHEMA_FILE")
+    p_schema.add_argument("path", help="Output JSON file")
+    p_schema.add_argument("--refresh", action="store_true", help="Force a live scan even if NEO4J_SCHEMA_FILE is set")
+    p_schema.set_defaults(func=cmd_dump_graph_schema)
+
+    p_bump = sub.add_parser("bump-catalog-version", help="Invalidate cached search results after a catalog reload")
+    p_bump.set_defaults(func=cmd_bump_catalog_version)
+
+    p_vec = sub.add_parser("vector-index", help="Create, rebuild, drop or inspect the ANN index on properties.description_embed")
+    p_vec.add_argument("action", choices=["create", "rebuild", "drop", "status"])
+    p_vec.add_argument("--method", choices=["hnsw", "ivfflat"], help="Defaults to VECTOR_INDEX_METHOD")
+    p_vec.add_argument("--m", type=int, help="HNSW max connections per layer (HNSW_M)")
+    p_vec.add_argument("--ef-construction", type=int, help="HNSW build candidate list (HNSW_EF_CONSTRUCTION)")
+    p_vec.add_argument("--lists", type=int, help="IVFFlat lists; 0 sizes from the row count (IVFFLAT_LISTS)")
+    p_vec.add_argument("--maintenance-work-mem", help="e.g. 1GB; speeds up HNSW builds")
+    p_vec.set_defaults(func=cmd_vector_index)
+
+    p_cat = sub.add_parser("catalog-schema", help="Add the normalised filter columns and index to the properties table")
+    p_cat.add_argument("action", choices=["migrate", "status", "partition-sql"])
+    p_cat.set_defaults(func=cmd_catalog_schema)
+
+    p_mem = sub.add_parser("memory-index", help="Re-create the long-term memory index (HNSW, tag-filtered) over the memory:* documents")
+    p_mem.add_argument("action", choices=["migrate", "status"])
+    p_mem.add_argument("--algorithm", choices=["hnsw", "flat"], help="Defaults to MEMORY_INDEX_ALGORITHM")
+    p_mem.add_argument("--m", type=int, help="HNSW max edges per node (MEMORY_HNSW_M)")
+    p_mem.add_argument("--ef-construction", type=int, help="HNSW build candidate list (MEMORY_HNSW_EF_CONSTRUCTION)")
+    p_mem.add_argument("--force", action="store_true", help="Rebuild even if the live index already matches")
+    p_mem.add_argument("--timeout", type=float, default=600.0, help="Seconds to wait for the background re-index")
+    p_mem.set_defaults(func=cmd_memory_index)
+
+    p_prefs = sub.add_parser("preferences", help="Move saved preferences out of the vector memory into prefs:<user_id> keys")
+    p_prefs.add_argument("action", choices=["migrate"])
+    p_prefs.add_argument("--delete-memories", action="store_true", help="Delete the migrated memory:* preference documents")
+    p_prefs.set_defaults(func=cmd_preferences)
+
     args = parser.parse_args(argv)
     return args.func(args)
 
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import asyncio
 import os
+import threading
 from functools import lru_cache
 from typing import Optional, List
+import hashlib
 import math
 
 from dotenv import load_dotenv
@@ -16,42 +19,128 @@ logger = logging.getLogger(__name__)
 
 # watch("neo4j")
 
-# load variables from a local .env if present
-load_dotenv(override=False)
-os.environ["AZURE_OPENAI_API_KEY"] = os.getenv('AZURE_OPENAI_API_KEY')
-
 
 class Settings(BaseSettings):
     # Azure OpenAI - Chat
     azure_openai_api_key: str = Field(default_factory=lambda: os.getenv("AZURE_OPENAI_API_KEY", ""))
     azure_endpoint: str = Field(default_factory=lambda: os.getenv("AZURE_ENDPOINT", ""))
-    azure_openai_api_version: str = Field(default_factory=lambda: os.getenv("AZURE_OPENAI_API_VERSION"))
-    azure_openai_deployment: str = Field(default_factory=lambda: os.getenv("AZURE_OPENAI_DEPLOYMENT"))
+    azure_openai_api_version: Optional[str] = Field(default_factory=lambda: os.getenv("AZURE_OPENAI_API_VERSION"))
+    azure_openai_deployment: Optional[str] = Field(default_factory=lambda: os.getenv("AZURE_OPENAI_DEPLOYMENT"))
 
     # Azure OpenAI - Embeddings (often key/env naming differs)
     azure_openai_key: str = Field(default_factory=lambda: os.getenv("AZURE_OPENAI_KEY", os.getenv("AZURE_OPENAI_API_KEY", "")))
     azure_embed_deployment: str = Field(default_factory=lambda: os.getenv("AZURE_EMBED_DEPLOYMENT", ""))
     embed_dim: int = Field(default_factory=lambda: int(os.getenv("EMBED_DIM", "1536")))
-    azure_api_version: str = Field(default_factory=lambda: os.getenv("AZURE_API_VERSION"))
+    azure_api_version: Optional[str] = Field(default_factory=lambda: os.getenv("AZURE_API_VERSION"))
     azure_openai_endpoint: str = Field(default_factory=lambda: os.getenv("AZURE_OPENAI_ENDPOINT", ""))
 
+    # Shared HTTP pool behind every Azure OpenAI client (keep-alive across the calls of a turn)
+    http_max_connections: int = Field(default_factory=lambda: int(os.getenv("HTTP_MAX_CONNECTIONS", "100")))
+    http_max_keepalive_connections: int = Field(default_factory=lambda: int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20")))
+    http_keepalive_expiry_seconds: float = Field(default_factory=lambda: float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "60")))
+    http_timeout_seconds: float = Field(default_factory=lambda: float(os.getenv("HTTP_TIMEOUT_SECONDS", "60")))
+    # Used only when the optional `h2` package is installed
+    http2: bool = Field(default_factory=lambda: os.getenv("HTTP2", "true").lower() == "true")
+
     # Neo4j
     neo4j_url: str = Field(default_factory=lambda: os.getenv("NEO4J_URL", ""))
     neo4j_username: str = Field(default_factory=lambda: os.getenv("NEO4J_USERNAME", "neo4j"))
     neo4j_password: str = Field(default_factory=lambda: os.getenv("NEO4J_PASSWORD", ""))
     neo4j_database: str = Field(default_factory=lambda: os.getenv("NEO4J_DATABASE", "neo4j"))
+    # Optional schema snapshot (see `findmyhome dump-graph-schema`) so cold starts skip the scan
+    neo4j_schema_file: str = Field(default_factory=lambda: os.getenv("NEO4J_SCHEMA_FILE", ""))
+    # Re-scan the schema in the background every N seconds; 0 disables
+    neo4j_schema_ttl_seconds: int = Field(default_factory=lambda: int(os.getenv("NEO4J_SCHEMA_TTL_SECONDS", "0")))
+    # Let the Cypher chain write its own QA answer (an extra LLM call); off = return the rows directly
+    graph_qa: bool = Field(default_factory=lambda: os.getenv("GRAPH_QA", "false").lower() == "true")
+    # Run Cypher compiled from fully parsed filters (shared semantics with the SQL side) instead of LLM generation
+    graph_compiled_filters: bool = Field(default_factory=lambda: os.getenv("GRAPH_COMPILED_FILTERS", "true").lower() == "true")
+    # Parameterised Cypher templates keyed on the structured intent shape (skips Cypher generation on hits)
+    cypher_template_cache: bool = Field(default_factory=lambda: os.getenv("CYPHER_TEMPLATE_CACHE", "true").lower() == "true")
+    cypher_template_ttl_seconds: int = Field(default_factory=lambda: int(os.getenv("CYPHER_TEMPLATE_TTL_SECONDS", str(7 * 24 * 3600))))
 
     # Postgres (Neon)
     neon_url: str = Field(default_factory=lambda: os.getenv("NEON_URL", ""))
+    # Connection pool for the properties/pgvector queries (users/chats use the SQLAlchemy engine)
+    pg_pool_min_size: int = Field(default_factory=lambda: int(os.getenv("PG_POOL_MIN_SIZE", "1")))
+    pg_pool_max_size: int = Field(default_factory=lambda: int(os.getenv("PG_POOL_MAX_SIZE", "10")))
+    pg_pool_max_lifetime_seconds: float = Field(default_factory=lambda: float(os.getenv("PG_POOL_MAX_LIFETIME_SECONDS", "1800")))
+    pg_pool_check_idle_seconds: float = Field(default_factory=lambda: float(os.getenv("PG_POOL_CHECK_IDLE_SECONDS", "30")))
+    pg_pool_acquire_timeout_seconds: float = Field(default_factory=lambda: float(os.getenv("PG_POOL_ACQUIRE_TIMEOUT_SECONDS", "10")))
+    # Disable for transaction-mode PgBouncer endpoints that cannot keep session-level PREPAREs
+    pg_prepare_statements: bool = Field(default_factory=lambda: os.getenv("PG_PREPARE_STATEMENTS", "true").lower() == "true")
+    # Render the similarity SQL with its bound values (mogrify) into state/logs; debug only, the vector makes it huge
+    log_rendered_sql: bool = Field(default_factory=lambda: os.getenv("LOG_RENDERED_SQL", "false").lower() == "true")
+    # Filter on the normalised city/property/room code columns once `findmyhome catalog-schema migrate` has added them;
+    # checked once per process, the raw-text filters are used until then
+    catalog_filter_columns: bool = Field(default_factory=lambda: os.getenv("CATALOG_FILTER_COLUMNS", "true").lower() == "true")
+    # ANN index on properties.description_embed ("hnsw", "ivfflat"; "none" = exact scan, no SET LOCALs)
+    vector_index_method: str = Field(default_factory=lambda: os.getenv("VECTOR_INDEX_METHOD", "hnsw").lower())
+    hnsw_m: int = Field(default_factory=lambda: int(os.getenv("HNSW_M", "16")))
+    hnsw_ef_construction: int = Field(default_factory=lambda: int(os.getenv("HNSW_EF_CONSTRUCTION", "64")))
+    hnsw_ef_search: int = Field(default_factory=lambda: int(os.getenv("HNSW_EF_SEARCH", "40")))
+    hnsw_ef_search_filtered: int = Field(default_factory=lambda: int(os.getenv("HNSW_EF_SEARCH_FILTERED", "200")))
+    ivfflat_lists: int = Field(default_factory=lambda: int(os.getenv("IVFFLAT_LISTS", "0")))
+    ivfflat_probes: int = Field(default_factory=lambda: int(os.getenv("IVFFLAT_PROBES", "10")))
+    ivfflat_max_probes: int = Field(default_factory=lambda: int(os.getenv("IVFFLAT_MAX_PROBES", "100")))
+    # pgvector >= 0.8 iterative index scans for filtered searches: "relaxed_order", "strict_order" or "off"
+    vector_iterative_scan: str = Field(default_factory=lambda: os.getenv("VECTOR_ITERATIVE_SCAN", "relaxed_order").lower())
+    vector_max_scan_tuples: int = Field(default_factory=lambda: int(os.getenv("VECTOR_MAX_SCAN_TUPLES", "20000")))
 
     # Redis
-    redis_host: str = Field(default_factory=lambda: os.getenv("REDIS_HOST"))
+    redis_host: Optional[str] = Field(default_factory=lambda: os.getenv("REDIS_HOST"))
     redis_port: int = Field(default_factory=lambda: int(os.getenv("REDIS_PORT", "6379")))
-    redis_password: str = Field(default_factory=lambda: os.getenv("REDIS_PASSWORD"))
+    redis_password: Optional[str] = Field(default_factory=lambda: os.getenv("REDIS_PASSWORD"))
+    # Long-term memory index: "hnsw" or "flat" (run `findmyhome memory-index migrate` after changing these)
+    memory_index_algorithm: str = Field(default_factory=lambda: os.getenv("MEMORY_INDEX_ALGORITHM", "hnsw").lower())
+    memory_hnsw_m: int = Field(default_factory=lambda: int(os.getenv("MEMORY_HNSW_M", "16")))
+    memory_hnsw_ef_construction: int = Field(default_factory=lambda: int(os.getenv("MEMORY_HNSW_EF_CONSTRUCTION", "200")))
+    memory_hnsw_ef_runtime: int = Field(default_factory=lambda: int(os.getenv("MEMORY_HNSW_EF_RUNTIME", "10")))
+    # HNSW range-query boundary factor; larger widens the search (better recall, slower)
+    memory_hnsw_epsilon: float = Field(default_factory=lambda: float(os.getenv("MEMORY_HNSW_EPSILON", "0.01")))
+
+    # Embedding cache: in-process LRU in front of Redis, keyed on a hash of the text
+    embed_cache_size: int = Field(default_factory=lambda: int(os.getenv("EMBED_CACHE_SIZE", "2048")))
+    embed_cache_ttl_seconds: int = Field(default_factory=lambda: int(os.getenv("EMBED_CACHE_TTL_SECONDS", str(7 * 24 * 3600))))
+    embed_cache_redis: bool = Field(default_factory=lambda: os.getenv("EMBED_CACHE_REDIS", "true").lower() == "true")
+
+    # Retrieval result cache (SQL + graph rows), invalidated by bumping the catalog version
+    result_cache: bool = Field(default_factory=lambda: os.getenv("RESULT_CACHE", "true").lower() == "true")
+    result_cache_size: int = Field(default_factory=lambda: int(os.getenv("RESULT_CACHE_SIZE", "512")))
+    result_cache_ttl_seconds: int = Field(default_factory=lambda: int(os.getenv("RESULT_CACHE_TTL_SECONDS", "900")))
+    # how long a worker reuses the catalog version it read from Redis (a bump elsewhere lands within this)
+    result_cache_version_ttl_seconds: float = Field(default_factory=lambda: float(os.getenv("RESULT_CACHE_VERSION_TTL_SECONDS", "5")))
+    # Prompt context: token budgets for previous turns / previous user messages (tiktoken encoding)
+    context_token_budget: int = Field(default_factory=lambda: int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000")))
+    context_user_messages_budget: int = Field(default_factory=lambda: int(os.getenv("CONTEXT_USER_MESSAGES_BUDGET", "500")))
+    context_encoding: str = Field(default_factory=lambda: os.getenv("CONTEXT_ENCODING", "o200k_base"))
+    # Fold turns older than the last CONTEXT_RECENT_TURNS into a running LLM summary (one extra call when a turn ages out)
+    context_rolling_summary: bool = Field(default_factory=lambda: os.getenv("CONTEXT_ROLLING_SUMMARY", "false").lower() == "true")
+    context_recent_turns: int = Field(default_factory=lambda: int(os.getenv("CONTEXT_RECENT_TURNS", "4")))
+    # Thread state compaction: full property rows for the last N turns, id references before that
+    state_compaction: bool = Field(default_factory=lambda: os.getenv("STATE_COMPACTION", "true").lower() == "true")
+    state_full_turns: int = Field(default_factory=lambda: int(os.getenv("STATE_FULL_TURNS", "3")))
+    state_byte_budget: int = Field(default_factory=lambda: int(os.getenv("STATE_BYTE_BUDGET", str(256 * 1024))))
+    property_store_ttl_seconds: int = Field(default_factory=lambda: int(os.getenv("PROPERTY_STORE_TTL_SECONDS", str(30 * 24 * 3600))))
+    # Saved preferences (prefs:<user_id> in Redis) are cached per worker; other workers see a save within this TTL
+    preferences_cache_ttl_seconds: int = Field(default_factory=lambda: int(os.getenv("PREFERENCES_CACHE_TTL_SECONDS", "30")))
+
+    # "sync" runs the workflow in the threadpool; "async" uses ainvoke with async clients/drivers
+    execution_mode: str = Field(default_factory=lambda: os.getenv("EXECUTION_MODE", "sync").lower())
+    # "single": one router call per turn; "two_stage": input validation then supervisor
+    routing_mode: str = Field(default_factory=lambda: os.getenv("ROUTING_MODE", "single").lower())
+    # Local intent fast path in front of the LLM router
+    intent_fast_path: bool = Field(default_factory=lambda: os.getenv("INTENT_FAST_PATH", "true").lower() == "true")
+    intent_nearest_neighbour: bool = Field(default_factory=lambda: os.getenv("INTENT_NEAREST_NEIGHBOUR", "true").lower() == "true")
+    intent_confidence_threshold: float = Field(default_factory=lambda: float(os.getenv("INTENT_CONFIDENCE_THRESHOLD", "0.9")))
+    # Rule-based filter extraction; the query_enhancer LLM only sees queries it cannot fully parse
+    filter_parser: bool = Field(default_factory=lambda: os.getenv("FILTER_PARSER", "true").lower() == "true")
+    # recommendation_node loads preferences/previous messages/parsed filters once for both fan-out branches
+    turn_context_preload: bool = Field(default_factory=lambda: os.getenv("TURN_CONTEXT_PRELOAD", "true").lower() == "true")
 
     # Admin
-    admin_email: str = Field(default_factory=lambda: os.getenv("ADMIN_EMAIL"))
-    secret_key: str = Field(default_factory=lambda: os.getenv("SECRET_KEY"))
+    admin_email: Optional[str] = Field(default_factory=lambda: os.getenv("ADMIN_EMAIL"))
+    secret_key: Optional[str] = Field(default_factory=lambda: os.getenv("SECRET_KEY"))
 
     class Config:
         env_prefix = "FINDMYHOME_"
@@ -60,25 +149,87 @@ class Settings(BaseSettings):
 
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
+    # a local .env is read on first use, not at import; real environment variables win
+    load_dotenv(override=False)
     return Settings()  # type: ignore[arg-type]
 
 
 # Lazy imports, keeping these here avoids cycles in modules that need clients
+def _http_client_kwargs() -> dict:
+    import httpx
+
+    s = get_settings()
+    try:
+        import h2  # noqa: F401
+        http2 = s.http2
+    except ImportError:
+        http2 = False
+    return {
+        "http2": http2,
+        "limits": httpx.Limits(
+            max_connections=s.http_max_connections,
+            max_keepalive_connections=s.http_max_keepalive_connections,
+            keepalive_expiry=s.http_keepalive_expiry_seconds,
+        ),
+        "timeout": httpx.Timeout(s.http_timeout_seconds, connect=10.0),
+    }
+
+
+@lru_cache(maxsize=1)
+def get_http_client():
+    """Return the process-wide httpx.Client shared by all sync OpenAI clients (thread-safe)."""
+    import httpx
+
+    return httpx.Client(**_http_client_kwargs())
+
+
+@lru_cache(maxsize=1)
+def get_async_http_client():
+    """Return the process-wide httpx.AsyncClient shared by all async OpenAI clients."""
+    import httpx
+
+    return httpx.AsyncClient(**_http_client_kwargs())
+
+
+_chat_models: dict = {}
+_chat_models_lock = threading.Lock()
+
+
 def get_chat_model(temperature: float = 0.5):
-    """Return an AzureChatOpenAI model configured from env."""
-    from langchain_openai import AzureChatOpenAI
+    """Return a shared AzureChatOpenAI model configured from env.
 
+    One instance per deployment, riding on the pooled HTTP clients.
+    ``temperature`` is not sent (the deployment default applies), so callers
+    asking for different temperatures share that instance. Chat models hold
+    no per-call state, so it is safe to share between the threads LangGraph
+    runs fan-out branches on.
+    """
     s = get_settings()
-    return AzureChatOpenAI(
-        azure_endpoint=s.azure_endpoint,
-        azure_deployment=s.azure_openai_deployment,
-        openai_api_version=s.azure_openai_api_version,
-        # temperature=temperature,
-    )
+    key = s.azure_openai_deployment
+    model = _chat_models.get(key)
+    if model is not None:
+        return model
 
+    from langchain_openai import AzureChatOpenAI
+
+    with _chat_models_lock:
+        model = _chat_models.get(key)
+        if model is None:
+            model = _chat_models[key] = AzureChatOpenAI(
+                azure_endpoint=s.azure_endpoint,
+                azure_deployment=s.azure_openai_deployment,
+                openai_api_version=s.azure_openai_api_version,
+                api_key=s.azure_openai_api_key,
+                http_client=get_http_client(),
+                http_async_client=get_async_http_client(),
+                # temperature=temperature,
+            )
+        return model
 
+
+@lru_cache(maxsize=1)
 def get_azure_openai_client():
-    """Return raw Azure OpenAI client for embeddings, etc."""
+    """Return the shared raw Azure OpenAI client for embeddings, etc."""
     from openai import AzureOpenAI
 
     s = get_settings()
@@ -86,20 +237,30 @@ def get_azure_openai_client():
         api_key=s.azure_openai_key,
         api_version=s.azure_api_version,
         azure_endpoint=s.azure_openai_endpoint,
+        http_client=get_http_client(),
     )
 
 
-def get_graph(enhanced_schema: bool = True):
-    from langchain_neo4j import Neo4jGraph
-    s = get_settings()
-    return Neo4jGraph(
-        url=s.neo4j_url,
-        username=s.neo4j_username,
-        password=s.neo4j_password,
-        database=s.neo4j_database,
-        enhanced_schema=enhanced_schema,
+@lru_cache(maxsize=1)
+def get_async_azure_openai_client():
+    """Return the shared async Azure OpenAI client (embeddings in async mode)."""
+    from openai import AsyncAzureOpenAI
+
+    s = get_settings()
+    return AsyncAzureOpenAI(
+        api_key=s.azure_openai_key,
+        api_version=s.azure_api_version,
+        azure_endpoint=s.azure_openai_endpoint,
+        http_client=get_async_http_client(),
     )
 
+
+def get_graph(enhanced_schema: bool = True):
+    """Return the shared Neo4jGraph; the schema is scanned (or loaded) once per process."""
+    from .graph_store import get_schema_cache
+
+    return get_schema_cache(enhanced_schema).get_graph()
+
 def get_redis_checkpointer():
     """Return a Redis checkpointer for conversation state persistence."""
     from redis import Redis
@@ -118,6 +279,39 @@ def get_redis_checkpointer():
     redis_saver.setup()
     return redis_saver
 
+async def get_async_redis_checkpointer():
+    """Return an async Redis checkpointer (for `EXECUTION_MODE=async`)."""
+    from redis.asyncio import Redis as AsyncRedis
+    from langgraph.checkpoint.redis.aio import AsyncRedisSaver
+
+    s = get_settings()
+    redis_client = AsyncRedis(
+                    host=s.redis_host,
+                    port=s.redis_port,
+                    decode_responses=True,
+                    username="default",
+                    password=s.redis_password,
+                )
+
+    redis_saver = AsyncRedisSaver(redis_client=redis_client)
+    await redis_saver.asetup()
+    return redis_saver
+
+@lru_cache(maxsize=1)
+def get_async_neo4j_driver():
+    """Return the shared async Neo4j driver used by the async graph nodes."""
+    from neo4j import AsyncGraphDatabase
+
+    s = get_settings()
+    return AsyncGraphDatabase.driver(s.neo4j_url, auth=(s.neo4j_username, s.neo4j_password))
+
+async def arun_cypher(query: str, params: Optional[dict] = None) -> List[dict]:
+    """Run a Cypher query with the async driver; rows come back as plain dicts like Neo4jGraph.query."""
+    s = get_settings()
+    async with get_async_neo4j_driver().session(database=s.neo4j_database) as session:
+        result = await session.run(query, params or {})
+        return await result.data()
+
 def get_pg_connection():
     import psycopg2
     s = get_settings()
@@ -125,19 +319,266 @@ def get_pg_connection():
         raise RuntimeError("NEON_URL not configured; set it or use a .env file")
     return psycopg2.connect(s.neon_url)
 
-def embed_query(text: str) -> List[float]:
-    """Embed a single query string with Azure OpenAI (deployment from settings)."""
+def _register_vector(conn) -> None:
+    """Adapt numpy arrays to ``vector`` on a psycopg2 connection (pgvector adapter)."""
+    from pgvector.psycopg2 import register_vector
+
+    register_vector(conn)
+    conn.commit()
+
+
+async def _aregister_vector(conn) -> None:
+    """Adapt numpy arrays to ``vector`` on a psycopg 3 connection, dumped in binary format."""
+    from pgvector.psycopg import register_vector_async
+
+    await register_vector_async(conn)
+
+
+@lru_cache(maxsize=1)
+def get_pg_pool():
+    """Return the shared connection pool used by the property search queries."""
+    from .pg_pool import PropertyConnectionPool
+    from .metrics import metrics
+
+    s = get_settings()
+    pool = PropertyConnectionPool(
+        s.neon_url,
+        min_size=s.pg_pool_min_size,
+        max_size=s.pg_pool_max_size,
+        max_lifetime=s.pg_pool_max_lifetime_seconds,
+        check_idle=s.pg_pool_check_idle_seconds,
+        acquire_timeout=s.pg_pool_acquire_timeout_seconds,
+        prepare=s.pg_prepare_statements,
+        configure=_register_vector,
+    )
+    pool.open()
+    metrics.register_provider("pg_pool", pool.stats)
+    return pool
+
+_async_pg_pool = None
+_async_pg_pool_lock: Optional[asyncio.Lock] = None
+
+async def get_async_pg_pool():
+    """Return the async (psycopg 3) pool for the property search queries in async mode."""
+    global _async_pg_pool, _async_pg_pool_lock
+    if _async_pg_pool is not None:
+        return _async_pg_pool
+    if _async_pg_pool_lock is None:
+        # made on first use, inside the running loop, like the pool itself (no await before it is set)
+        _async_pg_pool_lock = asyncio.Lock()
+    async with _async_pg_pool_lock:
+        if _async_pg_pool is None:
+            from psycopg_pool import AsyncConnectionPool
+            from .metrics import metrics
+
+            s = get_settings()
+            if not s.neon_url:
+                raise RuntimeError("NEON_URL not configured; set it or use a .env file")
+            pool = AsyncConnectionPool(
+                s.neon_url,
+                min_size=s.pg_pool_min_size,
+                max_size=s.pg_pool_max_size,
+                max_lifetime=s.pg_pool_max_lifetime_seconds,
+                timeout=s.pg_pool_acquire_timeout_seconds,
+                check=AsyncConnectionPool.check_connection,
+                # prepare_threshold=0 makes psycopg PREPARE every statement server-side on first use
+                kwargs={"prepare_threshold": 0 if s.pg_prepare_statements else None},
+                configure=_aregister_vector,
+                open=False,
+            )
+            await pool.open()
+            metrics.register_provider("pg_async_pool", pool.get_stats)
+            _async_pg_pool = pool
+    return _async_pg_pool
+
+@lru_cache(maxsize=1)
+def get_cache_redis():
+    """Return a binary-safe Redis client for caches, or None when Redis is not configured."""
+    from redis import Redis
+
+    s = get_settings()
+    if not s.redis_host:
+        return None
+    return Redis(
+        host=s.redis_host,
+        port=s.redis_port,
+        password=s.redis_password,
+        decode_responses=False,
+        socket_timeout=2,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_embedding_cache():
+    """Return the embedding cache shared by embed_query and the memory vectorizer."""
+    import numpy as np
+
+    from .cache import TieredCache
+    from .metrics import metrics
+
+    s = get_settings()
+    cache = TieredCache(
+        # deployment in the namespace so a model swap never serves stale vectors
+        name=f"embcache:{s.azure_embed_deployment}",
+        max_entries=s.embed_cache_size,
+        ttl_seconds=s.embed_cache_ttl_seconds,
+        redis_factory=get_cache_redis if s.embed_cache_redis else None,
+        encode=lambda emb: np.asarray(emb, dtype=np.float32).tobytes(),
+        decode=lambda blob: np.frombuffer(blob, dtype=np.float32).tolist(),
+    )
+    metrics.register_provider("embedding_cache", cache.stats)
+    return cache
+
+
+@lru_cache(maxsize=1)
+def get_result_cache():
+    """Return the shared SQL/graph retrieval result cache."""
+    from .cache import TieredCache
+    from .metrics import metrics
+    from .result_cache import ResultCache, decode_rows, encode_rows
+
+    s = get_settings()
+    cache = ResultCache(
+        TieredCache(
+            name="results",
+            max_entries=s.result_cache_size,
+            ttl_seconds=s.result_cache_ttl_seconds,
+            redis_factory=get_cache_redis,
+            encode=encode_rows,
+            decode=decode_rows,
+        ),
+        redis_factory=get_cache_redis,
+        enabled=s.result_cache,
+        version_ttl=s.result_cache_version_ttl_seconds,
+    )
+    metrics.register_provider("result_cache", cache.stats)
+    return cache
+
+
+@lru_cache(maxsize=1)
+def get_preference_store():
+    """Return the per-user saved-preferences store (a Redis key per user, cached in process)."""
+    from .metrics import metrics
+    from .preferences import PreferenceStore
+
+    store = PreferenceStore(get_cache_redis, ttl_seconds=get_settings().preferences_cache_ttl_seconds)
+    metrics.register_provider("preferences", store.stats)
+    return store
+
+
+@lru_cache(maxsize=1)
+def get_property_store():
+    """Return the shared store of full property rows that compacted thread state refers to by id."""
+    from .cache import TieredCache
+    from .metrics import metrics
+    from .property_store import PropertyStore, decode_row, encode_row
+
+    s = get_settings()
+    cache = TieredCache(
+        name="props",
+        max_entries=2048,
+        ttl_seconds=s.property_store_ttl_seconds,
+        redis_factory=get_cache_redis,
+        encode=encode_row,
+        decode=decode_row,
+    )
+    metrics.register_provider("property_store", cache.stats)
+    return PropertyStore(cache)
+
+
+@lru_cache(maxsize=1)
+def get_cypher_template_cache():
+    """Return the shared intent-shape -> Cypher template cache (LRU in front of Redis)."""
+    from .cache import TieredCache
+    from .metrics import metrics
+
+    s = get_settings()
+    cache = TieredCache(
+        name="cyphertpl",
+        max_entries=256,
+        ttl_seconds=s.cypher_template_ttl_seconds,
+        redis_factory=get_cache_redis,
+        encode=lambda template: template.encode("utf-8"),
+        decode=lambda blob: blob.decode("utf-8"),
+    )
+    metrics.register_provider("cypher_template_cache", cache.stats)
+    return cache
+
+
+@lru_cache(maxsize=1)
+def get_intent_classifier():
+    """Return the shared local intent classifier; register extra rules on it at startup."""
+    from .intent import IntentClassifier
+
+    return IntentClassifier(threshold=get_settings().intent_confidence_threshold)
+
+
+def _embedding_key(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _embed_uncached(texts: List[str]) -> List[List[float]]:
     client = get_azure_openai_client()
     s = get_settings()
-    resp = client.embeddings.create(model=s.azure_embed_deployment, input=[text])
-    emb = resp.data[0].embedding
-    if len(emb) != s.embed_dim:
-        raise ValueError(f"Unexpected embedding dim {len(emb)} (expected {s.embed_dim})")
-    
-    # Validate embedding values
-    for i, val in enumerate(emb):
-        if not isinstance(val, (int, float)) or math.isnan(val) or math.isinf(val):
-            logger.warning(f"Invalid embedding value at index {i}: {val}")
-            emb[i] = 0.0
-    
-    return emb
\ No newline at end of file
+    resp = client.embeddings.create(model=s.azure_embed_deployment, input=texts)
+    return _validated_embeddings(resp)
+
+
+def _validated_embeddings(resp) -> List[List[float]]:
+    s = get_settings()
+    embeddings = []
+    for item in sorted(resp.data, key=lambda d: d.index):
+        emb = item.embedding
+        if len(emb) != s.embed_dim:
+            raise ValueError(f"Unexpected embedding dim {len(emb)} (expected {s.embed_dim})")
+
+        # Validate embedding values
+        for i, val in enumerate(emb):
+            if not isinstance(val, (int, float)) or math.isnan(val) or math.isinf(val):
+                logger.warning(f"Invalid embedding value at index {i}: {val}")
+                emb[i] = 0.0
+        embeddings.append(emb)
+    return embeddings
+
+
+def embed_texts(texts: List[str]) -> List[List[float]]:
+    """Embed several strings, sending only the cache misses in one multi-input request."""
+    cache = get_embedding_cache()
+    keys = [_embedding_key(t) for t in texts]
+    found = cache.get_many(set(keys))
+
+    missing = list(dict.fromkeys(t for t, k in zip(texts, keys) if k not in found))
+    if missing:
+        fresh = _embed_uncached(missing)
+        new_items = {_embedding_key(t): emb for t, emb in zip(missing, fresh)}
+        cache.set_many(new_items)
+        found.update(new_items)
+
+    return [list(found[k]) for k in keys]
+
+
+def embed_query(text: str) -> List[float]:
+    """Embed a single query string with Azure OpenAI (deployment from settings), via the cache."""
+    return embed_texts([text])[0]
+
+
+async def aembed_texts(texts: List[str]) -> List[List[float]]:
+    """Async embed_texts: cache tiers are consulted off-loop, misses go through the async client."""
+    cache = get_embedding_cache()
+    keys = [_embedding_key(t) for t in texts]
+    found = await asyncio.to_thread(cache.get_many, set(keys))
+
+    missing = list(dict.fromkeys(t for t, k in zip(texts, keys) if k not in found))
+    if missing:
+        s = get_settings()
+        resp = await get_async_azure_openai_client().embeddings.create(model=s.azure_embed_deployment, input=missing)
+        new_items = {_embedding_key(t): emb for t, emb in zip(missing, _validated_embeddings(resp))}
+        await asyncio.to_thread(cache.set_many, new_items)
+        found.update(new_items)
+
+    return [list(found[k]) for k in keys]
+
+
+async def aembed_query(text: str) -> List[float]:
+    """Async embed_query."""
+    return (await aembed_texts([text]))[0]
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import Any, Dict, Optional
+
+# Structured intent -> parameterised Cypher. The key is the *shape* of the
+# intent (which filters are present, never their values), so "2 BHK in Pune
+# under 50L" and "3 BHK in Chennai under 1 Cr" share one template. Templates
+# are derived from LLM-generated Cypher by swapping each literal that carries a
+# filter value for its ``$param``; a query with any literal left over is not
+# reusable and is not cached. A locality ("near Wakad") is a slot too: the
+# compiled filters cannot map it onto neighbourhoods, so these intents are the
+# ones that still reach Cypher generation and the ones worth caching.
+
+FIELDS = ["city", "property_type", "room_type", "has_balcony", "min_beds", "min_baths", "max_price", "min_area"]
+
+_NUM = r"-?\d+(?:\.\d+)?"
+_NUMERIC_SLOTS = {
+    "max_price": [r"(p\.price\s*<=?\s*)" + _NUM],
+    "min_area": [r"(p\.totalArea\s*>=?\s*)" + _NUM],
+    "min_beds": [r"(p\.beds\s*>=?\s*)" + _NUM, r"(rt\.rooms\s*(?:>=|=)\s*)" + _NUM],
+    "min_baths": [r"(p\.baths\s*>=?\s*)" + _NUM],
+}
+_STRING_LITERAL = re.compile(r"'[^']*'|\"[^\"]*\"")
+_LEFTOVER_NUMBER = re.compile(r"(?<![\w$.])\d+(?:\.\d+)?\b")
+_LIMIT = re.compile(r"\bLIMIT\s+\d+\b", re.IGNORECASE)
+# how the rule parser spells a locality in enhanced_user_query
+_NEAR = re.compile(r" near (.+?)(?= priced under | with | without |$)")
+
+
+def _as_dict(enh: Any) -> Dict[str, Any]:
+    if hasattr(enh, "model_dump"):
+        return enh.model_dump()
+    return dict(enh or {})
+
+
+def _locality(fields: Dict[str, Any]) -> Optional[str]:
+    m = _NEAR.search(fields.get("enhanced_user_query") or "")
+    return m.group(1) if m else None
+
+
+def intent_shape(enh: Any, schema: str) -> Optional[str]:
+    """Cache key for ``enh``; ``None`` when the intent carries no filters.
+
+    The schema hash is part of the key, so a schema change never serves a
+    template written against the old labels.
+    """
+    fields = _as_dict(enh)
+    present = [f for f in FIELDS if fields.get(f) is not None]
+    if _locality(fields):
+        present.append("locality")
+    if not present:
+        return None
+    schema_hash = hashlib.sha1(schema.encode("utf-8")).hexdigest()[:12]
+    return f"{schema_hash}:" + ",".join(present)
+
+
+def template_params(enh: Any) -> Dict[str, Any]:
+    fields = _as_dict(enh)
+    params = {f: fields[f] for f in FIELDS if fields.get(f) is not None}
+    locality = _locality(fields)
+    if locality:
+        # generated Cypher matches neighbourhood names as written and descriptions lower-cased
+        params["locality"] = locality
+        params["locality_lower"] = locality.lower()
+    return params
+
+
+def parameterize(cypher: str, enh: Any) -> Optional[str]:
+    """Rewrite ``cypher`` with ``$param`` placeholders for the intent values; ``None`` if not reusable."""
+    params = template_params(enh)
+    template = cypher
+
+    for field, patterns in _NUMERIC_SLOTS.items():
+        for pattern in patterns:
+            if field in params:
+                template = re.sub(pattern, lambda m, f=field: f"{m.group(1)}${f}", template)
+
+    if "has_balcony" in params:
+        template = re.sub(r"(p\.hasBalcony\s*=\s*)(?:true|false)\b", r"\1$has_balcony", template, flags=re.IGNORECASE)
+
+    for field in ("city", "property_type", "room_type", "locality", "locality_lower"):
+        if field in params:
+            value = re.escape(str(params[field]))
+            template = re.sub(r"(['\"])" + value + r"\1", f"${field}", template)
+
+    # every filter must have made it into the query, or the template drops it for all later hits;
+    # "$locality" also matches "$locality_lower", so either spelling counts for the locality
+    if any(f"${field}" not in template for field in params if field != "locality_lower"):
+        return None
+
+    # anything still literal is specific to this query (free text, values the
+    # intent does not know about) and would make the template wrong for the next one
+    body = _LIMIT.sub("", template)
+    if _STRING_LITERAL.search(body) or _LEFTOVER_NUMBER.search(body):
+        return None
+    return template
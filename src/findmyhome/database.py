@@ -5,6 +5,7 @@ from datetime import datetime
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from contextlib import contextmanager
+from functools import lru_cache
 from typing import List, Optional
 
 from .config import get_settings
@@ -15,23 +16,29 @@ def get_database_url():
     return settings.neon_url
 
 
-engine = create_engine(
-    get_database_url(),
-    pool_pre_ping=True,      # detects dead connections and reconnects
-    pool_recycle=1800,       # optional: recycle every 30 min
-    pool_size=5,             # keep small for serverless db
-    max_overflow=0,
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+@lru_cache(maxsize=1)
+def get_engine():
+    """The users/chats engine, created on first use (nothing connects at import)."""
+    return create_engine(
+        get_database_url(),
+        pool_pre_ping=True,      # detects dead connections and reconnects
+        pool_recycle=1800,       # optional: recycle every 30 min
+        pool_size=5,             # keep small for serverless db
+        max_overflow=0,
+    )
+
+@lru_cache(maxsize=1)
+def get_session_factory():
+    return sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
 
 def create_tables():
     """Create all tables in the database"""
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=get_engine())
 
 @contextmanager
 def get_db_session():
     """Context manager for database sessions"""
-    session = SessionLocal()
+    session = get_session_factory()()
     try:
         yield session
         session.commit()
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import numbers
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+# One compiler from a QueryEnhancer-shaped intent to both the pgvector SQL
+# WHERE fragment and the equivalent Cypher, so the two stores apply the same
+# filter semantics. Statement text depends only on the *shape* (which filters
+# are present); it is built once per shape and memoised, and each turn only
+# binds values.
+
+FIELDS = ("city", "has_balcony", "min_beds", "min_baths", "max_price", "min_area", "property_type", "room_type")
+_NUMERIC = {"min_beds": int, "min_baths": int, "max_price": float, "min_area": float}
+
+_SQL_CODED = {
+    "city": "city_code = %s",
+    "property_type": "property_type_code = %s",
+    "room_type": "room_type_code = %s",
+}
+_SQL_RAW = {
+    "city": '"cityName" ILIKE %s',
+    "property_type": "property_type = %s",
+    "room_type": "room_type = %s",
+}
+_SQL_COMMON = {
+    "has_balcony": '"hasBalcony" = %s',
+    "min_beds": "beds >= %s",
+    "min_baths": "baths >= %s",
+    "max_price": "price <= %s",
+    "min_area": '"totalArea" >= %s',
+}
+
+_CYPHER_MATCH = {
+    "city": "MATCH (p)-[:IN_NEIGHBORHOOD]->(:Neighborhood)-[:PART_OF]->(:City {name: $city})",
+    "property_type": "MATCH (p)-[:OF_TYPE]->(:PropertyType {name: $property_type})",
+    "room_type": "MATCH (p)-[:HAS_LAYOUT]->(:RoomType {name: $room_type})",
+}
+_CYPHER_WHERE = {
+    "has_balcony": "p.hasBalcony = $has_balcony",
+    "min_beds": "p.beds >= $min_beds",
+    "min_baths": "p.baths >= $min_baths",
+    "max_price": "p.price <= $max_price",
+    "min_area": "p.totalArea >= $min_area",
+}
+
+
+class CompiledFilters(NamedTuple):
+    shape: Tuple[str, ...]
+    sql_where: List[str]
+    sql_params: List[Any]
+    cypher: str
+    cypher_params: Dict[str, Any]
+
+
+def _as_dict(enh: Any) -> Dict[str, Any]:
+    if hasattr(enh, "model_dump"):
+        return enh.model_dump()
+    return dict(enh or {})
+
+
+def _values(enh: Any) -> Dict[str, Any]:
+    """Present filter values, normalised; numeric filters must be numbers, text filters non-empty."""
+    fields = _as_dict(enh)
+    values: Dict[str, Any] = {}
+    for f in FIELDS:
+        v = fields.get(f)
+        if f in _NUMERIC:
+            if isinstance(v, numbers.Number) and not isinstance(v, bool):
+                values[f] = _NUMERIC[f](v)
+        elif f == "has_balcony":
+            if v is not None:
+                values[f] = bool(v)
+        elif v:
+            values[f] = v
+    return values
+
+
+def filter_shape(enh: Any) -> Tuple[str, ...]:
+    return tuple(_values(enh))
+
+
+@lru_cache(maxsize=256)
+def _sql_fragment(shape: Tuple[str, ...], coded: bool) -> Tuple[str, ...]:
+    text = _SQL_CODED if coded else _SQL_RAW
+    return tuple(text.get(f) or _SQL_COMMON[f] for f in shape)
+
+
+@lru_cache(maxsize=256)
+def _cypher_statement(shape: Tuple[str, ...]) -> str:
+    lines = ["MATCH (p:Property)"]
+    lines += [_CYPHER_MATCH[f] for f in shape if f in _CYPHER_MATCH]
+    where = [_CYPHER_WHERE[f] for f in shape if f in _CYPHER_WHERE]
+    if where:
+        lines.append("WHERE " + " AND ".join(where))
+    lines.append("RETURN DISTINCT p")
+    return "\n".join(lines)
+
+
+# A statement ending in ``RETURN p`` (compiled, or a cached template) is paged
+# by appending the (price DESC, id) keyset to it: the boundary and the order
+# are part of the statement itself (and can use a Property(price) index)
+# instead of a CALL {} wrapper re-sorting its whole result on every page.
+_RETURN_P = re.compile(r"\s+RETURN\s+(?:DISTINCT\s+)?p(?:\s+LIMIT\s+\d+)?\s*;?\s*$", re.IGNORECASE)
+_NOT_PAGEABLE = re.compile(r"\b(?:RETURN|UNION|CALL)\b", re.IGNORECASE)
+_KEYSET_PAGE = """
+WITH DISTINCT p
+WITH p, coalesce(p.price, -1.0) AS price_key
+WHERE $after_id IS NULL OR price_key < $after_price OR (price_key = $after_price AND p.id > $after_id)
+RETURN p
+ORDER BY price_key DESC, p.id
+LIMIT $limit"""
+
+
+def price_key(p: Dict[str, Any]) -> float:
+    # must match the coalesce() in _KEYSET_PAGE
+    price = p.get("price")
+    return float(price) if price is not None else -1.0
+
+
+@lru_cache(maxsize=256)
+def keyset_cypher(cypher: str) -> Optional[str]:
+    """``cypher`` as one page ordered by (price DESC, id), or ``None`` if it does not end in ``RETURN p``.
+
+    Binds ``$after_price``/``$after_id`` (both null for the first page) and
+    ``$limit`` on top of the statement's own params.
+    """
+    m = _RETURN_P.search(cypher)
+    if m is None or _NOT_PAGEABLE.search(cypher[: m.start()]):
+        return None
+    return cypher[: m.start()] + _KEYSET_PAGE
+
+
+def compile_filters(enh: Any, coded: bool = True) -> CompiledFilters:
+    """SQL predicates/params and a Cypher statement/params for the filters in ``enh``.
+
+    ``coded`` compares city/property/room type against the normalised
+    ``*_code`` columns (see ``catalog_schema``) instead of the raw text.
+    """
+    values = _values(enh)
+    shape = tuple(values)
+    sql_params: List[Any] = []
+    for f, v in values.items():
+        if f == "city" and not coded:
+            sql_params.append(f"%{v}%")
+        elif f == "room_type" and coded:
+            sql_params.append(str(v).upper())
+        else:
+            sql_params.append(v)
+    return CompiledFilters(
+        shape=shape,
+        sql_where=list(_sql_fragment(shape, coded)),
+        sql_params=sql_params,
+        cypher=_cypher_statement(shape),
+        cypher_params=values,
+    )
+
+
+_SIMILARITY_SELECT = """
+      id, name, "cityName", beds, baths, price, "totalArea", "pricePerSqft",
+      room_type, property_type, "hasBalcony",
+      description,
+      description_embed <=> %s::vector({dim}) AS score"""
+
+
+@lru_cache(maxsize=256)
+def similarity_sql(shape: Tuple[str, ...], coded: bool, embed_dim: int, exclude: bool = False,
+                   after_score: bool = False) -> str:
+    """The full pgvector similarity statement for a filter shape; the vector is bound once, first.
+
+    ``after_score`` makes it a keyset page: only rows past a ``(score, id)``
+    boundary (``(score, id) > (%s, %s)``), ordered by ``score, id``.
+    ``exclude`` drops a short id list (``NOT id = ANY(%s)``), e.g. the rows
+    of the previous page. Both go on an outer query so they can use the
+    ``score`` alias; Postgres flattens it, so the ANN index still supplies the
+    ``score`` order and ``id`` only breaks ties (an incremental sort).
+    Params: vector, filter values, [score, id], [ids], limit.
+    """
+    where = list(_sql_fragment(shape, coded))
+    where_sql = ("WHERE " + " AND ".join(where)) if where else ""
+    select = _SIMILARITY_SELECT.format(dim=int(embed_dim))
+    if not (exclude or after_score):
+        return f"""
+    SELECT{select}
+    FROM properties
+    {where_sql}
+    ORDER BY score
+    LIMIT %s
+    """.strip()
+
+    page = (["(score, id) > (%s, %s)"] if after_score else []) + (["NOT (id = ANY(%s))"] if exclude else [])
+    return f"""
+    SELECT * FROM (
+      SELECT{select}
+      FROM properties
+      {where_sql}
+    ) candidates
+    WHERE {" AND ".join(page)}
+    ORDER BY score, id
+    LIMIT %s
+    """.strip()
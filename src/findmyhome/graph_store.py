@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, NamedTuple, Optional
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class SchemaSnapshot(NamedTuple):
+    version: int
+    schema: str
+    structured_schema: Dict[str, Any]
+    source: str
+    loaded_at: float
+
+
+_EMPTY = SchemaSnapshot(0, "", {}, "", 0.0)
+
+
+class GraphSchemaCache:
+    """Process-wide Neo4j client plus a snapshot of its (enhanced) schema.
+
+    The schema scan behind ``enhanced_schema=True`` samples every label and
+    relationship, so it is done once and shared by all requests. The snapshot
+    can be refreshed on a TTL by a daemon thread, on demand (admin endpoint),
+    or seeded from a file written by ``findmyhome dump-graph-schema``.
+
+    Each load publishes one immutable ``SchemaSnapshot`` (a single attribute
+    swap), so ``snapshot()`` never mixes two loads. The graph's own
+    ``schema``/``structured_schema`` attributes, which langchain reads, are
+    two separate writes made under the lock; read them inside ``reading()``.
+    """
+
+    def __init__(self, enhanced_schema: bool = True):
+        self.enhanced_schema = enhanced_schema
+        self._graph = None
+        self._lock = threading.Lock()
+        self._refresher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._snapshot = _EMPTY
+
+    def snapshot(self) -> SchemaSnapshot:
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    @contextmanager
+    def reading(self) -> Iterator[Any]:
+        """The shared graph, with its schema attributes held still (no refresh lands meanwhile)."""
+        graph = self.get_graph()
+        with self._lock:
+            yield graph
+
+    def _connect(self):
+        from langchain_neo4j import Neo4jGraph
+
+        s = get_settings()
+        return Neo4jGraph(
+            url=s.neo4j_url,
+            username=s.neo4j_username,
+            password=s.neo4j_password,
+            database=s.neo4j_database,
+            enhanced_schema=self.enhanced_schema,
+            refresh_schema=False,
+        )
+
+    def get_graph(self):
+        """Return the shared graph, connecting and loading the schema on first use."""
+        graph = self._graph
+        if graph is not None:
+            return graph
+        with self._lock:
+            if self._graph is None:
+                graph = self._connect()
+                schema_file = get_settings().neo4j_schema_file
+                if schema_file:
+                    self._apply(graph, self._read_file(schema_file), source=f"file:{schema_file}")
+                else:
+                    self._apply(graph, self._scan(graph), source="scan")
+                self._graph = graph
+            return self._graph
+
+    def _scan(self, graph) -> Dict[str, Any]:
+        from langchain_neo4j.graphs.neo4j_graph import format_schema, get_structured_schema
+
+        started = time.perf_counter()
+        structured = get_structured_schema(
+            driver=graph._driver,
+            is_enhanced=self.enhanced_schema,
+            database=graph._database,
+            timeout=graph.timeout,
+            sanitize=graph.sanitize,
+        )
+        logger.info(f"Neo4j schema scan took {time.perf_counter() - started:.2f}s")
+        return {
+            "structured_schema": structured,
+            "schema": format_schema(schema=structured, is_enhanced=self.enhanced_schema),
+        }
+
+    @staticmethod
+    def _read_file(path: str) -> Dict[str, Any]:
+        with open(path, "r", encoding="utf-8") as fh:
+            raw = fh.read()
+        try:
+            snapshot = json.loads(raw)
+        except json.JSONDecodeError:
+            # Plain schema text: good enough for prompting, but Cypher validation
+            # needs the relationship list so it will be a no-op until a refresh.
+            return {"schema": raw, "structured_schema": {}}
+        return {
+            "schema": snapshot.get("schema", ""),
+            "structured_schema": snapshot.get("structured_schema", {}),
+        }
+
+    def _apply(self, graph, snapshot: Dict[str, Any], source: str) -> None:
+        # called with _lock held
+        current = SchemaSnapshot(
+            version=self._snapshot.version + 1,
+            schema=snapshot.get("schema") or "",
+            structured_schema=snapshot.get("structured_schema") or {},
+            source=source,
+            loaded_at=time.time(),
+        )
+        self._snapshot = current
+        graph.structured_schema = current.structured_schema
+        graph.schema = current.schema
+        logger.info(f"Graph schema v{current.version} loaded from {source}")
+
+    def refresh(self) -> Dict[str, Any]:
+        """Re-scan the live graph and swap in the new schema snapshot."""
+        graph = self.get_graph()
+        snapshot = self._scan(graph)
+        with self._lock:
+            self._apply(graph, snapshot, source="scan")
+        return self.info()
+
+    def dump(self, path: str) -> None:
+        """Write the current snapshot to ``path`` for use as ``NEO4J_SCHEMA_FILE``."""
+        self.get_graph()
+        current = self.snapshot()
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(
+                {"schema": current.schema, "structured_schema": current.structured_schema},
+                fh,
+                default=str,
+                indent=2,
+            )
+
+    def info(self) -> Dict[str, Any]:
+        current = self.snapshot()
+        return {
+            "version": current.version,
+            "source": current.source,
+            "loaded_at": current.loaded_at,
+            "age_seconds": round(time.time() - current.loaded_at, 1) if current.loaded_at else None,
+            "background_refresh": bool(self._refresher and self._refresher.is_alive()),
+        }
+
+    def start_background_refresh(self, ttl_seconds: int) -> None:
+        """Refresh the schema every ``ttl_seconds`` from a daemon thread."""
+        if ttl_seconds <= 0 or (self._refresher and self._refresher.is_alive()):
+            return
+        self._stop.clear()
+
+        def _loop():
+            while not self._stop.wait(ttl_seconds):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logger.warning(f"Background graph schema refresh failed: {e}")
+
+        self._refresher = threading.Thread(target=_loop, name="graph-schema-refresh", daemon=True)
+        self._refresher.start()
+
+    def stop_background_refresh(self) -> None:
+        self._stop.set()
+
+    def close(self) -> None:
+        self.stop_background_refresh()
+        with self._lock:
+            if self._graph is not None:
+                self._graph.close()
+                self._graph = None
+
+
+_caches: Dict[bool, GraphSchemaCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_schema_cache(enhanced_schema: bool = True) -> GraphSchemaCache:
+    """Return the process-wide schema cache for the given schema mode."""
+    with _caches_lock:
+        cache = _caches.get(enhanced_schema)
+        if cache is None:
+            cache = _caches[enhanced_schema] = GraphSchemaCache(enhanced_schema)
+        return cache
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import re
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, NamedTuple, Optional, Pattern, Sequence, Union
+
+import numpy as np
+
+from .metrics import metrics
+
+CITIES = ["chennai", "bangalore", "bengaluru", "hyderabad", "mumbai", "thane", "kolkata", "pune", "new delhi", "delhi"]
+
+_CITY = r"\b(?:" + "|".join(re.escape(c) for c in CITIES) + r")\b"
+_LAYOUT = r"(?:\b\d+(?:\.5)?\s*(?:bhk|rk)\b|\b(?:flat|flats|apartment|apartments|villa|villas|studio|studios|independent house|house)\b)"
+_ASK = r"\b(?:show|find|recommend|suggest|search|looking for|look for|want|need|get me|list|any)\b"
+# the catalog is for-sale only; the router prompt rejects rental queries
+_RENT = r"\b(?:rent|rents|rented|rental|rentals|renting|lease|leased|leasing|pg|paying guest|tenants?)\b"
+# questions about results already shown belong to the discussion agent
+_REFERS_BACK = r"\b(?:you showed|shown|earlier|previous|above|that one|this one|first|second|third|last one|which one)\b"
+
+
+class IntentDecision(NamedTuple):
+    label: str
+    confidence: float
+    source: str  # "rule" or "nn"
+
+
+@dataclass
+class IntentRule:
+    """A label assigned when ``match`` accepts the lower-cased query.
+
+    ``match`` is a regex (searched) or a callable. ``requires_history`` rules
+    only fire once the thread has earlier turns, e.g. "show me more".
+    """
+
+    name: str
+    label: str
+    match: Union[str, Pattern, Callable[[str], bool]]
+    confidence: float = 0.95
+    requires_history: bool = False
+
+    def __post_init__(self):
+        if isinstance(self.match, str):
+            self.match = re.compile(self.match, re.IGNORECASE)
+
+    def matches(self, text: str) -> bool:
+        if callable(self.match) and not isinstance(self.match, re.Pattern):
+            return bool(self.match(text))
+        return self.match.search(text) is not None
+
+
+def _is_fresh_recommendation(text: str) -> bool:
+    return (
+        re.search(_CITY, text) is not None
+        and re.search(_LAYOUT, text) is not None
+        and re.search(_ASK, text) is not None
+        and re.search(_REFERS_BACK, text) is None
+    )
+
+
+DEFAULT_RULES: List[IntentRule] = [
+    IntentRule("rent_or_lease", "invalid", _RENT, confidence=0.97),
+    IntentRule(
+        "more_phrases",
+        "more",
+        r"^\s*(?:(?:can you |could you |please )?(?:show|give|get)(?: me)? (?:some |a few )?more\b"
+        r"|(?:any|some) more\b|more (?:please|options|properties|results|like (?:this|these|that))\b"
+        r"|is that all\b|anything else\b|what else\b)",
+        confidence=0.97,
+        requires_history=True,
+    ),
+    IntentRule("city_and_layout", "recommendation", _is_fresh_recommendation, confidence=0.92),
+]
+
+DEFAULT_EXAMPLES: Dict[str, List[str]] = {
+    "more": [
+        "show me more properties",
+        "is that all you have",
+        "can I have more properties",
+        "show me more similar to this",
+        "give me some more options",
+    ],
+    "recommendation": [
+        "Show me villas in South Delhi under 2 crores",
+        "I want something under 1.5 Cr with 3 BHK",
+        "2 BHK in New Delhi under 1 crore with balcony",
+        "Villa in Bangalore with 1200+ sq ft",
+        "Now show me options with a garden",
+    ],
+    "discussion": [
+        "What is the price per square foot of the second property?",
+        "Which one had the highest maintenance charges?",
+        "Was there a villa with 5 bathrooms?",
+        "What is the total area of the second property you showed?",
+    ],
+}
+
+
+class IntentClassifier:
+    """Cheap local intent classifier that runs before the LLM router.
+
+    Rules are tried first, in registration order. Otherwise the query embedding
+    is compared (cosine) with embeddings of labelled example queries. The nearest
+    label is accepted only if its similarity clears ``threshold`` and beats the
+    runner-up label by ``margin``. Anything else returns ``None`` and the turn
+    falls back to the LLM. Example embeddings are computed once, on first use,
+    through ``embed_texts`` (the cached embedding path).
+    """
+
+    def __init__(
+        self,
+        rules: Optional[Sequence[IntentRule]] = None,
+        examples: Optional[Dict[str, List[str]]] = None,
+        threshold: float = 0.9,
+        margin: float = 0.05,
+    ):
+        self.rules: List[IntentRule] = list(DEFAULT_RULES if rules is None else rules)
+        self.examples: Dict[str, List[str]] = dict(DEFAULT_EXAMPLES if examples is None else examples)
+        self.threshold = threshold
+        self.margin = margin
+        self._lock = threading.Lock()
+        self._labels: List[str] = []
+        self._matrix: Optional[np.ndarray] = None
+
+    # ---- configuration ----
+
+    def register_rule(self, rule: IntentRule, first: bool = False) -> None:
+        with self._lock:
+            if first:
+                self.rules.insert(0, rule)
+            else:
+                self.rules.append(rule)
+
+    def add_examples(self, label: str, queries: List[str]) -> None:
+        with self._lock:
+            self.examples.setdefault(label, []).extend(queries)
+            self._matrix = None  # re-embedded on next use
+
+    # ---- classification ----
+
+    def match_rules(self, text: str, has_history: bool) -> Optional[IntentDecision]:
+        lowered = (text or "").strip().lower()
+        if not lowered:
+            return None
+        for rule in self.rules:
+            if rule.requires_history and not has_history:
+                continue
+            if rule.confidence >= self.threshold and rule.matches(lowered):
+                return IntentDecision(rule.label, rule.confidence, "rule")
+        return None
+
+    def example_texts(self) -> List[str]:
+        return [q for label in sorted(self.examples) for q in self.examples[label]]
+
+    def needs_examples(self) -> bool:
+        return self._matrix is None and bool(self.examples)
+
+    def load_example_vectors(self, vectors: List[List[float]]) -> None:
+        """Install the embeddings of ``example_texts()`` (same order)."""
+        labels = [label for label in sorted(self.examples) for _ in self.examples[label]]
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        with self._lock:
+            self._labels = labels
+            self._matrix = matrix / norms
+
+    def match_examples(self, query_vec: Sequence[float], has_history: bool) -> Optional[IntentDecision]:
+        with self._lock:
+            matrix, labels = self._matrix, self._labels
+        if matrix is None or not labels:
+            return None
+        q = np.asarray(query_vec, dtype=np.float32)
+        norm = float(np.linalg.norm(q))
+        if norm == 0:
+            return None
+        sims = matrix @ (q / norm)
+
+        best: Dict[str, float] = {}
+        for label, sim in zip(labels, sims.tolist()):
+            if sim > best.get(label, -1.0):
+                best[label] = sim
+        ranked = sorted(best.items(), key=lambda kv: kv[1], reverse=True)
+        label, sim = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else -1.0
+        if label in ("more", "discussion") and not has_history:
+            return None
+        if sim < self.threshold or sim - runner_up < self.margin:
+            return None
+        return IntentDecision(label, round(sim, 4), "nn")
+
+    def classify(
+        self,
+        text: str,
+        has_history: bool,
+        embed: Optional[Callable[[str], Sequence[float]]] = None,
+    ) -> Optional[IntentDecision]:
+        """Return a confident decision, or ``None`` to defer to the LLM router.
+
+        ``embed`` maps the query to its vector; without it only the rules run.
+        """
+        decision = self.match_rules(text, has_history)
+        if decision is None and embed is not None and text:
+            decision = self.match_examples(embed(text), has_history)
+        record(decision)
+        return decision
+
+
+def record(decision: Optional[IntentDecision]) -> None:
+    """Count which path handled the turn (``intent.<source>.<label>`` or ``intent.fallback``)."""
+    if decision is None:
+        metrics.incr("intent.fallback")
+    else:
+        metrics.incr(f"intent.{decision.source}.{decision.label}")
@@ -1,25 +1,26 @@
 from __future__ import annotations
 
+import asyncio
 import os
 import ulid
 import logging
+from functools import lru_cache
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional, Union, Dict, Any
+from typing import TYPE_CHECKING, List, Optional, Union, Dict, Any
 from pydantic import BaseModel, Field
 
-from redis import Redis
-from redisvl.index import SearchIndex
-from redisvl.schema.schema import IndexSchema
-from redisvl.query import VectorRangeQuery
-from redisvl.query.filter import Tag
-from redisvl.utils.vectorize.text.azureopenai import AzureOpenAITextVectorizer
-
-from findmyhome.config import get_settings, embed_query
+from findmyhome.config import get_settings, get_preference_store
+from findmyhome.memory_index import memory_filter, memory_schema as memory_schema_from_settings
+from findmyhome.preferences import UserPreferences, format_preferences
 
 import math
 import numpy as np
-from redisvl.utils.vectorize.text.openai import OpenAITextVectorizer
+
+if TYPE_CHECKING:  # redis/redisvl load on first use
+    from redisvl.index import AsyncSearchIndex, SearchIndex
+    from redisvl.query import VectorRangeQuery
+    from findmyhome.memory_vectorizer import CachedAzureVectorizer
 
 # Set up logger
 logger = logging.getLogger(__name__)
@@ -40,27 +41,21 @@ class StoredMemory(Memory):
     user_id: Optional[str] = None
     thread_id: Optional[str] = None
 
-class UserPreferences(BaseModel):
-    min_price: int
-    max_price: int
-    min_area: int  
-    max_area: int
-    preferred_cities: List[str]
-
-# Azure deployment **name** (not the base model id)
-s = get_settings() 
-
-openai_embed = AzureOpenAITextVectorizer(
-    model=s.azure_embed_deployment,
-    api_config={
-        "azure_endpoint": s.azure_openai_endpoint,  # e.g. https://<resource>.openai.azure.com
-        "api_version": s.azure_api_version,                            # or the version you use
-        "api_key": s.azure_openai_key,
-    }
-    )
+# Clients and the index are built on first use, so importing this module
+# needs no credentials and opens no connections (see warmup.warmup).
+
+@lru_cache(maxsize=1)
+def get_memory_vectorizer() -> CachedAzureVectorizer:
+    from findmyhome.memory_vectorizer import CachedAzureVectorizer
+
+    s = get_settings()
+    # Azure deployment **name** (not the base model id)
+    return CachedAzureVectorizer(model=s.azure_embed_deployment, dims=s.embed_dim)
 
 # Redis connection for memory
 def get_redis_client():
+    from redis import Redis
+
     settings = get_settings()
     return Redis(
         host=settings.redis_host,
@@ -69,51 +64,65 @@ def get_redis_client():
         password=settings.redis_password,
     )
 
-# Memory schema for Redis
-memory_schema = IndexSchema.from_dict({
-    "index": {
-        "name": "findmyhome_memories",
-        "prefix": "memory",
-        "key_separator": ":",
-        "storage_type": "json",
-    },
-    "fields": [
-        {"name": "content", "type": "text"},
-        {"name": "memory_type", "type": "tag"},
-        {"name": "metadata", "type": "text"},
-        {"name": "created_at", "type": "text"},
-        {"name": "user_id", "type": "tag"},
-        {"name": "memory_id", "type": "tag"},
-        {
-            "name": "embedding",
-            "type": "vector",
-            "attrs": {
-                "algorithm": "flat",
-                "dims": 1536,  # OpenAI embedding dimension
-                "distance_metric": "cosine",
-                "datatype": "float32",
-            },
-        },
-    ],
-})
-
-# Initialize memory system
-redis_client = get_redis_client()
-# openai_embed = OpenAITextVectorizer(model="text-embedding-3-small")
-
-try:
-    long_term_memory_index = SearchIndex(
-        schema=memory_schema,
-        redis_client=redis_client,
+@lru_cache(maxsize=1)
+def get_memory_schema():
+    """Memory schema for Redis (HNSW by default, see memory_index)."""
+    return memory_schema_from_settings(get_settings())
+
+@lru_cache(maxsize=1)
+def get_memory_index() -> SearchIndex:
+    """The long-term memory index, created in Redis on first use if missing."""
+    from redisvl.index import SearchIndex
+
+    index = SearchIndex(
+        schema=get_memory_schema(),
+        redis_client=get_redis_client(),
         validate_on_load=True
     )
-    long_term_memory_index.create(overwrite=False)  # Don't overwrite existing
-    logger.info("Long-term memory index ready")
-except Exception as e:
-    logger.warning(f"Memory index might already exist: {e}")
+    try:
+        index.create(overwrite=False)  # Don't overwrite existing
+        logger.info("Long-term memory index ready")
+    except Exception as e:
+        logger.warning(f"Memory index might already exist: {e}")
+    return index
 
 SYSTEM_USER_ID = "system"
 
+_async_memory_index: Optional[AsyncSearchIndex] = None
+_async_memory_index_lock: Optional[asyncio.Lock] = None
+
+async def get_async_memory_index() -> AsyncSearchIndex:
+    """Async view of the long-term memory index (used in `EXECUTION_MODE=async`), created in Redis if missing."""
+    global _async_memory_index, _async_memory_index_lock
+    if _async_memory_index is not None:
+        return _async_memory_index
+    if _async_memory_index_lock is None:
+        # made on first use, inside the running loop (no await before it is set)
+        _async_memory_index_lock = asyncio.Lock()
+    async with _async_memory_index_lock:
+        if _async_memory_index is None:
+            from redis.asyncio import Redis as AsyncRedis
+            from redisvl.index import AsyncSearchIndex
+
+            settings = get_settings()
+            index = AsyncSearchIndex(
+                schema=get_memory_schema(),
+                redis_client=AsyncRedis(
+                    host=settings.redis_host,
+                    port=settings.redis_port,
+                    decode_responses=True,
+                    password=settings.redis_password,
+                ),
+                validate_on_load=True,
+            )
+            try:
+                await index.create(overwrite=False)  # Don't overwrite existing
+                logger.info("Long-term memory index ready")
+            except Exception as e:
+                logger.warning(f"Memory index might already exist: {e}")
+            _async_memory_index = index
+    return _async_memory_index
+
 def similar_memory_exists(
     content: str,
     memory_type: MemoryType,
@@ -121,8 +130,10 @@ def similar_memory_exists(
     distance_threshold: float = 0.1,
 ) -> bool:
     """Check if a similar long-term memory already exists."""
+    from redisvl.query import VectorRangeQuery
+
     try:
-        content_embedding = openai_embed.embed(content)
+        content_embedding = get_memory_vectorizer().embed(content)
         
         vector_query = VectorRangeQuery(
             vector=content_embedding,
@@ -130,13 +141,10 @@ def similar_memory_exists(
             vector_field_name="embedding",
             distance_threshold=distance_threshold,
             return_fields=["id"],
+            filter_expression=memory_filter(user_id or SYSTEM_USER_ID, memory_type),
         )
-        
-        # Use same string filter approach
-        # filter_str = f"@user_id:{{{user_id}}} @memory_type:{{{memory_type.value}}}"
-        # vector_query.set_filter(filter_str)
-        
-        results = long_term_memory_index.query(vector_query)
+
+        results = get_memory_index().query(vector_query)
         return len(results) > 0
     except Exception as e:
         logger.error(f"Error checking similar memory: {e}")
@@ -160,7 +168,7 @@ def store_memory(
         return
 
     try:
-        embedding = openai_embed.embed(content)
+        embedding = get_memory_vectorizer().embed(content)
         
         memory_data = {
             "user_id": user_id or SYSTEM_USER_ID,
@@ -172,11 +180,52 @@ def store_memory(
             "memory_id": str(ulid.ULID()),
         }
 
-        long_term_memory_index.load([memory_data])
+        get_memory_index().load([memory_data])
         logger.info(f"Stored {memory_type} memory: {content}")
     except Exception as e:
         logger.error(f"Error storing memory: {e}")
 
+def _memory_query(
+    query_embedding: List[float],
+    distance_threshold: float,
+    limit: int,
+    user_id: str,
+    memory_type: Union[Optional[MemoryType], List[MemoryType]] = None,
+) -> VectorRangeQuery:
+    from redisvl.query import VectorRangeQuery
+
+    # tag pre-filter: only this user's memories (of these types) are scored
+    return VectorRangeQuery(
+        vector=query_embedding,
+        return_fields=[
+            "content", "memory_type", "metadata", "created_at",
+            "memory_id", "user_id"
+        ],
+        num_results=limit,
+        vector_field_name="embedding",
+        distance_threshold=distance_threshold,
+        filter_expression=memory_filter(user_id or SYSTEM_USER_ID, memory_type),
+    )
+
+def _to_memories(results) -> List[StoredMemory]:
+    memories = []
+    for doc in results:
+        try:
+            memory = StoredMemory(
+                id=doc["id"],
+                memory_id=doc["memory_id"],
+                user_id=doc["user_id"],
+                memory_type=MemoryType(doc["memory_type"]),
+                content=doc["content"],
+                created_at=doc["created_at"],
+                metadata=doc["metadata"],
+            )
+            memories.append(memory)
+        except Exception as e:
+            logger.error(f"Error parsing memory: {e}")
+            continue
+    return memories
+
 def retrieve_memories(
     query: str,
     memory_type: Union[Optional[MemoryType], List[MemoryType]] = None,
@@ -189,103 +238,56 @@ def retrieve_memories(
         logger.debug(f"Retrieving memories for user {user_id}, query: {query}")
 
         # Get the embedding and normalize any extreme values
-        query_embedding = openai_embed.embed(query)
-
-        # Create the query WITHOUT filter_expression first
-        vector_query = VectorRangeQuery(
-            vector=query_embedding,
-            return_fields=[
-                "content", "memory_type", "metadata", "created_at",
-                "memory_id", "user_id"
-            ],
-            num_results=limit,
-            vector_field_name="embedding",
-            distance_threshold=distance_threshold,
-        )
-
-        # Build simple string filters (this approach works!)
-        # base_filters = [f"@user_id:{{{user_id or SYSTEM_USER_ID}}}"]
-
-        # if memory_type:
-        #     if isinstance(memory_type, list):
-        #         vals = [mt.value if hasattr(mt, "value") else str(mt) for mt in memory_type]
-        #         base_filters.append(f"@memory_type:{{{'|'.join(vals)}}}")
-        #     else:
-        #         mt_val = memory_type.value if hasattr(memory_type, "value") else str(memory_type)
-        #         base_filters.append(f"@memory_type:{{{mt_val}}}")
-
-        # Set the filter using string approach
-        # filter_str = " ".join(base_filters)
-        # logger.info(f"Using filter: {filter_str}")
-        # vector_query.set_filter(filter_str)
+        query_embedding = get_memory_vectorizer().embed(query)
+        vector_query = _memory_query(query_embedding, distance_threshold, limit, user_id, memory_type)
 
-        results = long_term_memory_index.query(vector_query)
+        results = get_memory_index().query(vector_query)
         logger.info(f"Got {len(results)} results with filters")
+        return _to_memories(results)
+    except Exception as e:
+        logger.error(f"Error retrieving memories: {e}")
+        return []
 
-        memories = []
-        for doc in results:
-            try:
-                memory = StoredMemory(
-                    id=doc["id"],
-                    memory_id=doc["memory_id"],
-                    user_id=doc["user_id"],
-                    memory_type=MemoryType(doc["memory_type"]),
-                    content=doc["content"],
-                    created_at=doc["created_at"],
-                    metadata=doc["metadata"],
-                )
-                memories.append(memory)
-            except Exception as e:
-                logger.error(f"Error parsing memory: {e}")
-                continue
-        
-        return memories
+async def aretrieve_memories(
+    query: str,
+    memory_type: Union[Optional[MemoryType], List[MemoryType]] = None,
+    user_id: str = SYSTEM_USER_ID,
+    distance_threshold: float = 0.5,
+    limit: int = 5,
+) -> List[StoredMemory]:
+    """Async retrieve_memories over the async Redis index."""
+    try:
+        query_embedding = await get_memory_vectorizer().aembed(query)
+        vector_query = _memory_query(query_embedding, distance_threshold, limit, user_id, memory_type)
+
+        index = await get_async_memory_index()
+        results = await index.query(vector_query)
+        return _to_memories(results)
     except Exception as e:
         logger.error(f"Error retrieving memories: {e}")
         return []
 
+# Saved preferences are structured data: one Redis key per user (see preferences.py),
+# not a vector memory. The vector index holds free-form episodic/semantic facts only.
+
 def store_user_preferences(user_id: str, preferences: UserPreferences):
-    """Store user preferences as episodic memory."""
-    
-    # Format preferences as natural language
-    content = f"""User preferences: 
-    - Budget: ₹{preferences.min_price:,} to ₹{preferences.max_price:,}
-    - Area: {preferences.min_area} to {preferences.max_area} sq ft
-    - Preferred cities: {', '.join(preferences.preferred_cities)}"""
-    
-    
-    metadata = {
-        "type": "user_preferences",
-        "min_price": preferences.min_price,
-        "max_price": preferences.max_price,
-        "min_area": preferences.min_area,
-        "max_area": preferences.max_area,
-        "cities": preferences.preferred_cities,
-    }
-    
-    store_memory(
-        content=content,
-        memory_type=MemoryType.EPISODIC,
-        user_id=user_id,
-        metadata=str(metadata)
-    )
+    """Save (replace) the user's search preferences."""
+    get_preference_store().put(user_id, preferences)
+    logger.info(f"Saved preferences for user {user_id}")
 
 def get_user_preferences_memory(user_id: str) -> Optional[str]:
-    """Retrieve user preferences from memory."""
-    memories = retrieve_memories(
-        query="user preferences budget price area cities",
-        memory_type=MemoryType.EPISODIC,
-        user_id=user_id,
-        limit=3
-    )
-    
-    if memories:
-        # Return the most recent preference
-        return memories[0].content
-    return None 
+    """The user's saved preferences as prompt text, or None."""
+    prefs = get_preference_store().get(user_id)
+    return format_preferences(prefs) if prefs else None
+
+async def aget_user_preferences_memory(user_id: str) -> Optional[str]:
+    """Async get_user_preferences_memory."""
+    prefs = await get_preference_store().aget(user_id)
+    return format_preferences(prefs) if prefs else None
 
 def clear_all_redis_data():
     """Clear ALL Redis data - both memory and checkpointer data."""
+    redis_client = get_redis_client()
     try:
         # Clear all keys (nuclear option)
         redis_client.flushdb()
@@ -293,7 +295,7 @@ def clear_all_redis_data():
         
         # Recreate the memory index
         try:
-            long_term_memory_index.create(overwrite=True)
+            get_memory_index().create(overwrite=True)
             logger.info("Recreated findmyhome_memories index")
         except Exception as e:
             logger.warning(f"Could not recreate memory index: {e}")
@@ -303,6 +305,7 @@ def clear_all_redis_data():
 
 def clear_specific_memory_data():
     """Clear only memory-related data, preserving other Redis data."""
+    redis_client = get_redis_client()
     try:
         # Clear memory keys
         memory_keys = redis_client.keys("memory:*")
@@ -335,7 +338,7 @@ def clear_specific_memory_data():
         
         # Recreate your memory index
         try:
-            long_term_memory_index.create(overwrite=True)
+            get_memory_index().create(overwrite=True)
             logger.info("Recreated memory index")
         except Exception as e:
             logger.warning(f"Memory index recreation: {e}")
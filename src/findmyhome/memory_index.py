@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
+
+if TYPE_CHECKING:
+    from redisvl.query.filter import FilterExpression
+    from redisvl.schema.schema import IndexSchema
+
+logger = logging.getLogger(__name__)
+
+# Long-term memory index (RediSearch over the memory:* JSON documents). The
+# vector field is HNSW, and every lookup carries @user_id/@memory_type tag
+# filters, so RediSearch restricts the candidates to that user's memories
+# instead of ranking everyone's. Changing the vector algorithm or its build
+# parameters needs the index dropped (keeping the documents) and re-created;
+# Redis then re-indexes the existing documents in the background.
+
+INDEX_NAME = "findmyhome_memories"
+PREFIX = "memory"
+VECTOR_FIELD = "embedding"
+ALGORITHMS = ("hnsw", "flat")
+
+
+def schema_dict(
+    algorithm: str = "hnsw",
+    dims: int = 1536,
+    m: int = 16,
+    ef_construction: int = 200,
+    ef_runtime: int = 10,
+    epsilon: float = 0.01,
+    name: str = INDEX_NAME,
+    prefix: str = PREFIX,
+) -> Dict[str, Any]:
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown memory index algorithm {algorithm!r}; use one of {ALGORITHMS}")
+    attrs: Dict[str, Any] = {
+        "algorithm": algorithm,
+        "dims": int(dims),
+        "distance_metric": "cosine",
+        "datatype": "float32",
+    }
+    if algorithm == "hnsw":
+        attrs.update(m=int(m), ef_construction=int(ef_construction), ef_runtime=int(ef_runtime), epsilon=float(epsilon))
+    return {
+        "index": {"name": name, "prefix": prefix, "key_separator": ":", "storage_type": "json"},
+        "fields": [
+            {"name": "content", "type": "text"},
+            {"name": "memory_type", "type": "tag"},
+            {"name": "metadata", "type": "text"},
+            {"name": "created_at", "type": "text"},
+            {"name": "user_id", "type": "tag"},
+            {"name": "memory_id", "type": "tag"},
+            {"name": VECTOR_FIELD, "type": "vector", "attrs": attrs},
+        ],
+    }
+
+
+def memory_schema(settings, **overrides) -> IndexSchema:
+    """The memory index schema from the MEMORY_INDEX_* settings."""
+    from redisvl.schema.schema import IndexSchema
+
+    params = dict(
+        algorithm=settings.memory_index_algorithm,
+        dims=settings.embed_dim,
+        m=settings.memory_hnsw_m,
+        ef_construction=settings.memory_hnsw_ef_construction,
+        ef_runtime=settings.memory_hnsw_ef_runtime,
+        epsilon=settings.memory_hnsw_epsilon,
+    )
+    params.update(overrides)
+    return IndexSchema.from_dict(schema_dict(**params))
+
+
+def _type_values(memory_type: Any) -> List[str]:
+    types = memory_type if isinstance(memory_type, (list, tuple, set)) else [memory_type]
+    return [t.value if hasattr(t, "value") else str(t) for t in types if t is not None]
+
+
+def memory_filter(user_id: str, memory_type: Union[Any, List[Any], None] = None) -> FilterExpression:
+    """``@user_id:{...}`` and, when given, ``@memory_type:{a|b}``; Tag escapes the hyphens in UUIDs."""
+    from redisvl.query.filter import Tag
+
+    expr = Tag("user_id") == str(user_id)
+    types = _type_values(memory_type)
+    if types:
+        expr = expr & (Tag("memory_type") == types)
+    return expr
+
+
+# ---- migration (CLI) ----
+
+def _pairs(items: Any) -> Dict[str, Any]:
+    """FT.INFO returns flat [key, value, ...] lists; fold one into a dict with lower-cased keys."""
+    if isinstance(items, dict):
+        return {str(k).lower(): v for k, v in items.items()}
+    items = list(items or [])
+    return {str(items[i]).lower(): items[i + 1] for i in range(0, len(items) - 1, 2)}
+
+
+def vector_attrs(info: Dict[str, Any]) -> Dict[str, Any]:
+    """The vector field's algorithm and build parameters as reported by FT.INFO (lower-cased, strings)."""
+    for attribute in info.get("attributes") or []:
+        attr = _pairs(attribute)
+        if str(attr.get("attribute") or attr.get("identifier", "")).lstrip("$.") != VECTOR_FIELD:
+            continue
+        return {k: str(v).lower() for k, v in attr.items() if k in ("algorithm", "dim", "m", "ef_construction")}
+    return {}
+
+
+def needs_reindex(info: Optional[Dict[str, Any]], schema: IndexSchema) -> bool:
+    """Whether the live index differs from ``schema`` in its vector algorithm, dims or HNSW build parameters.
+
+    Parameters FT.INFO does not report are assumed to match; use ``migrate(force=True)`` on such servers.
+    """
+    if info is None:
+        return True
+    live = vector_attrs(info)
+    attrs = schema.fields[VECTOR_FIELD].attrs
+    wanted = {"algorithm": attrs.algorithm.value.lower(), "dim": str(attrs.dims)}
+    if wanted["algorithm"] == "hnsw":
+        wanted.update(m=str(attrs.m), ef_construction=str(attrs.ef_construction))
+    return any(k in live and live[k] != v for k, v in wanted.items())
+
+
+def _info(index) -> Optional[Dict[str, Any]]:
+    return index.info() if index.exists() else None
+
+
+def index_status(index) -> Dict[str, Any]:
+    info = _info(index)
+    if info is None:
+        return {"name": index.name, "exists": False}
+    return {
+        "name": index.name,
+        "exists": True,
+        "documents": int(info.get("num_docs", 0)),
+        "percent_indexed": float(info.get("percent_indexed", 1)),
+        "vector": vector_attrs(info),
+        "up_to_date": not needs_reindex(info, index.schema),
+    }
+
+
+def migrate(index, force: bool = False, wait: bool = True, timeout: float = 600.0) -> Dict[str, Any]:
+    """Re-create the index with ``index.schema`` if the live one differs (or ``force``); documents are kept.
+
+    Existing ``memory:*`` documents are re-indexed by Redis in the background;
+    with ``wait`` this polls FT.INFO until that finishes or ``timeout`` passes.
+    Lookups during the re-index see only the documents indexed so far.
+    """
+    info = _info(index)
+    if info is not None and not force and not needs_reindex(info, index.schema):
+        return {**index_status(index), "migrated": False}
+    if info is not None:
+        logger.info(f"rebuilding index {index.name} (documents kept); live vector field: {vector_attrs(info)}")
+        index.delete(drop=False)
+    index.create(overwrite=False)
+    deadline = time.monotonic() + timeout
+    while wait and time.monotonic() < deadline:
+        live = index.info()
+        if float(live.get("percent_indexed", 1)) >= 1 and not int(live.get("indexing", 0)):
+            break
+        time.sleep(0.5)
+    return {**index_status(index), "migrated": True}
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from typing import List
+
+from redisvl.utils.vectorize.base import BaseVectorizer
+
+from findmyhome.config import aembed_query, aembed_texts, embed_query, embed_texts
+
+
+class CachedAzureVectorizer(BaseVectorizer):
+    """redisvl vectorizer over `config.embed_query`, so memory writes and lookups
+    share the process/Redis embedding cache with the property search path."""
+
+    @property
+    def type(self) -> str:
+        return "azure_openai_cached"
+
+    def _embed(self, text: str, **kwargs) -> List[float]:
+        return embed_query(text)
+
+    def _embed_many(self, texts: List[str], batch_size: int = 10, **kwargs) -> List[List[float]]:
+        return embed_texts(texts)
+
+    async def _aembed(self, text: str, **kwargs) -> List[float]:
+        return await aembed_query(text)
+
+    async def _aembed_many(self, texts: List[str], batch_size: int = 10, **kwargs) -> List[List[float]]:
+        return await aembed_texts(texts)
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict
+
+
+class Metrics:
+    """Tiny thread-safe metrics registry (counters, observations, providers).
+
+    Counters and observations are process-local and cheap enough to record on
+    every request. Providers are callables sampled at snapshot time, used for
+    components that already keep their own stats (e.g. connection pools).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._observations: Dict[str, Dict[str, float]] = {}
+        self._providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def incr(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] += value
+
+    def observe(self, name: str, value: float) -> None:
+        """Record a sample; snapshots report count, sum, mean and max."""
+        with self._lock:
+            obs = self._observations.get(name)
+            if obs is None:
+                self._observations[name] = {"count": 1, "sum": value, "max": value}
+            else:
+                obs["count"] += 1
+                obs["sum"] += value
+                obs["max"] = max(obs["max"], value)
+
+    def register_provider(self, name: str, provider: Callable[[], Dict[str, Any]]) -> None:
+        with self._lock:
+            self._providers[name] = provider
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            observations = {
+                name: {**obs, "mean": obs["sum"] / obs["count"] if obs["count"] else 0.0}
+                for name, obs in self._observations.items()
+            }
+            providers = dict(self._providers)
+        sampled = {}
+        for name, provider in providers.items():
+            try:
+                sampled[name] = provider()
+            except Exception as e:  # never let a broken provider break /admin/metrics
+                sampled[name] = {"error": str(e)}
+        return {"counters": counters, "observations": observations, **sampled}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._observations.clear()
+
+
+metrics = Metrics()
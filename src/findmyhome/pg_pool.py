@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, Optional, Sequence
+
+import psycopg2
+import psycopg2.extensions
+
+logger = logging.getLogger(__name__)
+
+# psycopg2 placeholders; "%%" is an escaped literal percent, not a placeholder
+_PLACEHOLDER = re.compile(r"%%|%s")
+
+
+def _server_sql(sql: str, n_params: int) -> str:
+    """``sql`` with its ``%s`` placeholders numbered ``$1..$n`` and ``%%`` unescaped, for PREPARE."""
+    count = sum(1 for m in _PLACEHOLDER.finditer(sql) if m.group() == "%s")
+    if count != n_params:
+        raise ValueError(f"statement has {count} placeholders but {n_params} parameters were given")
+    counter = iter(range(1, count + 1))
+    return _PLACEHOLDER.sub(lambda m: "%" if m.group() == "%%" else f"${next(counter)}", sql)
+
+
+class PoolTimeout(RuntimeError):
+    """Raised when no connection frees up within the acquire timeout."""
+
+
+class PooledConnection(psycopg2.extensions.connection):
+    """psycopg2 connection carrying the bookkeeping the pool needs."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.prepared: set = set()
+
+
+class PropertyConnectionPool:
+    """Bounded, health-checked psycopg2 pool for the ``properties`` search path.
+
+    Separate from the SQLAlchemy engine in ``database.py`` (users/chats): this
+    pool only serves the pgvector similarity queries. Connections are
+    recycled after ``max_lifetime`` seconds, pinged with ``SELECT 1`` when they
+    sat idle longer than ``check_idle`` seconds (Neon drops idle sockets), and
+    callers block up to ``acquire_timeout`` seconds when all ``max_size``
+    connections are checked out. ``configure`` runs once on every new
+    connection (type adapters such as pgvector's).
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        min_size: int = 1,
+        max_size: int = 10,
+        max_lifetime: float = 1800,
+        check_idle: float = 30,
+        acquire_timeout: float = 10,
+        prepare: bool = True,
+        configure: Optional[Callable[[PooledConnection], None]] = None,
+    ):
+        if not dsn:
+            raise RuntimeError("NEON_URL not configured; set it or use a .env file")
+        if min_size > max_size:
+            raise ValueError("pg pool min_size cannot exceed max_size")
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.check_idle = check_idle
+        self.acquire_timeout = acquire_timeout
+        self.prepare = prepare
+        self.configure = configure
+
+        self._idle: Deque[PooledConnection] = deque()
+        self._size = 0
+        self._cond = threading.Condition()
+        self._stats: Dict[str, float] = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_seconds": 0.0,
+            "timeouts": 0,
+            "connections_created": 0,
+            "connections_recycled": 0,
+            "health_check_failures": 0,
+            "errors": 0,
+            "prepared_statements": 0,
+        }
+
+    # ---- lifecycle ----
+
+    def open(self) -> None:
+        """Pre-create ``min_size`` connections; failures are logged, not raised."""
+        for _ in range(self.min_size):
+            with self._cond:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                conn = self._create()
+            except Exception as e:
+                with self._cond:
+                    self._size -= 1
+                logger.warning(f"Could not pre-create pg connection: {e}")
+                return
+            with self._cond:
+                self._idle.append(conn)
+                self._cond.notify()
+
+    def close(self) -> None:
+        with self._cond:
+            while self._idle:
+                self._discard_locked(self._idle.popleft())
+
+    def _create(self) -> PooledConnection:
+        conn = psycopg2.connect(self.dsn, connection_factory=PooledConnection)
+        if self.configure is not None:
+            try:
+                self.configure(conn)
+            except Exception:
+                conn.close()
+                raise
+        with self._cond:
+            self._stats["connections_created"] += 1
+        return conn
+
+    def _discard_locked(self, conn: PooledConnection) -> None:
+        self._size -= 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+        self._cond.notify()
+
+    def _usable(self, conn: PooledConnection) -> bool:
+        now = time.monotonic()
+        if conn.closed:
+            return False
+        if now - conn.created_at > self.max_lifetime:
+            with self._cond:
+                self._stats["connections_recycled"] += 1
+            return False
+        if now - conn.last_used > self.check_idle:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+                conn.rollback()
+            except Exception:
+                with self._cond:
+                    self._stats["health_check_failures"] += 1
+                return False
+        return True
+
+    # ---- checkout ----
+
+    def _acquire(self) -> PooledConnection:
+        deadline = time.monotonic() + self.acquire_timeout
+        started = time.monotonic()
+        waited = False
+        while True:
+            conn: Optional[PooledConnection] = None
+            create = False
+            with self._cond:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeout(f"No pg connection available within {self.acquire_timeout}s")
+                    waited = True
+                    self._cond.wait(remaining)
+                if self._idle:
+                    conn = self._idle.pop()  # LIFO keeps the hot connections hot
+                else:
+                    self._size += 1
+                    create = True
+
+            if create:
+                try:
+                    conn = self._create()
+                except Exception:
+                    with self._cond:
+                        self._stats["errors"] += 1
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._usable(conn):
+                # health check runs outside the lock; drop the dead one and retry
+                with self._cond:
+                    self._discard_locked(conn)
+                continue
+
+            with self._cond:
+                self._stats["checkouts"] += 1
+                if waited:
+                    self._stats["waits"] += 1
+                    self._stats["wait_seconds"] += time.monotonic() - started
+            return conn
+
+    def _release(self, conn: PooledConnection, broken: bool) -> None:
+        with self._cond:
+            if broken or conn.closed:
+                self._discard_locked(conn)
+                return
+            conn.last_used = time.monotonic()
+            self._idle.append(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator[PooledConnection]:
+        """Check out a connection; commits on success, rolls back on error."""
+        conn = self._acquire()
+        broken = False
+        try:
+            yield conn
+            conn.commit()
+        except Exception as e:
+            with self._cond:
+                self._stats["errors"] += 1
+            broken = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+            if not conn.closed:
+                try:
+                    conn.rollback()
+                    # a failed PREPARE/EXECUTE leaves the bookkeeping unreliable
+                    if conn.prepared:
+                        with conn.cursor() as cur:
+                            cur.execute("DEALLOCATE ALL")
+                        conn.commit()
+                        conn.prepared.clear()
+                except Exception:
+                    broken = True
+            raise
+        finally:
+            self._release(conn, broken)
+
+    # ---- statements ----
+
+    def execute(self, cur, sql: str, params: Sequence[Any]) -> None:
+        """Execute ``sql`` as a server-side prepared statement on ``cur``'s connection.
+
+        The statement is PREPAREd once per connection (keyed on its text) and
+        then EXECUTEd with the bound parameters, so Postgres skips parse/plan
+        on repeat turns. Falls back to a plain execute when disabled, e.g. when
+        NEON_URL points at a transaction-mode PgBouncer endpoint.
+        """
+        conn = cur.connection
+        prepared = getattr(conn, "prepared", None)
+        if not self.prepare or prepared is None:
+            cur.execute(sql, params)
+            return
+
+        name = "fmh_" + hashlib.sha1(sql.encode("utf-8")).hexdigest()[:16]
+        if name not in prepared:
+            cur.execute(f"PREPARE {name} AS {_server_sql(sql, len(params))}")
+            prepared.add(name)
+            with self._cond:
+                self._stats["prepared_statements"] += 1
+        placeholders = ", ".join(["%s"] * len(params))
+        cur.execute(f"EXECUTE {name} ({placeholders})" if params else f"EXECUTE {name}", params)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update(
+                size=self._size,
+                idle=len(self._idle),
+                in_use=self._size - len(self._idle),
+                min_size=self.min_size,
+                max_size=self.max_size,
+            )
+        return stats
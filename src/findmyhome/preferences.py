@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import ast
+import asyncio
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from .cache import TieredCache
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "prefs"
+# users known to have no saved preferences are cached too (TieredCache treats None as a miss)
+_NONE: Dict[str, Any] = {}
+
+
+class UserPreferences(BaseModel):
+    min_price: int
+    max_price: int
+    min_area: int
+    max_area: int
+    preferred_cities: List[str]
+
+
+def preferences_key(user_id: str) -> str:
+    return f"{KEY_PREFIX}:{user_id}"
+
+
+def format_preferences(prefs: UserPreferences) -> str:
+    """The text agents see (and ``filter_parser.parse_preferences`` reads back)."""
+    return f"""User preferences:
+    - Budget: ₹{prefs.min_price:,} to ₹{prefs.max_price:,}
+    - Area: {prefs.min_area} to {prefs.max_area} sq ft
+    - Preferred cities: {', '.join(prefs.preferred_cities)}"""
+
+
+class PreferenceStore:
+    """Saved search preferences, one JSON value per user at ``prefs:<user_id>`` (no TTL).
+
+    A read is one GET behind an in-process LRU that also remembers users with
+    no preferences; ``put`` writes through and refreshes this worker's entry.
+    Other workers see a change once their entry expires (``ttl_seconds``), so
+    the TTL is kept short: it only has to absorb the reads of a single turn.
+    """
+
+    def __init__(self, redis_factory: Callable[[], Any], ttl_seconds: float = 30, max_entries: int = 4096):
+        self._redis_factory = redis_factory
+        self.local = TieredCache(name="prefs", max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+    def get(self, user_id: str) -> Optional[UserPreferences]:
+        cached = self.local.get(user_id)
+        if cached is None:
+            client = self._redis_factory()
+            if client is None:
+                return None
+            try:
+                raw = client.get(preferences_key(user_id))
+            except Exception as e:
+                logger.warning(f"preferences lookup failed for {user_id}: {e}")
+                return None
+            cached = json.loads(raw) if raw else _NONE
+            self.local.set(user_id, cached)
+        return UserPreferences(**cached) if cached else None
+
+    async def aget(self, user_id: str) -> Optional[UserPreferences]:
+        cached = self.local.get(user_id)
+        if cached is not None:
+            return UserPreferences(**cached) if cached else None
+        return await asyncio.to_thread(self.get, user_id)
+
+    def put(self, user_id: str, prefs: UserPreferences) -> None:
+        client = self._redis_factory()
+        if client is None:
+            raise RuntimeError("Redis is not configured; preferences cannot be saved")
+        value = prefs.model_dump()
+        client.set(preferences_key(user_id), json.dumps(value))
+        self.local.set(user_id, value)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.local.stats()
+
+
+# ---- migration from the vector memory (CLI) ----
+
+def legacy_preferences(doc: Dict[str, Any]) -> Optional[UserPreferences]:
+    """Preferences from a ``memory:*`` document written by the old ``store_user_preferences``.
+
+    Its ``metadata`` is ``str(dict)``, so it is read back with ``literal_eval``.
+    """
+    try:
+        meta = ast.literal_eval(doc.get("metadata") or "{}")
+    except (ValueError, SyntaxError):
+        return None
+    if not isinstance(meta, dict) or meta.get("type") != "user_preferences":
+        return None
+    try:
+        return UserPreferences(
+            min_price=meta["min_price"],
+            max_price=meta["max_price"],
+            min_area=meta["min_area"],
+            max_area=meta["max_area"],
+            preferred_cities=meta["cities"],
+        )
+    except (KeyError, ValueError) as e:
+        logger.warning(f"skipping unreadable preferences memory: {e}")
+        return None
+
+
+def migrate_from_memories(client, store: PreferenceStore, delete: bool = False) -> Dict[str, int]:
+    """Copy each user's newest preferences memory into the store; ``delete`` removes those memory documents.
+
+    Users who already have a ``prefs:`` key are left alone.
+    """
+    newest: Dict[str, tuple] = {}
+    keys: List[str] = []
+    for key in client.scan_iter(match="memory:*", count=1000):
+        doc = client.json().get(key)
+        prefs = legacy_preferences(doc) if isinstance(doc, dict) else None
+        if prefs is None or not doc.get("user_id"):
+            continue
+        keys.append(key)
+        user_id = doc["user_id"]
+        if user_id not in newest or doc.get("created_at", "") > newest[user_id][0]:
+            newest[user_id] = (doc.get("created_at", ""), prefs)
+
+    written = 0
+    for user_id, (_, prefs) in newest.items():
+        if client.exists(preferences_key(user_id)):
+            continue
+        store.put(user_id, prefs)
+        written += 1
+    if delete and keys:
+        client.delete(*keys)
+    return {"memories": len(keys), "users": len(newest), "written": written, "deleted": len(keys) if delete else 0}
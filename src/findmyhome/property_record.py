@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+# One compact shape for a property, whether it came from the SQL store or a
+# graph node. Prompts get a dense table (fixed columns, abbreviated units)
+# instead of a dict repr per row, and API payloads get only the card fields
+# the web client renders.
+
+PROMPT_COLUMNS = ("layout", "type", "name", "city", "price_rs", "sqft", "baths", "balcony", "rs_per_sqft", "about")
+PROMPT_LEGEND = "one per line under a header row; prices in rupees (Cr = crore, L = lakh, k = thousand), area in sq ft, balcony Y/N"
+DESCRIPTION_CHARS = 120
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return None if value is None or value == "" else float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _int(value: Any) -> Optional[int]:
+    n = _number(value)
+    return None if n is None else int(n)
+
+
+def _bool(value: Any) -> Optional[bool]:
+    if value is None or isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("true", "t", "yes", "y", "1")
+
+
+def short_amount(amount: Optional[float]) -> str:
+    """Rupees with Indian units: 1.15Cr, 50L, 9.2k."""
+    if amount is None:
+        return ""
+    if amount >= 1e7:
+        return f"{amount / 1e7:.3g}Cr"
+    if amount >= 1e5:
+        return f"{amount / 1e5:.3g}L"
+    if amount >= 1e3:
+        return f"{amount / 1e3:.3g}k"
+    return f"{amount:.0f}"
+
+
+def _cell(value: Any) -> str:
+    return "" if value is None else " ".join(str(value).replace("|", "/").split())
+
+
+@dataclass(slots=True)
+class PropertyRecord:
+    id: Optional[str]
+    name: str
+    city: str
+    property_type: str
+    room_type: str
+    beds: Optional[int]
+    baths: Optional[int]
+    price: Optional[float]
+    area: Optional[float]
+    price_per_sqft: Optional[float]
+    has_balcony: Optional[bool]
+    description: str
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "PropertyRecord":
+        """From a ``properties`` row or a graph ``Property`` node; extra keys (score, embeddings) are dropped."""
+        return cls(
+            id=None if row.get("id") is None else str(row["id"]),
+            name=row.get("name") or "",
+            city=row.get("cityName") or "",
+            property_type=row.get("property_type") or "",
+            room_type=row.get("room_type") or "",
+            beds=_int(row.get("beds")),
+            baths=_int(row.get("baths")),
+            price=_number(row.get("price")),
+            area=_number(row.get("totalArea")),
+            price_per_sqft=_number(row.get("pricePerSqft")),
+            has_balcony=_bool(row.get("hasBalcony")),
+            description=(row.get("description") or "").strip(),
+        )
+
+    def card(self) -> Dict[str, Any]:
+        """The fields the web client renders, under the store's column names."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "cityName": self.city,
+            "property_type": self.property_type,
+            "room_type": self.room_type,
+            "beds": self.beds,
+            "baths": self.baths,
+            "price": self.price,
+            "totalArea": self.area,
+            "pricePerSqft": self.price_per_sqft,
+            "hasBalcony": self.has_balcony,
+            "description": self.description,
+        }
+
+    def prompt_row(self) -> str:
+        """One ``|``-separated line in ``PROMPT_COLUMNS`` order; the id is left out."""
+        about = self.description
+        if len(about) > DESCRIPTION_CHARS:
+            about = about[:DESCRIPTION_CHARS].rsplit(" ", 1)[0] + "…"
+        layout = " ".join(str(v) for v in (self.beds, self.room_type) if v)
+        balcony = "" if self.has_balcony is None else ("Y" if self.has_balcony else "N")
+        cells = (
+            layout,
+            self.property_type,
+            self.name,
+            self.city,
+            short_amount(self.price),
+            "" if self.area is None else f"{self.area:g}",
+            self.baths,
+            balcony,
+            short_amount(self.price_per_sqft),
+            about,
+        )
+        return "|".join(_cell(c) for c in cells)
+
+
+def records(rows: Iterable[Any]) -> List[PropertyRecord]:
+    return [PropertyRecord.from_row(r) for r in rows or [] if isinstance(r, dict)]
+
+
+def prompt_table(rows: Iterable[Any]) -> str:
+    """Numbered property rows under a header line, for LLM prompts."""
+    lines = ["#|" + "|".join(PROMPT_COLUMNS)]
+    lines += [f"{i}|{r.prompt_row()}" for i, r in enumerate(records(rows), 1)]
+    return "\n".join(lines)
+
+
+def cards(rows: Iterable[Any]) -> List[Dict[str, Any]]:
+    return [r.card() for r in records(rows)]
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any, Dict, Iterable, List
+
+from .cache import TieredCache
+
+logger = logging.getLogger(__name__)
+
+
+def is_ref(row: Any) -> bool:
+    """A compacted row: only the property id is left."""
+    return isinstance(row, dict) and set(row) == {"id"}
+
+
+def encode_row(row: Dict[str, Any]) -> bytes:
+    return json.dumps(row, default=str).encode("utf-8")
+
+
+def decode_row(blob: bytes) -> Dict[str, Any]:
+    return json.loads(blob)
+
+
+class PropertyStore:
+    """Full property rows by id, for turns whose rows ``compact_state`` reduced to ``{"id": ...}``.
+
+    Rows are shared by every thread that showed them, so a compacted
+    checkpoint costs one id per property and the row itself is stored once.
+    Backed by the tiered cache (Redis when configured); a missing row leaves
+    the reference in place.
+    """
+
+    def __init__(self, cache: TieredCache):
+        self.cache = cache
+
+    def put(self, rows: Iterable[Dict[str, Any]]) -> int:
+        items = {str(r["id"]): r for r in rows if isinstance(r, dict) and r.get("id") is not None and not is_ref(r)}
+        self.cache.set_many(items)
+        return len(items)
+
+    def hydrate(self, rows: List[Any]) -> List[Any]:
+        """Swap references in ``rows`` for the stored rows where available."""
+        refs = [str(r["id"]) for r in rows if is_ref(r)]
+        if not refs:
+            return rows
+        found = self.cache.get_many(refs)
+        return [found.get(str(r["id"]), r) if is_ref(r) else r for r in rows]
+
+    def hydrate_turns(self, turn_log: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [
+            {**turn, "recommended_properties": self.hydrate(turn.get("recommended_properties") or [])}
+            if turn.get("recommended_properties") else turn
+            for turn in turn_log
+        ]
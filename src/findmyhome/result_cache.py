@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from .cache import TieredCache
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION_KEY = "catalog:version"
+
+
+def _json_default(value: Any):
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def encode_rows(rows: List[Dict[str, Any]]) -> bytes:
+    return json.dumps(rows, default=_json_default).encode("utf-8")
+
+
+def decode_rows(blob: bytes) -> List[Dict[str, Any]]:
+    return json.loads(blob)
+
+
+def vector_hash(vec: Sequence[float]) -> str:
+    """Stable hash of a query embedding (rounded, so float noise does not split keys)."""
+    return hashlib.sha1(",".join(f"{x:.6f}" for x in vec).encode("ascii")).hexdigest()
+
+
+class ResultCache:
+    """Cache of retrieval results (SQL rows, graph rows) for identical searches.
+
+    Keys hash the search inputs: filters, embedding, limit and exclusion set
+    for SQL, or Cypher text and bound params for the graph. They are prefixed
+    with the catalog version, which lives in Redis so every worker sees a
+    bump. Bumping after the ``properties`` table or the Neo4j graph is
+    reloaded makes every older entry unreachable; they then age out via the
+    TTL. Without Redis the version is per-process.
+
+    The version read from Redis is reused for ``version_ttl`` seconds, so a
+    hit costs one round trip; other workers see a bump within that window.
+    """
+
+    def __init__(self, cache: TieredCache, redis_factory: Optional[Callable[[], Any]] = None, enabled: bool = True,
+                 version_ttl: float = 5.0):
+        self.cache = cache
+        self.enabled = enabled
+        self.version_ttl = version_ttl
+        self._redis_factory = redis_factory
+        self._lock = threading.Lock()
+        self._local_version = 0
+        self._cached_version: Optional[int] = None
+        self._version_expires = 0.0
+
+    def _redis(self):
+        if self._redis_factory is None:
+            return None
+        try:
+            return self._redis_factory()
+        except Exception as e:
+            logger.warning(f"result cache: redis unavailable: {e}")
+            return None
+
+    def _remember_version(self, version: int) -> int:
+        with self._lock:
+            self._cached_version = version
+            self._version_expires = time.monotonic() + self.version_ttl
+        return version
+
+    def version(self) -> int:
+        with self._lock:
+            if self._cached_version is not None and time.monotonic() < self._version_expires:
+                return self._cached_version
+        client = self._redis()
+        if client is not None:
+            try:
+                return self._remember_version(int(client.get(CATALOG_VERSION_KEY) or 0))
+            except Exception as e:
+                logger.warning(f"result cache: could not read catalog version: {e}")
+        with self._lock:
+            return self._local_version
+
+    def bump(self) -> int:
+        """Invalidate every cached result; call after reloading the catalog."""
+        with self._lock:
+            self._local_version += 1
+            version = self._local_version
+        client = self._redis()
+        if client is not None:
+            try:
+                version = int(client.incr(CATALOG_VERSION_KEY))
+            except Exception as e:
+                logger.warning(f"result cache: could not bump catalog version: {e}")
+        self._remember_version(version)
+        self.cache.clear_local()
+        return version
+
+    def key(self, kind: str, parts: Dict[str, Any]) -> str:
+        digest = hashlib.sha256(json.dumps(parts, sort_keys=True, default=_json_default).encode("utf-8")).hexdigest()
+        return f"v{self.version()}:{kind}:{digest}"
+
+    def get_or_load(self, kind: str, parts: Dict[str, Any], loader: Callable[[], List[Dict[str, Any]]]):
+        if not self.enabled:
+            return loader()
+        key = self.key(kind, parts)
+        rows = self.cache.get(key)
+        if rows is None:
+            rows = loader()
+            self.cache.set(key, rows)
+        return rows
+
+    async def aget_or_load(self, kind: str, parts: Dict[str, Any], loader: Callable[[], Awaitable[List[Dict[str, Any]]]]):
+        if not self.enabled:
+            return await loader()
+        key = await asyncio.to_thread(self.key, kind, parts)
+        rows = await asyncio.to_thread(self.cache.get, key)
+        if rows is None:
+            rows = await loader()
+            await asyncio.to_thread(self.cache.set, key, rows)
+        return rows
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.cache.stats(), "catalog_version": self.version()}
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TABLE = "properties"
+COLUMN = "description_embed"
+# sql_agent orders by `<=>` (cosine distance), so the index must use the cosine opclass
+OPCLASS = "vector_cosine_ops"
+METHODS = ("hnsw", "ivfflat")
+
+# filters that can leave an ANN candidate list with too few survivors; a "more"
+# page discards every candidate before its keyset boundary
+SELECTIVE_FILTERS = ("city", "min_beds", "min_baths", "max_price", "min_area", "property_type", "room_type", "has_balcony",
+                     "after_score")
+
+_pgvector_version: Optional[Tuple[int, ...]] = None
+
+
+def index_name(method: str) -> str:
+    return f"{TABLE}_{COLUMN}_{method}_idx"
+
+
+def _check_method(method: str) -> None:
+    if method not in METHODS:
+        raise ValueError(f"Unknown vector index method {method!r}; use one of {METHODS}")
+
+
+def _parse_version(text: str) -> Tuple[int, ...]:
+    return tuple(int(part) for part in text.split(".") if part.isdigit())
+
+
+VERSION_SQL = "SELECT extversion FROM pg_extension WHERE extname = 'vector'"
+
+
+def remember_pgvector_version(row: Optional[tuple]) -> Tuple[int, ...]:
+    global _pgvector_version
+    _pgvector_version = _parse_version(row[0]) if row else ()
+    return _pgvector_version
+
+
+def pgvector_version(cur) -> Tuple[int, ...]:
+    """Installed pgvector version, looked up once per process on ``cur``."""
+    if _pgvector_version is None:
+        cur.execute(VERSION_SQL)
+        remember_pgvector_version(cur.fetchone())
+    return _pgvector_version
+
+
+async def apgvector_version(cur) -> Tuple[int, ...]:
+    if _pgvector_version is None:
+        await cur.execute(VERSION_SQL)
+        remember_pgvector_version(await cur.fetchone())
+    return _pgvector_version
+
+
+def is_selective(filters: Mapping[str, Any]) -> bool:
+    return any(filters.get(f) is not None for f in SELECTIVE_FILTERS)
+
+
+def search_settings(settings, filters: Mapping[str, Any], version: Tuple[int, ...]) -> List[str]:
+    """``SET LOCAL`` statements to run in the search transaction before the similarity query.
+
+    ``ef_search``/``probes`` come from config. With filters, the index may
+    return ``LIMIT`` candidates that the WHERE clause then throws away
+    (post-filter starvation), so pgvector >= 0.8 is asked to keep scanning the
+    index until enough rows pass (iterative scan); older versions get a wider
+    candidate list. Only the GUCs of the configured index method are set.
+    """
+    method = settings.vector_index_method
+    if method not in METHODS:
+        return []
+    selective = is_selective(filters)
+    mode = settings.vector_iterative_scan
+    iterative = selective and mode != "off" and version >= (0, 8, 0)
+
+    ef_search, probes = settings.hnsw_ef_search, settings.ivfflat_probes
+    if selective and not iterative:
+        # older pgvector: widen the candidate list instead
+        ef_search, probes = settings.hnsw_ef_search_filtered, settings.ivfflat_max_probes
+
+    if method == "hnsw":
+        statements = [f"SET LOCAL hnsw.ef_search = {int(ef_search)}"]
+    else:
+        statements = [f"SET LOCAL ivfflat.probes = {int(probes)}"]
+    if iterative:
+        statements.append(f"SET LOCAL {method}.iterative_scan = {mode}")
+        if method == "hnsw":
+            statements.append(f"SET LOCAL hnsw.max_scan_tuples = {int(settings.vector_max_scan_tuples)}")
+        else:
+            statements.append(f"SET LOCAL ivfflat.max_probes = {int(settings.ivfflat_max_probes)}")
+    return statements
+
+
+def order_by_score(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # relaxed_order iterative scans may return neighbours slightly out of order; id breaks ties, as in the "more" keyset
+    return sorted(rows, key=lambda r: (r.get("score") is None, r.get("score"), str(r.get("id"))))
+
+
+# ---- index management (CLI) ----
+
+def _ivfflat_lists(cur, requested: int) -> int:
+    if requested > 0:
+        return requested
+    cur.execute(f"SELECT count(*) FROM {TABLE}")
+    rows = cur.fetchone()[0]
+    # pgvector guidance: rows / 1000 up to 1M rows, sqrt(rows) beyond
+    return max(10, rows // 1000 if rows <= 1_000_000 else int(rows ** 0.5))
+
+
+def create_index_sql(method: str, m: int = 16, ef_construction: int = 64, lists: int = 100, concurrently: bool = True) -> str:
+    _check_method(method)
+    options = f"m = {int(m)}, ef_construction = {int(ef_construction)}" if method == "hnsw" else f"lists = {int(lists)}"
+    return (
+        f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {index_name(method)} "
+        f"ON {TABLE} USING {method} ({COLUMN} {OPCLASS}) WITH ({options})"
+    )
+
+
+def create_index(conn, method: str, m: int, ef_construction: int, lists: int = 0, rebuild: bool = False,
+                 maintenance_work_mem: Optional[str] = None) -> str:
+    """Create (or drop and re-create) the ANN index without blocking writers.
+
+    ``conn`` must be in autocommit mode, which ``CREATE INDEX CONCURRENTLY``
+    requires. ``lists=0`` sizes IVFFlat from the current row count, so run a
+    rebuild after large catalog loads.
+    """
+    _check_method(method)
+    with conn.cursor() as cur:
+        cur.execute("CREATE EXTENSION IF NOT EXISTS vector")
+        if maintenance_work_mem:
+            cur.execute("SET maintenance_work_mem = %s", (maintenance_work_mem,))
+        if rebuild:
+            cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name(method)}")
+        if method == "ivfflat":
+            lists = _ivfflat_lists(cur, lists)
+        sql = create_index_sql(method, m=m, ef_construction=ef_construction, lists=lists)
+        logger.info(sql)
+        cur.execute(sql)
+        cur.execute(f"ANALYZE {TABLE}")
+    return sql
+
+
+def drop_index(conn, method: str) -> None:
+    _check_method(method)
+    with conn.cursor() as cur:
+        cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name(method)}")
+
+
+def index_status(conn) -> List[Dict[str, Any]]:
+    """Vector indexes on the properties table with their definition, size and validity."""
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT i.relname, am.amname, pg_get_indexdef(i.oid), pg_size_pretty(pg_relation_size(i.oid)), x.indisvalid
+            FROM pg_index x
+            JOIN pg_class i ON i.oid = x.indexrelid
+            JOIN pg_class t ON t.oid = x.indrelid
+            JOIN pg_am am ON am.oid = i.relam
+            WHERE t.relname = %s AND am.amname IN ('hnsw', 'ivfflat')
+            """,
+            (TABLE,),
+        )
+        return [
+            {"name": name, "method": method, "definition": definition, "size": size, "valid": valid}
+            for name, method, definition, size, valid in cur.fetchall()
+        ]
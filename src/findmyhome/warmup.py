@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import logging
+import time
+from typing import Callable, Dict, List, Tuple
+
+from .config import (
+    get_settings,
+    get_http_client,
+    get_async_http_client,
+    get_chat_model,
+    get_cache_redis,
+    get_pg_pool,
+    get_async_pg_pool,
+    get_preference_store,
+)
+
+logger = logging.getLogger(__name__)
+
+# Importing findmyhome opens no connections; every client is built by its
+# factory on first use. warmup() calls those factories up front (from the API
+# lifespan) so the first request does not pay for them. A step that fails is
+# logged and skipped: the factory is retried on first use.
+
+
+def _steps() -> List[Tuple[str, Callable[[], object]]]:
+    from .memory import get_memory_index, get_memory_vectorizer
+    from .graph_store import get_schema_cache
+
+    steps = [
+        ("http_clients", lambda: (get_http_client(), get_async_http_client())),
+        ("chat_model", get_chat_model),
+        ("cache_redis", get_cache_redis),
+        ("preference_store", get_preference_store),
+        ("memory_index", lambda: (get_memory_vectorizer(), get_memory_index())),
+        ("schema_cache", lambda: get_schema_cache().get_graph()),
+    ]
+    if get_settings().execution_mode != "async":
+        steps.append(("pg_pool", get_pg_pool))
+    return steps
+
+
+async def warmup() -> Dict[str, float]:
+    """Build the shared clients, pools and indexes; returns seconds per step (failed steps omitted)."""
+    timings: Dict[str, float] = {}
+    for name, step in _steps():
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            logger.warning(f"warmup step {name} failed: {e}")
+            continue
+        timings[name] = time.perf_counter() - started
+    if get_settings().execution_mode == "async":
+        started = time.perf_counter()
+        try:
+            await get_async_pg_pool()
+            timings["pg_async_pool"] = time.perf_counter() - started
+        except Exception as e:
+            logger.warning(f"warmup step pg_async_pool failed: {e}")
+    logger.info("warmup done: " + ", ".join(f"{k}={v * 1000:.0f}ms" for k, v in timings.items()))
+    return timings
@@ -1,74 +1,134 @@
 from __future__ import annotations
 
-from typing import Dict
+from typing import Dict, Optional
 
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, START, END
 from langgraph.checkpoint.memory import InMemorySaver
 
 from .agents.state import RecommendationState
-from .agents.input import input_agent, invalid_agent
-from .agents.supervisor import supervisor_agent
-from .agents.discussion import discussion_agent
-from .agents.query_correction import query_correction_agent
-from .agents.graph_agent import graph_db_agent
-from .agents.query_enhancer import query_enhancer_agent
-from .agents.sql_agent import query_database_agent, more_recommendation
-from .agents.accumulate import accumulative_query_agent
-from .config import get_redis_checkpointer
-
-def recommendation_agent(state: RecommendationState):
-    # fan-out node placeholder (routes to both query_correction and query_enhancer)
-    return {}
-
+from .agents.input import input_agent, ainput_agent, invalid_agent, ainvalid_agent
+from .agents.supervisor import supervisor_agent, asupervisor_agent
+from .agents.router import router_agent, arouter_agent
+from .agents.intent import intent_classifier_agent, aintent_classifier_agent
+from .agents.discussion import discussion_agent, adiscussion_agent
+from .agents.query_correction import query_correction_agent, aquery_correction_agent
+from .agents.graph_agent import graph_db_agent, agraph_db_agent
+from .agents.query_enhancer import query_enhancer_agent, aquery_enhancer_agent
+from .agents.sql_agent import query_database_agent, aquery_database_agent, more_recommendation, amore_recommendation
+from .agents.accumulate import accumulative_query_agent, aaccumulative_query_agent
+from .agents.compaction import compact_state_agent, acompact_state_agent
+from .agents.turn_context import recommendation_agent, arecommendation_agent
+from .config import get_redis_checkpointer, get_async_redis_checkpointer, get_settings
+from .metrics import metrics
 
 def input_agent_evaluation(state: RecommendationState):
-    return state.get("input_agent", "invalid")
+    evaluation = state.get("input_agent", "invalid")
+    if evaluation == "invalid":
+        metrics.incr("routing.two_stage.invalid")
+    return evaluation
 
 
 def supervisor_agent_evaluation(state: RecommendationState):
-    return state.get("supervisor_evaluation", "recommendation")
+    evaluation = state.get("supervisor_evaluation", "recommendation")
+    metrics.incr(f"routing.two_stage.{evaluation}")
+    return evaluation
+
+
+def router_agent_evaluation(state: RecommendationState):
+    return state.get("router_evaluation", "recommendation")
+
+
+def intent_fast_path_evaluation(state: RecommendationState):
+    return state.get("intent_fast_path", "fallback")
 
 
-def build_graph() -> StateGraph:
+def _node(name: str, func, afunc):
+    # one node, two bodies: invoke/stream run ``func``, ainvoke/astream run ``afunc``
+    return RunnableLambda(func, afunc=afunc, name=name)
+
+
+def build_graph(routing: Optional[str] = None, fast_path: Optional[bool] = None) -> StateGraph:
+    """Build the agent graph.
+
+    ``routing`` picks how a turn is classified: ``"single"`` runs one router
+    call returning invalid/recommendation/discussion/more, ``"two_stage"``
+    keeps the original input validation followed by the supervisor. With
+    ``fast_path`` a local intent classifier runs first and only hands the turn
+    to the LLM routing when it is not confident. Both default to settings
+    (``ROUTING_MODE``, ``INTENT_FAST_PATH``).
+    """
+    s = get_settings()
+    routing = routing or s.routing_mode
+    fast_path = s.intent_fast_path if fast_path is None else fast_path
+    if routing not in ("single", "two_stage"):
+        raise ValueError(f"Unknown routing mode: {routing}")
     graph = StateGraph(RecommendationState)
 
-    graph.add_node("input_agent", input_agent)
-    graph.add_node("invalid_query", invalid_agent)
-    graph.add_node("supervisor", supervisor_agent)
-    graph.add_node("discussion_query", discussion_agent)
-    graph.add_node("query_correction", query_correction_agent)
-    graph.add_node("graph_db_agent", graph_db_agent)
-    graph.add_node("more_recommendation", more_recommendation)
-    graph.add_node("query_enhancer", query_enhancer_agent)
-    graph.add_node("query_database", query_database_agent)
-    graph.add_node("accumulative_query_results", accumulative_query_agent)
-    graph.add_node("recommendation_node", recommendation_agent)
-
-    graph.add_edge(START, "input_agent")
-    graph.add_conditional_edges(
-        "input_agent", input_agent_evaluation, {"invalid": "invalid_query", "valid": "supervisor"}
-    )
-    graph.add_edge("invalid_query", END)
-    graph.add_conditional_edges(
-        "supervisor",
-        supervisor_agent_evaluation,
-        {"recommendation": "recommendation_node", "discussion": "discussion_query", "more": "more_recommendation"},
+    if routing == "single":
+        graph.add_node("router", _node("router", router_agent, arouter_agent))
+    else:
+        graph.add_node("input_agent", _node("input_agent", input_agent, ainput_agent))
+        graph.add_node("supervisor", _node("supervisor", supervisor_agent, asupervisor_agent))
+    graph.add_node("invalid_query", _node("invalid_query", invalid_agent, ainvalid_agent))
+    graph.add_node("discussion_query", _node("discussion_query", discussion_agent, adiscussion_agent))
+    graph.add_node("query_correction", _node("query_correction", query_correction_agent, aquery_correction_agent))
+    graph.add_node("graph_db_agent", _node("graph_db_agent", graph_db_agent, agraph_db_agent))
+    graph.add_node("more_recommendation", _node("more_recommendation", more_recommendation, amore_recommendation))
+    graph.add_node("query_enhancer", _node("query_enhancer", query_enhancer_agent, aquery_enhancer_agent))
+    graph.add_node("query_database", _node("query_database", query_database_agent, aquery_database_agent))
+    graph.add_node(
+        "accumulative_query_results",
+        _node("accumulative_query_results", accumulative_query_agent, aaccumulative_query_agent),
     )
+    # fans out to query_correction and query_enhancer, after loading the context both of them read
+    graph.add_node("recommendation_node", _node("recommendation_node", recommendation_agent, arecommendation_agent))
+    # every turn ends here, so the checkpoint written after it is the bounded one
+    graph.add_node("compact_state", _node("compact_state", compact_state_agent, acompact_state_agent))
+
+    routes = {"recommendation": "recommendation_node", "discussion": "discussion_query", "more": "more_recommendation"}
+    llm_entry = "router" if routing == "single" else "input_agent"
+    if fast_path:
+        graph.add_node("intent_classifier", _node("intent_classifier", intent_classifier_agent, aintent_classifier_agent))
+        graph.add_edge(START, "intent_classifier")
+        graph.add_conditional_edges(
+            "intent_classifier",
+            intent_fast_path_evaluation,
+            {"fallback": llm_entry, "invalid": "invalid_query", **routes},
+        )
+    else:
+        graph.add_edge(START, llm_entry)
+
+    if routing == "single":
+        graph.add_conditional_edges("router", router_agent_evaluation, {"invalid": "invalid_query", **routes})
+    else:
+        graph.add_conditional_edges(
+            "input_agent", input_agent_evaluation, {"invalid": "invalid_query", "valid": "supervisor"}
+        )
+        graph.add_conditional_edges("supervisor", supervisor_agent_evaluation, routes)
+    graph.add_edge("invalid_query", "compact_state")
     graph.add_edge("recommendation_node", "query_correction")
     graph.add_edge("recommendation_node", "query_enhancer")
     graph.add_edge("query_correction", "graph_db_agent")
     graph.add_edge("query_enhancer", "query_database")
     graph.add_edge("graph_db_agent", "accumulative_query_results")
     graph.add_edge("query_database", "accumulative_query_results")
-    graph.add_edge("discussion_query", END)
-    graph.add_edge("more_recommendation", END)
-    graph.add_edge("accumulative_query_results", END)
+    graph.add_edge("discussion_query", "compact_state")
+    graph.add_edge("more_recommendation", "compact_state")
+    graph.add_edge("accumulative_query_results", "compact_state")
+    graph.add_edge("compact_state", END)
 
     return graph
 
 
-def compile_workflow(checkpointer=None):
+def compile_workflow(checkpointer=None, routing: Optional[str] = None, fast_path: Optional[bool] = None):
     checkpointer = checkpointer or get_redis_checkpointer()
-    graph = build_graph()
+    graph = build_graph(routing, fast_path)
     return graph.compile(checkpointer=checkpointer) # here need to pass redis_saver
 
+
+async def acompile_workflow(checkpointer=None, routing: Optional[str] = None, fast_path: Optional[bool] = None):
+    """Compile the graph for ``ainvoke``/``astream`` with the async Redis checkpointer."""
+    checkpointer = checkpointer or await get_async_redis_checkpointer()
+    graph = build_graph(routing, fast_path)
+    return graph.compile(checkpointer=checkpointer)
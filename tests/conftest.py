@@ -0,0 +1,90 @@
+import pytest
+
+
+class FakeRedis:
+    """The slice of redis.Redis the caches and stores use; pipelines apply immediately."""
+
+    def __init__(self):
+        self.store = {}
+        self.gets = 0
+
+    def get(self, key):
+        self.gets += 1
+        return self.store.get(key)
+
+    def mget(self, keys):
+        return [self.store.get(k) for k in keys]
+
+    def set(self, key, value, ex=None):
+        self.store[key] = value
+
+    def incr(self, key):
+        self.store[key] = int(self.store.get(key) or 0) + 1
+        return self.store[key]
+
+    def pipeline(self, transaction=False):
+        return self
+
+    def execute(self):
+        pass
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.connection = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        if self.connection.fail_with is not None:
+            raise self.connection.fail_with
+        self.connection.executed.append((sql, params))
+
+    def fetchall(self):
+        return self.connection.results.pop(0)
+
+    def fetchone(self):
+        return self.connection.results.pop(0)
+
+
+class FakeConn:
+    """A DB-API connection whose cursors record (sql, params) and return ``results`` in order."""
+
+    def __init__(self, results=()):
+        self.results = list(results)
+        self.executed = []
+        self.fail_with = None
+        self.closed = 0
+        self.created_at = self.last_used = 0.0
+        self.prepared = set()
+
+    @property
+    def statements(self):
+        return [sql for sql, _ in self.executed]
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
+
+
+@pytest.fixture
+def fake_conn():
+    """Factory: ``fake_conn(results)`` builds a FakeConn."""
+    return FakeConn
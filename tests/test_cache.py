@@ -0,0 +1,53 @@
+from findmyhome.cache import TieredCache
+
+
+def test_lru_evicts_oldest_and_counts_hits():
+    cache = TieredCache("t", max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)  # evicts "b", the least recently used
+
+    assert cache.get("b") is None
+    assert cache.get_many(["a", "c"]) == {"a": 1, "c": 3}
+    stats = cache.stats()
+    assert stats["local_hits"] == 3
+    assert stats["misses"] == 1
+    assert stats["evictions"] == 1
+
+
+def test_redis_tier_backfills_local_lru(fake_redis):
+    redis = fake_redis
+    writer = TieredCache("emb", redis_factory=lambda: redis, encode=str.encode, decode=bytes.decode)
+    writer.set("k", "v")
+    assert redis.store == {"emb:k": b"v"}
+
+    reader = TieredCache("emb", redis_factory=lambda: redis, encode=str.encode, decode=bytes.decode)
+    assert reader.get("k") == "v"
+    assert reader.get("k") == "v"
+    assert reader.stats()["redis_hits"] == 1
+    assert reader.stats()["local_hits"] == 1
+
+
+def test_expired_entries_are_misses():
+    cache = TieredCache("t", ttl_seconds=-1)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+
+def test_result_cache_version_bump_invalidates():
+    from findmyhome.result_cache import ResultCache
+
+    results = ResultCache(TieredCache("results"))
+    calls = []
+
+    def load():
+        calls.append(1)
+        return [{"id": "p1"}]
+
+    assert results.get_or_load("sql", {"q": 1}, load) == [{"id": "p1"}]
+    assert results.get_or_load("sql", {"q": 1}, load) == [{"id": "p1"}]
+    assert len(calls) == 1
+    results.bump()
+    results.get_or_load("sql", {"q": 1}, load)
+    assert len(calls) == 2
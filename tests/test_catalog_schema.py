@@ -0,0 +1,40 @@
+from findmyhome import catalog_schema
+from findmyhome.catalog_schema import index_sql, migrate, migration_sql, partition_sql, schema_status
+
+
+def test_migration_adds_generated_code_columns_and_concurrent_index(fake_conn):
+    ddl = migration_sql()
+    assert len(ddl) == 3 and all("ADD COLUMN IF NOT EXISTS" in s and "STORED" in s for s in ddl)
+    # longest value first, so "Independent House" is not read as a shorter type
+    assert "property_type_code text GENERATED ALWAYS AS (CASE WHEN property_type ILIKE '%Independent House%'" in ddl[1]
+    assert index_sql() == (
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS properties_filters_idx ON properties (city_code, property_type_code, beds, price)"
+    )
+
+    conn = fake_conn()
+    executed = migrate(conn)
+    # the table rewrite runs in one transaction; CREATE INDEX CONCURRENTLY cannot run inside one
+    statements = conn.statements
+    assert statements[0] == "BEGIN" and statements[4] == "COMMIT"
+    assert statements[5] == index_sql() and statements[-1] == "ANALYZE properties"
+    assert executed == migration_sql() + [index_sql()]
+
+
+def test_partition_sql_has_one_partition_per_city_and_a_default():
+    ddl = partition_sql()
+    assert ddl[0].startswith("CREATE TABLE IF NOT EXISTS properties_by_city (LIKE properties")
+    assert "CREATE TABLE IF NOT EXISTS properties_by_city_new_delhi PARTITION OF properties_by_city FOR VALUES IN ('New Delhi')" in ddl
+    assert sum("FOR VALUES IN" in s for s in ddl) == len(catalog_schema.CITIES)
+    assert any(s.endswith("PARTITION OF properties_by_city DEFAULT") for s in ddl)
+
+
+def test_status_and_missing_columns(monkeypatch, fake_conn):
+    conn = fake_conn([[("city_code",), ("room_type_code",)], (True,)])
+    assert schema_status(conn) == {"code_columns": ["city_code", "room_type_code"], "filter_index": "valid"}
+
+    monkeypatch.setattr(catalog_schema, "_code_columns_ready", None)
+    conn = fake_conn([[("city_code",)]])
+    assert catalog_schema.code_columns_ready(conn.cursor()) is False
+    assert catalog_schema.code_columns_ready(conn.cursor()) is False and len(conn.executed) == 1  # looked up once
+    monkeypatch.setattr(catalog_schema, "_code_columns_ready", None)
+    assert catalog_schema.code_columns_ready(fake_conn([[(c,) for c in catalog_schema.CODE_COLUMNS]]).cursor()) is True
@@ -0,0 +1,33 @@
+from findmyhome.agents.compaction import compact_values
+from findmyhome.agents.state import REPLACE, append_or_replace, replace_list
+
+
+def _row(i):
+    return {"id": str(i), "name": f"Property {i}", "description": "x" * 200, "score": 0.1}
+
+
+def _turns(n):
+    return {
+        "user_query": [f"q{i}" for i in range(n)],
+        "database_responses": [[_row(i)] for i in range(n)],
+        "graph_raw_history": [[{"p": _row(100 + i)}] for i in range(n)],
+        "turn_log": [{"question": f"q{i}", "answer": "a", "recommended_properties": [_row(i)]} for i in range(n)],
+        "graph_db_agent": [f"a{i}" for i in range(n)],
+    }
+
+
+def test_old_turns_become_id_references():
+    updates, evicted, before, after = compact_values(_turns(5), full_turns=2, byte_budget=10**9)
+    rows = append_or_replace([], updates["database_responses"])
+    assert rows[0] == [{"id": "0"}] and rows[-1] == [_row(4)]
+    assert append_or_replace([], updates["graph_raw_history"])[2] == [{"p": {"id": "102"}}]
+    assert append_or_replace([], updates["graph_db_agent"]) == ["a3", "a4"]
+    assert "user_query" not in updates and len(evicted) == 9 and after < before
+
+
+def test_byte_budget_drops_oldest_turns_and_reducer_appends_otherwise():
+    updates, _, _, after = compact_values(_turns(20), full_turns=2, byte_budget=1500)
+    assert append_or_replace([], updates["user_query"])[0] != "q0"
+    assert after <= 1500 or len(updates["turn_log"][REPLACE]) == 2
+    assert append_or_replace(["a"], ["b"]) == ["a", "b"]
+    assert append_or_replace(["a"], replace_list(["c"])) == ["c"]
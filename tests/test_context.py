@@ -0,0 +1,25 @@
+from findmyhome.agents import context
+from findmyhome.agents.context import fit_newest_first, turn_block
+
+ROW = {
+    "id": "p1", "name": "Krishna Nagar", "cityName": "New Delhi", "beds": 3, "room_type": "BHK",
+    "property_type": "Villa", "price": 11500000, "totalArea": 1250.0, "baths": 3, "hasBalcony": False,
+    "pricePerSqft": 9200.0, "description": "Corner villa " * 30,
+}
+
+
+def test_property_rows_collapse_to_one_line():
+    block = turn_block({"question": "villas?", "answered_by": "recommendation_agent", "answer": "ok",
+                        "recommended_properties": [ROW, {"id": "p2"}]})
+    lines = block.splitlines()
+    assert lines[lines.index("recommended_properties:") + 1].startswith("  #|layout|type|name")
+    row = next(line for line in lines if line.startswith("  1|"))
+    assert row.startswith("  1|3 BHK|Villa|Krishna Nagar|New Delhi|1.15Cr|1250|3|N|9.2k|Corner villa")
+    assert row.endswith("…") and len(row) < 200
+    assert "(1 more properties shown" in block
+
+
+def test_budget_keeps_newest_blocks(monkeypatch):
+    monkeypatch.setattr(context, "count_tokens", len)
+    assert fit_newest_first(["aaaa", "bbb", "cc"], 5) == ["bbb", "cc"]
+    assert fit_newest_first(["aaaa", "bbbbbbbb"], 5) == ["bbbbbbbb"]  # the newest is kept even over budget
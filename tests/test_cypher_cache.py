@@ -0,0 +1,54 @@
+from findmyhome.agents.state import QueryEnhancer
+from findmyhome.cypher_cache import intent_shape, parameterize, template_params
+
+GENERATED = (
+    'MATCH (p:Property)-[:IN_NEIGHBORHOOD]->(n:Neighborhood)-[:PART_OF]->(c:City {name:"Pune"}) '
+    'MATCH (p)-[:HAS_LAYOUT]->(rt:RoomType {name:"BHK"}) '
+    "WHERE rt.rooms >= 2 AND p.price <= 5000000 AND p.hasBalcony = true RETURN p LIMIT 10"
+)
+
+
+def _intent(**kw):
+    kw.setdefault("enhanced_user_query", "q")
+    return QueryEnhancer(**kw)
+
+
+def test_parameterize_swaps_every_filter_value():
+    enh = _intent(city="Pune", room_type="BHK", min_beds=2, max_price=5_000_000, has_balcony=True)
+    template = parameterize(GENERATED, enh)
+    assert '{name:$city}' in template and '{name:$room_type}' in template
+    assert "rt.rooms >= $min_beds" in template and "p.price <= $max_price" in template
+    assert "p.hasBalcony = $has_balcony" in template
+    assert template_params(enh)["max_price"] == 5_000_000
+
+
+def test_not_reusable_when_literals_remain_or_filters_missing():
+    enh = _intent(city="Pune", room_type="BHK", min_beds=2, max_price=5_000_000, has_balcony=True)
+    assert parameterize(GENERATED.replace("RETURN p", 'AND toLower(p.description) CONTAINS "metro" RETURN p'), enh) is None
+    assert parameterize(GENERATED.replace(" AND p.hasBalcony = true", ""), enh) is None
+
+
+def test_shape_ignores_values_but_not_schema():
+    a = intent_shape(_intent(city="Pune", min_beds=2), "schema-1")
+    assert a == intent_shape(_intent(city="Chennai", min_beds=3), "schema-1")
+    assert a != intent_shape(_intent(city="Pune", min_beds=2), "schema-2")
+    assert intent_shape(_intent(enhanced_user_query="Flats in Pune near Wakad", city="Pune"), "s") == (
+        intent_shape(_intent(enhanced_user_query="Flats in Pune near Hinjewadi priced under 50 lakh", city="Pune"), "s")
+    )
+    assert intent_shape(_intent(enhanced_user_query="Flats in Pune near Wakad", city="Pune"), "s") != intent_shape(
+        _intent(enhanced_user_query="Flats in Pune", city="Pune"), "s"
+    )
+
+
+def test_locality_becomes_a_parameter():
+    enh = _intent(enhanced_user_query="Properties in Pune near Wakad priced under 50 lakh", city="Pune", max_price=5_000_000)
+    generated = (
+        'MATCH (p:Property)-[:IN_NEIGHBORHOOD]->(n:Neighborhood)-[:PART_OF]->(c:City {name:"Pune"}) '
+        'WHERE (toLower(p.description) CONTAINS "wakad" OR n.name = "Wakad") AND p.price <= 5000000 RETURN p'
+    )
+    template = parameterize(generated, enh)
+    assert 'CONTAINS $locality_lower' in template and "n.name = $locality" in template
+    params = template_params(enh)
+    assert params["locality"] == "Wakad" and params["locality_lower"] == "wakad"
+    # a locality the generated query ignored would be dropped for every later hit
+    assert parameterize(generated.replace('(toLower(p.description) CONTAINS "wakad" OR n.name = "Wakad") AND ', ""), enh) is None
@@ -0,0 +1,34 @@
+from findmyhome.agents.filter_parser import parse_filters
+
+
+def test_prompt_examples():
+    q = parse_filters("Show me 2 bhk in south delhi under 1 cr with balcony")
+    assert (q.city, q.min_beds, q.room_type, q.property_type, q.max_price, q.has_balcony) == (
+        "New Delhi", 2, "BHK", "Flat", 10_000_000, True
+    )
+    assert q.enhanced_user_query == "2 BHK Flats in New Delhi priced under 1 crore with a balcony"
+
+    q = parse_filters("Looking for a villa in banglore above 1200 sqft")
+    assert (q.city, q.property_type, q.min_area, q.room_type) == ("Bangalore", "Villa", 1200, None)
+
+
+def test_localities_and_units():
+    q = parse_filters("3BHK flat in Gurgaon under 80L")
+    assert (q.city, q.max_price) == ("New Delhi", 8_000_000)
+    assert "near Gurgaon" in q.enhanced_user_query
+    assert parse_filters("flats in navi mumbai").city == "Mumbai"
+
+
+def test_defers_to_llm():
+    assert parse_filters("villa with a garden in pune") is None  # free text
+    assert parse_filters("flats in pune under 80") is None  # unit unknown
+    assert parse_filters("1.5 bhk in pune") is None
+    assert parse_filters("flats in pune or mumbai") is None
+    assert parse_filters("under 50 lakh please", has_history=True) is None  # follow-up
+
+
+def test_saved_preferences_fill_gaps():
+    prefs = "User preferences: \n    - Budget: ₹1,000,000 to ₹20,000,000\n    - Area: 500 to 2000 sq ft\n    - Preferred cities: Pune"
+    q = parse_filters("2 bhk under 50 lakh", prefs=prefs)
+    assert (q.city, q.max_price, q.min_area) == ("Pune", 5_000_000, 500)
+    assert parse_filters("2 bhk in pune", prefs="likes big kitchens") is None
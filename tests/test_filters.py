@@ -0,0 +1,37 @@
+from findmyhome.agents.state import QueryEnhancer
+from findmyhome.filters import compile_filters, keyset_cypher, similarity_sql
+
+
+def test_same_filters_compile_to_sql_and_cypher():
+    enh = QueryEnhancer(enhanced_user_query="q", city="Pune", room_type="BHK", min_beds=2, max_price=5_000_000, has_balcony=True)
+    compiled = compile_filters(enh)
+    assert compiled.sql_where == ["city_code = %s", '"hasBalcony" = %s', "beds >= %s", "price <= %s", "room_type_code = %s"]
+    assert compiled.sql_params == ["Pune", True, 2, 5_000_000.0, "BHK"]
+    assert "(:City {name: $city})" in compiled.cypher and "(:RoomType {name: $room_type})" in compiled.cypher
+    assert "p.beds >= $min_beds AND p.price <= $max_price" in compiled.cypher
+    assert set(compiled.cypher_params) == set(compiled.shape)
+
+
+def test_raw_columns_and_statement_memoised_per_shape():
+    raw = compile_filters({"city": "Pune", "min_beds": "2"}, coded=False)
+    assert raw.shape == ("city",) and raw.sql_params == ["%Pune%"]
+    first = similarity_sql(("city", "min_beds"), True, 1536, exclude=True)
+    assert first is similarity_sql(("city", "min_beds"), True, 1536, exclude=True)
+    assert first.count("%s") == 5 and "ORDER BY score" in first
+
+
+def test_keyset_page_filters_on_score_alias_after_the_vector():
+    sql = similarity_sql(("city",), True, 1536, exclude=True, after_score=True)
+    assert "WHERE (score, id) > (%s, %s) AND NOT (id = ANY(%s))" in sql and "ORDER BY score, id" in sql
+    assert sql.index("<=> %s") < sql.index("city_code = %s") < sql.index("(score, id) > (%s, %s)")
+
+
+def test_compiled_and_template_cypher_page_on_price_then_id():
+    page = keyset_cypher(compile_filters({"city": "Pune", "min_beds": 2}).cypher)
+    assert page.startswith("MATCH (p:Property)") and "RETURN DISTINCT" not in page
+    assert page.endswith("RETURN p\nORDER BY price_key DESC, p.id\nLIMIT $limit") and "price_key < $after_price" in page
+    template = "MATCH (p:Property)-[:OF_TYPE]->(:PropertyType {name:$property_type}) RETURN p LIMIT 10"
+    assert keyset_cypher(template).count("LIMIT") == 1
+    # anything but a plain trailing RETURN p keeps the CALL {} wrapper
+    assert keyset_cypher("MATCH (p:Property) RETURN p ORDER BY p.beds") is None
+    assert keyset_cypher("MATCH (p:Property) RETURN p UNION MATCH (p:Property) RETURN p") is None
@@ -0,0 +1,25 @@
+from findmyhome.graph_store import GraphSchemaCache
+
+
+class FakeGraph:
+    schema = ""
+    structured_schema = {}
+
+
+def test_refresh_publishes_one_snapshot(monkeypatch):
+    cache = GraphSchemaCache()
+    scans = iter([{"schema": "v1", "structured_schema": {"relationships": [1]}},
+                  {"schema": "v2", "structured_schema": {"relationships": [2]}}])
+    monkeypatch.setattr(cache, "_connect", FakeGraph)
+    monkeypatch.setattr(cache, "_scan", lambda graph: next(scans))
+
+    graph = cache.get_graph()
+    first = cache.snapshot()
+    assert (first.version, first.schema, graph.schema) == (1, "v1", "v1")
+
+    cache.refresh()
+    # the old snapshot object is untouched; readers holding it never see half of the new one
+    assert (first.schema, first.structured_schema) == ("v1", {"relationships": [1]})
+    assert cache.snapshot()[:3] == (2, "v2", {"relationships": [2]}) and cache.version == 2
+    with cache.reading() as g:
+        assert (g.schema, g.structured_schema) == ("v2", {"relationships": [2]})
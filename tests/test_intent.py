@@ -0,0 +1,43 @@
+from findmyhome.intent import IntentClassifier, IntentRule
+
+
+def test_rules_cover_obvious_turns():
+    clf = IntentClassifier()
+    assert clf.match_rules("show me more", has_history=True).label == "more"
+    assert clf.match_rules("Is that all?", has_history=True).label == "more"
+    # "more" needs something to be more of
+    assert clf.match_rules("show me more", has_history=False) is None
+    assert clf.match_rules("Show me 2 BHK flats in Pune", has_history=False).label == "recommendation"
+    # follow-ups about shown results are left to the LLM
+    assert clf.match_rules("what is the price of the second 2 BHK in Pune you showed", has_history=True) is None
+
+
+def test_rent_queries_are_invalid():
+    clf = IntentClassifier()
+    for query in (
+        "Show me 2 BHK flats on rent in Pune",
+        "2bhk for rent in Mumbai under 30k per month",
+        "3 bhk in Bangalore to lease",
+        "any PG in Hyderabad",
+    ):
+        assert clf.match_rules(query, has_history=False).label == "invalid", query
+        assert clf.match_rules(query, has_history=True).label == "invalid", query
+    # words that merely contain the stem are not rentals
+    assert clf.match_rules("Show me 2 BHK flats in Parent Colony Pune", has_history=False).label == "recommendation"
+
+
+def test_custom_rule_and_threshold():
+    clf = IntentClassifier(threshold=0.9)
+    clf.register_rule(IntentRule("rent", "invalid", r"\brent\b", confidence=0.99), first=True)
+    clf.register_rule(IntentRule("weak", "discussion", r"price", confidence=0.5))
+    assert clf.match_rules("any flats for rent in Pune", has_history=False).label == "invalid"
+    assert clf.match_rules("price?", has_history=True) is None
+
+
+def test_nearest_neighbour_needs_margin():
+    clf = IntentClassifier(rules=[], examples={"more": ["m"], "recommendation": ["r"]}, threshold=0.8)
+    assert clf.needs_examples()
+    clf.load_example_vectors([[0.0, 1.0], [1.0, 0.0]])  # sorted labels: more, recommendation
+    decision = clf.classify("x", has_history=True, embed=lambda _t: [0.1, 1.0])
+    assert decision.label == "more" and decision.source == "nn"
+    assert clf.classify("x", has_history=True, embed=lambda _t: [1.0, 1.0]) is None
@@ -0,0 +1,62 @@
+import pytest
+from redisvl.schema.schema import IndexSchema
+
+from findmyhome.memory_index import memory_filter, needs_reindex, schema_dict, vector_attrs
+
+
+def _info(*vector_attrs):
+    return {"attributes": [
+        ["identifier", "$.user_id", "attribute", "user_id", "type", "TAG"],
+        ["identifier", "$.embedding", "attribute", "embedding", "type", "VECTOR", *vector_attrs],
+    ]}
+
+
+def test_schema_is_hnsw_with_build_parameters():
+    attrs = IndexSchema.from_dict(schema_dict(dims=8, m=32, ef_construction=100)).fields["embedding"].attrs
+    assert attrs.algorithm.value == "HNSW" and attrs.dims == 8 and attrs.m == 32 and attrs.ef_construction == 100
+    with pytest.raises(ValueError):
+        schema_dict(algorithm="ivf")
+
+
+def test_filter_escapes_uuid_and_ors_memory_types():
+    expr = str(memory_filter("3f2a-11", ["episodic", "semantic"]))
+    assert expr == r"(@user_id:{3f2a\-11} @memory_type:{episodic|semantic})"
+    assert str(memory_filter("u1")) == "@user_id:{u1}"
+
+
+def test_flat_index_needs_reindex_and_matching_hnsw_does_not():
+    schema = IndexSchema.from_dict(schema_dict(dims=1536, m=16, ef_construction=200))
+    flat = _info("algorithm", "FLAT", "data_type", "FLOAT32", "dim", 1536, "distance_metric", "COSINE")
+    assert vector_attrs(flat) == {"algorithm": "flat", "dim": "1536"}
+    assert needs_reindex(flat, schema)
+    assert not needs_reindex(_info("algorithm", "HNSW", "dim", 1536, "M", 16, "ef_construction", 200), schema)
+    assert needs_reindex(_info("algorithm", "HNSW", "dim", 1536, "M", 8, "ef_construction", 200), schema)
+    assert needs_reindex(None, schema)
+
+
+def test_async_index_is_created_once_if_missing(monkeypatch):
+    import asyncio
+
+    import redisvl.index
+    from findmyhome import memory
+
+    created = []
+
+    class FakeAsyncIndex:
+        def __init__(self, schema, redis_client, validate_on_load):
+            pass
+
+        async def create(self, overwrite=False):
+            await asyncio.sleep(0)
+            created.append(overwrite)
+
+    monkeypatch.setattr(redisvl.index, "AsyncSearchIndex", FakeAsyncIndex)
+    monkeypatch.setattr(memory, "get_memory_schema", lambda: None)
+    monkeypatch.setattr(memory, "_async_memory_index", None)
+    monkeypatch.setattr(memory, "_async_memory_index_lock", None)
+
+    async def main():
+        return await asyncio.gather(*(memory.get_async_memory_index() for _ in range(3)))
+
+    first, *rest = asyncio.run(main())
+    assert created == [False] and all(index is first for index in rest)
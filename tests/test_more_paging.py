@@ -0,0 +1,69 @@
+import numpy as np
+
+from findmyhome.agents.graph_agent import _first_page, _graph_update
+from findmyhome.agents.sql_agent import _graph_cursor, _more_graph_query, _more_sql_query, _page_cursor
+from findmyhome.filters import compile_filters
+
+VEC = np.zeros(3, dtype=np.float32)
+
+
+def _sql_rows(ids, start):
+    return [{"id": pid, "score": round(start + i / 100, 4)} for i, pid in enumerate(ids)]
+
+
+def _graph_rows(ids, price):
+    return [{"p": {"id": pid, "price": price - i}} for i, pid in enumerate(ids)]
+
+
+def test_sql_pages_seek_past_a_score_id_boundary():
+    cursor = _page_cursor(None, _sql_rows(["s1", "s2", "s3"], 0.1))
+    assert (cursor["score"], cursor["id"]) == (0.1, "s1")
+    assert cursor["overlap"] == [["s2", 0.11], ["s3", 0.12]]
+
+    sql, params = _more_sql_query({"sql_cursor": cursor}, {}, VEC, ["g1"], 10, coded=True)
+    assert "(score, id) > (%s, %s)" in sql and "ORDER BY score, id" in sql
+    assert params[1:3] == [0.1, "s1"] and params[3] == ["s2", "s3", "g1"] and params[-1] == 10
+
+    # the exclusion stays about one page however many pages were shown
+    for n in range(2, 30):
+        cursor = _page_cursor(cursor, _sql_rows([f"p{n}-{i}" for i in range(10)], n / 10))
+    assert (cursor["score"], cursor["id"]) == (2.9, "p29-0") and len(cursor["overlap"]) == 9
+
+
+def test_out_of_order_rows_inside_the_page_are_not_lost_or_repeated():
+    # relaxed_order: "s2" (0.105) was passed over by the page that showed s1, s3
+    cursor = _page_cursor(None, [{"id": "s1", "score": 0.1}, {"id": "s3", "score": 0.11}])
+    cursor = _page_cursor(cursor, [{"id": "s2", "score": 0.105}, {"id": "s4", "score": 0.12}])
+    # s3 stays excluded: it lies past the new boundary s2
+    assert (cursor["score"], cursor["id"]) == (0.105, "s2")
+    assert [pid for pid, _ in cursor["overlap"]] == ["s3", "s4"]
+
+
+def test_graph_pages_seek_past_price_id_and_exclude_only_the_first_page():
+    state = {"previous_generated_graph_query": "MATCH (p:Property) RETURN p", "graph_cursor": {"exclude": ["g1", "g2"]}}
+    _, q, params = _more_graph_query(state, 10)
+    assert params["exclude"] == ["g1", "g2"] and params["after_id"] is None
+
+    state["graph_cursor"] = _graph_cursor(state, _graph_rows(["g3", "g4"], 1_000_000))
+    _, q, params = _more_graph_query(state, 10)
+    assert (params["after_price"], params["after_id"]) == (999_999.0, "g4") and params["exclude"] == ["g1", "g2"]
+
+
+def test_compiled_graph_queries_page_inside_the_statement():
+    compiled = compile_filters({"city": "Pune"})
+    q, bound, page = _first_page(compiled.cypher, compiled.cypher_params, 10)
+    assert q == page and bound == {"city": "Pune", "after_price": None, "after_id": None, "limit": 10}
+    update = _graph_update("ok", compiled.cypher, _graph_rows(["g1", "g2"], 5_000_000), compiled.cypher_params, page)
+    assert update["graph_cursor"] == {"price": 4_999_999.0, "id": "g2"}
+
+    _, q, params = _more_graph_query(update, 10)
+    assert q == page and "CALL" not in q and "exclude" not in params
+    assert params == {"city": "Pune", "after_price": 4_999_999.0, "after_id": "g2", "limit": 10}
+
+
+def test_threads_without_cursors_fall_back_to_shown_ids():
+    state = {"database_property_id_shown": ["s1"], "graph_property_id_shown": ["g1"]}
+    sql, params = _more_sql_query(state, {}, VEC, [], 10, coded=True)
+    assert "(score, id)" not in sql and params[1] == ["s1", "g1"]
+    _, _, graph_params = _more_graph_query({**state, "previous_generated_graph_query": "MATCH (p) RETURN p"}, 10)
+    assert graph_params["exclude"] == ["g1"]
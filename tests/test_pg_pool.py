@@ -0,0 +1,87 @@
+import psycopg2
+import pytest
+
+from findmyhome import pg_pool
+from findmyhome.pg_pool import PoolTimeout, PropertyConnectionPool
+
+
+@pytest.fixture
+def connections(monkeypatch, fake_conn):
+    created = []
+
+    def connect(dsn, connection_factory=None):
+        conn = fake_conn()
+        created.append(conn)
+        return conn
+
+    monkeypatch.setattr(pg_pool.psycopg2, "connect", connect)
+    monkeypatch.setattr(pg_pool.time, "monotonic", lambda: 0.0)
+    return created
+
+
+def test_statements_are_prepared_once_per_connection(connections):
+    pool = PropertyConnectionPool("postgresql://x")
+    sql = "SELECT id FROM properties WHERE city_code = %s AND price <= %s"
+    with pool.connection() as conn, conn.cursor() as cur:
+        pool.execute(cur, sql, ["Pune", 5_000_000])
+        pool.execute(cur, sql, ["Thane", 7_000_000])
+
+    (prepare, _), (execute, params), (again, _) = connections[0].executed
+    name = prepare.split()[1]
+    assert prepare == f"PREPARE {name} AS SELECT id FROM properties WHERE city_code = $1 AND price <= $2"
+    assert execute == f"EXECUTE {name} (%s, %s)" and params == ["Pune", 5_000_000]
+    assert again == execute
+    assert pool.stats()["prepared_statements"] == 1
+
+    plain = PropertyConnectionPool("postgresql://x", prepare=False)
+    with plain.connection() as conn, conn.cursor() as cur:
+        plain.execute(cur, sql, ["Pune", 1])
+    assert connections[1].executed == [(sql, ["Pune", 1])]
+
+
+def test_broken_connections_are_discarded(connections):
+    pool = PropertyConnectionPool("postgresql://x")
+    with pytest.raises(psycopg2.OperationalError):
+        with pool.connection():
+            raise psycopg2.OperationalError("server closed the connection")
+    assert connections[0].closed and pool.stats()["size"] == 0 and pool.stats()["errors"] == 1
+
+    # an idle connection that fails its ping is replaced, not handed out
+    pool = PropertyConnectionPool("postgresql://x", check_idle=30)
+    with pool.connection():
+        pass
+    stale = connections[-1]
+    stale.last_used = -60.0
+    stale.fail_with = psycopg2.OperationalError("SSL connection has been closed unexpectedly")
+    with pool.connection() as conn:
+        assert conn is not stale
+    assert stale.closed and pool.stats()["health_check_failures"] == 1
+
+
+def test_checkout_and_return_counts(connections):
+    pool = PropertyConnectionPool("postgresql://x", min_size=1, max_size=1, acquire_timeout=0.0)
+    pool.open()
+    for _ in range(3):
+        with pool.connection():
+            pass
+    stats = pool.stats()
+    assert stats["checkouts"] == 3 and stats["connections_created"] == 1
+    assert stats["idle"] == 1 and stats["in_use"] == 0
+
+    with pool.connection():
+        assert pool.stats()["in_use"] == 1
+        with pytest.raises(PoolTimeout):
+            with pool.connection():
+                pass
+    assert pool.stats()["timeouts"] == 1 and pool.stats()["idle"] == 1
+
+
+def test_escaped_percent_and_param_count(connections):
+    pool = PropertyConnectionPool("postgresql://x")
+    sql = "SELECT id FROM properties WHERE name LIKE 'a%%s' AND price <= %s"
+    with pool.connection() as conn, conn.cursor() as cur:
+        pool.execute(cur, sql, [5_000_000])
+        prepare = connections[0].statements[0]
+        assert prepare.endswith("AS SELECT id FROM properties WHERE name LIKE 'a%s' AND price <= $1")
+        with pytest.raises(ValueError, match="1 placeholders but 2 parameters"):
+            pool.execute(cur, "SELECT %s", [1, 2])
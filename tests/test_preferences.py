@@ -0,0 +1,38 @@
+import pytest
+
+from findmyhome.agents.filter_parser import parse_preferences
+from findmyhome.preferences import PreferenceStore, UserPreferences, format_preferences, legacy_preferences
+
+PREFS = UserPreferences(min_price=2000000, max_price=9000000, min_area=600, max_area=1400, preferred_cities=["Pune"])
+
+
+def test_one_get_per_user_then_cached_including_users_without_prefs(fake_redis):
+    redis = fake_redis
+    store = PreferenceStore(lambda: redis)
+    assert store.get("u1") is None
+    assert store.get("u1") is None
+    assert redis.gets == 1
+
+    store.put("u1", PREFS)  # write-through refreshes the cached "no preferences"
+    assert store.get("u1") == PREFS
+    assert redis.gets == 1
+    assert PreferenceStore(lambda: redis).get("u1") == PREFS
+
+
+def test_saving_without_redis_fails_loudly():
+    store = PreferenceStore(lambda: None)
+    with pytest.raises(RuntimeError):
+        store.put("u1", PREFS)
+    assert store.get("u1") is None
+
+
+def test_formatted_preferences_still_parse():
+    assert parse_preferences(format_preferences(PREFS)) == {"max_price": 9000000, "min_area": 600, "city": "Pune"}
+
+
+def test_legacy_memory_metadata_is_read_back():
+    meta = {"type": "user_preferences", "min_price": 2000000, "max_price": 9000000, "min_area": 600,
+            "max_area": 1400, "cities": ["Pune"]}
+    assert legacy_preferences({"metadata": str(meta)}) == PREFS
+    assert legacy_preferences({"metadata": "{}"}) is None
+    assert legacy_preferences({"metadata": "not a dict"}) is None
@@ -0,0 +1,33 @@
+from findmyhome.property_record import PROMPT_COLUMNS, PropertyRecord, cards, prompt_table, short_amount
+
+ROW = {
+    "id": 17, "name": "Block E, Krishna Nagar", "cityName": "New Delhi", "beds": 3, "baths": 3,
+    "price": 11500000.0, "totalArea": 1250.0, "pricePerSqft": 9200.0, "room_type": "BHK",
+    "property_type": "Villa", "hasBalcony": False, "description": "Corner plot | park facing", "score": 0.12,
+}
+
+
+def test_short_amount_uses_indian_units():
+    assert short_amount(11500000) == "1.15Cr"
+    assert short_amount(5000000) == "50L"
+    assert short_amount(9200) == "9.2k"
+    assert short_amount(None) == ""
+
+
+def test_prompt_table_has_fixed_columns_and_no_ids():
+    table = prompt_table([ROW, {"id": "x"}, "not a row"])
+    header, first, second = table.splitlines()
+    assert header == "#|" + "|".join(PROMPT_COLUMNS)
+    assert first == "1|3 BHK|Villa|Block E, Krishna Nagar|New Delhi|1.15Cr|1250|3|N|9.2k|Corner plot / park facing"
+    assert second.count("|") == len(PROMPT_COLUMNS)
+    assert "17" not in first and "0.12" not in first
+
+
+def test_card_keeps_rendered_fields_only():
+    card = cards([{**ROW, "description_embed": [0.1] * 8}])[0]
+    assert card["id"] == "17" and card["cityName"] == "New Delhi" and card["hasBalcony"] is False
+    assert "score" not in card and "description_embed" not in card
+
+
+def test_record_has_no_instance_dict():
+    assert not hasattr(PropertyRecord.from_row(ROW), "__dict__")
@@ -0,0 +1,22 @@
+from findmyhome import result_cache
+from findmyhome.cache import TieredCache
+from findmyhome.result_cache import CATALOG_VERSION_KEY, ResultCache
+
+
+def test_catalog_version_is_read_once_per_ttl(monkeypatch, fake_redis):
+    now = [0.0]
+    monkeypatch.setattr(result_cache.time, "monotonic", lambda: now[0])
+    redis = fake_redis
+    cache = ResultCache(TieredCache("results"), redis_factory=lambda: redis, version_ttl=5)
+
+    loads = []
+    for _ in range(3):
+        cache.get_or_load("sql", {"q": 1}, lambda: loads.append(1) or [{"id": "p1"}])
+    assert loads == [1] and redis.gets == 1
+
+    redis.store[CATALOG_VERSION_KEY] = 7  # bumped by another worker
+    assert cache.version() == 0
+    now[0] = 6.0
+    assert cache.version() == 7 and redis.gets == 2
+
+    assert cache.bump() == 8 and cache.version() == 8 and redis.gets == 2  # a local bump applies at once
@@ -0,0 +1,11 @@
+from findmyhome.agents.turn_context import _current
+
+
+def test_context_from_an_earlier_turn_is_stale_even_when_user_query_was_trimmed():
+    ctx = {"turn": 4, "question": "2 bhk in pune", "preferences": None}
+    # compaction keeps user_query at the same length, but compact_state has closed another turn
+    assert _current({"user_query": ["a", "2 bhk in pune"], "completed_turns": 4, "turn_context": ctx}) is ctx
+    assert _current({"user_query": ["2 bhk in pune", "villas in goa"], "completed_turns": 5, "turn_context": ctx}) is None
+    # a turn that failed before compact_state leaves the counter as it was; the question still differs
+    assert _current({"user_query": ["2 bhk in pune", "villas in goa"], "completed_turns": 4, "turn_context": ctx}) is None
+    assert _current({"user_query": ["x"], "turn_context": None}) is None
@@ -0,0 +1,26 @@
+from types import SimpleNamespace
+
+from findmyhome.vector_index import create_index_sql, search_settings
+
+SETTINGS = SimpleNamespace(
+    vector_index_method="hnsw",
+    hnsw_ef_search=40,
+    hnsw_ef_search_filtered=200,
+    ivfflat_probes=10,
+    ivfflat_max_probes=100,
+    vector_iterative_scan="relaxed_order",
+    vector_max_scan_tuples=20000,
+)
+
+
+def test_filtered_search_uses_iterative_scan_or_wider_candidates():
+    assert search_settings(SETTINGS, {}, (0, 8, 0)) == ["SET LOCAL hnsw.ef_search = 40"]
+    assert "SET LOCAL hnsw.iterative_scan = relaxed_order" in search_settings(SETTINGS, {"city": "Pune"}, (0, 8, 0))
+    assert search_settings(SETTINGS, {"city": "Pune"}, (0, 7, 4)) == ["SET LOCAL hnsw.ef_search = 200"]
+    ivf = SimpleNamespace(**{**vars(SETTINGS), "vector_index_method": "ivfflat"})
+    assert search_settings(ivf, {"min_beds": 2}, (0, 8, 1))[-1] == "SET LOCAL ivfflat.max_probes = 100"
+
+
+def test_create_index_sql_uses_cosine_opclass():
+    sql = create_index_sql("hnsw", m=16, ef_construction=64)
+    assert "USING hnsw (description_embed vector_cosine_ops)" in sql and "CONCURRENTLY" in sql
@@ -364,22 +364,6 @@ function renderPropertyList(properties) {
   });
 }
 
-function renderRecommendationsFromState(stateData) {
-  const turnLog = Array.isArray(stateData?.turn_log) ? stateData.turn_log : [];
-  const lastTurn = turnLog[turnLog.length - 1];
-  if (!lastTurn) {
-    clearRecommendations();
-    return;
-  }
-
-  qaQuestion.textContent = lastTurn.question || lastTurn.query_used || "";
-  qaAnswer.textContent =
-    lastTurn.answer || stateData.augmentation_summary || "";
-  qaEmpty.classList.add("is-hidden");
-  qaContent.classList.remove("is-hidden");
-  renderPropertyList(lastTurn.recommended_properties || []);
-}
-
 async function apiFetch(path, options = {}) {
   const headers = {
     "Content-Type": "application/json",
@@ -408,6 +392,120 @@ async function apiFetch(path, options = {}) {
   return data;
 }
 
+function parseSseFrame(frame) {
+  let event = "message";
+  const dataLines = [];
+  frame.split("\n").forEach((line) => {
+    if (line.startsWith("event:")) {
+      event = line.slice(6).trim();
+    } else if (line.startsWith("data:")) {
+      dataLines.push(line.slice(5).trim());
+    }
+  });
+  if (!dataLines.length) {
+    return null;
+  }
+  try {
+    return { event, data: JSON.parse(dataLines.join("\n")) };
+  } catch (error) {
+    return null;
+  }
+}
+
+async function apiStream(path, options = {}, onEvent) {
+  const headers = {
+    "Content-Type": "application/json",
+    Accept: "text/event-stream",
+    ...(options.headers || {}),
+  };
+  const response = await fetch(`${API_BASE}${path}`, {
+    ...options,
+    headers,
+  });
+
+  if (!response.ok || !response.body) {
+    let data = {};
+    try {
+      data = await response.json();
+    } catch (error) {
+      data = {};
+    }
+    const err = new Error(data.detail || data.message || response.statusText);
+    err.status = response.status;
+    err.data = data;
+    throw err;
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) {
+      break;
+    }
+    buffer += decoder.decode(value, { stream: true });
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary !== -1) {
+      const parsed = parseSseFrame(buffer.slice(0, boundary));
+      buffer = buffer.slice(boundary + 2);
+      if (parsed) {
+        onEvent(parsed.event, parsed.data);
+      }
+      boundary = buffer.indexOf("\n\n");
+    }
+  }
+}
+
+function createStreamRenderer() {
+  const properties = new Map();
+  let summaryFinal = false;
+
+  const propertyKey = (property) =>
+    String(property.id ?? `${property.name}|${property.price}`);
+
+  return (event, data) => {
+    switch (event) {
+      case "start":
+        state.threadId = data.thread_id || state.threadId;
+        qaQuestion.textContent = data.question || "";
+        qaAnswer.textContent = "";
+        qaEmpty.classList.add("is-hidden");
+        qaContent.classList.remove("is-hidden");
+        renderPropertyList([]);
+        setAppPanel("results");
+        break;
+      case "properties": {
+        const incoming = Array.isArray(data.properties) ? data.properties : [];
+        // The merged list is authoritative; branch results only add cards.
+        if (data.source === "unified" || data.source === "more") {
+          properties.clear();
+        }
+        incoming.forEach((property) => {
+          if (property && typeof property === "object") {
+            properties.set(propertyKey(property), property);
+          }
+        });
+        renderPropertyList(Array.from(properties.values()));
+        break;
+      }
+      case "token":
+        if (!summaryFinal) {
+          qaAnswer.textContent += data.text || "";
+        }
+        break;
+      case "summary":
+        summaryFinal = true;
+        qaAnswer.textContent = data.text || qaAnswer.textContent;
+        break;
+      case "error":
+        throw new Error(data.detail || "Failed to get recommendations.");
+      default:
+        break;
+    }
+  };
+}
+
 async function loadChatOverview() {
   try {
     const chats = await apiFetch("/my-chats", {
@@ -498,14 +596,16 @@ async function handleStartRecommendations() {
 
   startRecommendationsBtn.disabled = true;
   try {
-    const data = await apiFetch("/initial-preferences", {
-      method: "POST",
-      headers: getAuthHeaders(),
-      body: JSON.stringify({}),
-    });
-    state.threadId = data.thread_id || "";
-    renderRecommendationsFromState(data.state || {});
-    setAppPanel("results");
+    setStatus("info", "Finding homes for you...");
+    await apiStream(
+      "/initial-preferences/stream",
+      {
+        method: "POST",
+        headers: getAuthHeaders(),
+        body: JSON.stringify({}),
+      },
+      createStreamRenderer()
+    );
     setStatus("success", "Recommendations are ready.");
   } catch (error) {
     setStatus("error", error.message || "Failed to start recommendations.");